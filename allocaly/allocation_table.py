@@ -0,0 +1,118 @@
+# allocation_table.py
+
+from typing import Iterator, Optional, Sequence, Union
+
+import numpy as np
+import pandas as pd
+
+from ganttly.activity_table import DictionaryColumn, object_array
+
+# Sheet row of the first allocation, under the header row
+FIRST_DATA_ROW = 2
+
+
+def _month_array(values: pd.Series) -> np.ndarray:
+    # Date columns already parsed by the reader are converted without going through objects
+    return pd.to_datetime(values, errors='coerce').to_numpy(dtype='datetime64[ns]').astype('datetime64[M]')
+
+
+class AllocationTable:
+    """ Column-oriented collection of allocations.
+
+    Employee, stream and category are dictionary encoded, the month of each
+    allocation is a datetime64[M] array and the man-days a float array, so the
+    man-day matrices are computed with array operations. It behaves as a
+    sequence of `AllocationDto`, built on access."""
+
+    def __init__(self,
+                 employee: DictionaryColumn,
+                 activity: np.ndarray,
+                 stream: DictionaryColumn,
+                 activity_category: DictionaryColumn,
+                 month: np.ndarray,
+                 mds: np.ndarray,
+                 row_number: Optional[np.ndarray] = None,
+                 source: Optional[np.ndarray] = None):
+        self.employee = employee
+        self.activity = activity
+        self.stream = stream
+        self.activity_category = activity_category
+        self.month = month
+        self.mds = mds
+        # The sheet row of each allocation, or its 1-based position when it was not read from a sheet
+        self.row_number = row_number if row_number is not None else np.arange(1, len(mds) + 1)
+        # The workbook each allocation was read from, when the table merges several
+        self.source = source if source is not None else np.full(len(mds), None, dtype=object)
+
+    @staticmethod
+    def from_frame(df: pd.DataFrame, employee: str, activity: str, stream: str,
+                   activity_category: Optional[str], month: str, mds: str,
+                   first_row: int = FIRST_DATA_ROW, source: Optional[str] = None) -> 'AllocationTable':
+        """ Builds the table from the named columns of an allocation sheet.
+        The month is the month of the date column, and the sheet rows are taken
+        from the frame index, where `first_row` is at 0 """
+        size = len(df)
+        categories = df[activity_category] if activity_category in df.columns else np.full(size, None, dtype=object)
+        return AllocationTable(
+            employee=DictionaryColumn.encode(df[employee]),
+            activity=object_array(df[activity].tolist()),
+            stream=DictionaryColumn.encode(df[stream]),
+            activity_category=DictionaryColumn.encode(categories),
+            month=_month_array(df[month]),
+            mds=pd.to_numeric(df[mds], errors='coerce').to_numpy(dtype=np.float64),
+            row_number=df.index.to_numpy(dtype=np.int64) + first_row,
+            source=np.full(size, source, dtype=object),
+        )
+
+    @staticmethod
+    def concat(tables: Sequence['AllocationTable']) -> 'AllocationTable':
+        """ The allocations of all the tables, in order """
+        def encoded(name: str) -> DictionaryColumn:
+            return DictionaryColumn.encode(np.concatenate([getattr(table, name).values() for table in tables]))
+
+        return AllocationTable(
+            employee=encoded('employee'),
+            activity=np.concatenate([table.activity for table in tables]),
+            stream=encoded('stream'),
+            activity_category=encoded('activity_category'),
+            month=np.concatenate([table.month for table in tables]),
+            mds=np.concatenate([table.mds for table in tables]),
+            row_number=np.concatenate([table.row_number for table in tables]),
+            source=np.concatenate([table.source for table in tables]),
+        )
+
+    def take(self, positions: Union[Sequence[int], np.ndarray]) -> 'AllocationTable':
+        positions = np.asarray(positions, dtype=np.intp)
+        return AllocationTable(
+            employee=self.employee.take(positions),
+            activity=self.activity[positions],
+            stream=self.stream.take(positions),
+            activity_category=self.activity_category.take(positions),
+            month=self.month[positions],
+            mds=self.mds[positions],
+            row_number=self.row_number[positions],
+            source=self.source[positions],
+        )
+
+    def __len__(self) -> int:
+        return len(self.mds)
+
+    def __getitem__(self, position: int):
+        from allocaly.excel_repository import AllocationDto
+
+        if position < 0:
+            position += len(self)
+        if not 0 <= position < len(self):
+            raise IndexError("allocation index out of range")
+        month = self.month[position]
+        return AllocationDto(
+            employee=self.employee[position],
+            activity=self.activity[position],
+            stream=self.stream[position],
+            activity_category=self.activity_category[position],
+            mds=float(self.mds[position]),
+            month=None if np.isnat(month) else pd.Timestamp(month),
+        )
+
+    def __iter__(self) -> Iterator:
+        return (self[position] for position in range(len(self)))
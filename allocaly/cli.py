@@ -0,0 +1,106 @@
+# cli.py
+
+import sys
+
+import click
+
+# The keys of allocaly.pivot.PIVOT_KEYS, listed here so that --help doesn't load pandas
+_PIVOT_KEYS = ["employee", "stream", "activity_category"]
+_ALLOCATION_OPTIONS = [
+    click.argument('file_paths', nargs=-1, required=True, type=click.Path(exists=True, dir_okay=False)),
+    click.option('--sheet', type=str, default='Sheet1',
+                 help="Name of the sheet holding the allocations in every workbook. Default is 'Sheet1'."),
+    click.option('--filter', type=str, multiple=True,
+                 help="Streams to keep, can be repeated. If not provided, all streams are included."),
+    click.option('--no-cache', is_flag=True, default=False,
+                 help="Always parse the Excel file instead of reusing the parsed sheet from the cache."),
+    click.option('--cache-dir', type=click.Path(file_okay=False),
+                 help="Directory of the parsed-sheet cache. Default is ~/.cache/ganttly."),
+    click.option('--streaming', is_flag=True, default=False,
+                 help="Read the sheet row by row, keeping only the known columns and the filtered streams. "
+                      "Lowers memory usage on large workbooks."),
+]
+
+
+def allocation_options(command):
+    """ Adds the workbooks argument and the options reading their allocations """
+    for option in reversed(_ALLOCATION_OPTIONS):
+        command = option(command)
+    return command
+
+
+def load_allocations(file_paths, sheet, filter, no_cache, cache_dir, streaming):
+    """ The allocations of all the workbooks, in one table """
+    from allocaly.allocation_table import AllocationTable
+    from allocaly.excel_repository import ExcelRepository
+    from ganttly.workbook_cache import WorkbookCache
+
+    cache = None if no_cache else WorkbookCache(cache_dir)
+    tables = []
+    for file_path in file_paths:
+        repository = ExcelRepository(file_path, sheet_name=sheet, cache=cache, streaming=streaming)
+        try:
+            tables.append(repository.load_allocation(list(filter) or None))
+        except ValueError as e:
+            click.echo(f"Error: {file_path}: {e}")
+            sys.exit(1)
+    return tables[0] if len(tables) == 1 else AllocationTable.concat(tables)
+
+
+@click.group()
+def cli():
+    """ Analyses the monthly allocations of people to streams from an Excel workbook. """
+
+
+@cli.command()
+@allocation_options
+@click.option('--by', type=click.Choice(_PIVOT_KEYS), default="employee",
+              help="Rows of the table: one per employee, stream or activity category. Default is 'employee'.")
+@click.option('--csv', 'csv_path', type=click.Path(dir_okay=False),
+              help="Also write the table to this CSV file.")
+def pivot(by, csv_path, **options):
+    """ Prints the man-days allocated in each month, with a row per employee, stream or category,
+    summed across all the workbooks. """
+    from allocaly.pivot import man_days_by_month
+
+    table = man_days_by_month(load_allocations(**options), by)
+    if csv_path:
+        table.to_csv(csv_path)
+    with_totals = table.assign(Total=table.sum(axis=1))
+    click.echo(with_totals.to_string(float_format=lambda value: f"{value:g}"))
+
+
+@cli.command()
+@allocation_options
+@click.option('--capacity', type=click.FloatRange(min=0), default=20.0,
+              help="Man-days a person can be allocated in a month. Default is 20.")
+@click.option('--capacity-file', type=click.Path(exists=True, dir_okay=False),
+              help="CSV file with an 'employee', a 'capacity' and an optional 'month' (YYYY-MM) column, "
+                   "setting the capacity of a person in every month or in one month.")
+@click.option('--csv', 'csv_path', type=click.Path(dir_okay=False),
+              help="Also write the conflicts to this CSV file.")
+def conflicts(capacity, capacity_file, csv_path, **options):
+    """ Lists the months in which a person is allocated more man-days than their capacity,
+    across all the streams of all the workbooks.
+
+    Exits with status 1 when someone is over-allocated. """
+    from allocaly.conflicts import Capacity, over_allocations
+
+    try:
+        capacities = Capacity.from_csv(capacity_file, capacity) if capacity_file else Capacity(capacity)
+    except ValueError as e:
+        click.echo(f"Error: {e}")
+        sys.exit(1)
+    table = over_allocations(load_allocations(**options), capacities)
+    if csv_path:
+        table.to_csv(csv_path, index=False)
+    if table.empty:
+        click.echo("No one is over-allocated")
+        return
+    click.echo(table.to_string(index=False, float_format=lambda value: f"{value:g}"))
+    click.echo(f"{len(table)} over-allocated months, {table['employee'].nunique()} people")
+    sys.exit(1)
+
+
+if __name__ == "__main__":
+    cli()
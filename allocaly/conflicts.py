@@ -0,0 +1,118 @@
+# conflicts.py
+
+import csv
+from dataclasses import dataclass, field
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from allocaly.allocation_table import AllocationTable
+from allocaly.pivot import month_range
+
+# Man-days a person can work in a month, unless configured otherwise
+DEFAULT_CAPACITY = 20.0
+
+CONFLICT_COLUMNS = ["employee", "month", "allocated", "capacity", "excess", "allocations", "streams", "workbooks"]
+
+
+@dataclass
+class Capacity:
+    """ Man-days each person can be allocated in a month.
+
+    A capacity set for a person and a month wins over the one set for the
+    person, which wins over `default`. Months are 'YYYY-MM' strings."""
+    default: float = DEFAULT_CAPACITY
+    employees: Dict[str, float] = field(default_factory=dict)
+    months: Dict[Tuple[str, str], float] = field(default_factory=dict)
+
+    @staticmethod
+    def from_csv(path: str, default: float = DEFAULT_CAPACITY) -> 'Capacity':
+        """ Reads the capacities from a CSV file with an 'employee', a
+        'capacity' and an optional 'month' column; a row without a month sets
+        the capacity of every month of the person """
+        capacity = Capacity(default)
+        with open(path, newline='', encoding='utf-8') as f:
+            reader = csv.DictReader(f)
+            missing = [column for column in ["employee", "capacity"] if column not in (reader.fieldnames or [])]
+            if missing:
+                raise ValueError(f"Missing columns in the capacity file: {', '.join(missing)}")
+            for line, row in enumerate(reader, start=2):
+                try:
+                    value = float(row["capacity"])
+                    month = (row.get("month") or "").strip()
+                    if month:
+                        month = str(pd.Period(month, freq='M'))
+                except ValueError as e:
+                    raise ValueError(f"Line {line} of the capacity file: {e}") from e
+                if month:
+                    capacity.months[(row["employee"], month)] = value
+                else:
+                    capacity.employees[row["employee"]] = value
+        return capacity
+
+    def of_cells(self, labels: list, employee_codes: np.ndarray, months: np.ndarray) -> np.ndarray:
+        """ The capacity of each (employee code into `labels`, datetime64[M] month) cell """
+        by_employee = np.array([self.employees.get(label, self.default) for label in labels], dtype=np.float64)
+        capacities = by_employee[employee_codes] if len(labels) else np.zeros(len(employee_codes))
+        if self.months:
+            month_text = np.datetime_as_string(months, unit='M')
+            for position, (code, month) in enumerate(zip(employee_codes.tolist(), month_text.tolist())):
+                capacities[position] = self.months.get((labels[code], month), capacities[position])
+        return capacities
+
+
+def over_allocations(table: AllocationTable, capacity: Optional[Capacity] = None) -> pd.DataFrame:
+    """ The months in which a person is allocated more man-days than their
+    capacity, summed across all streams and workbooks of `table`.
+
+    Each allocation falls in a single (employee, month) cell, so the sweep over
+    the months of every person is a single pass summing the man-days into a
+    dense array of cells: the cost grows linearly with the allocations. Only
+    the allocations of the over-allocated cells are then looked at, to list
+    their streams and workbooks. Rows are sorted by employee and month."""
+    capacity = capacity if capacity is not None else Capacity()
+    valid = np.flatnonzero(~np.isnat(table.month) & ~np.isnan(table.mds))
+    codes = table.employee.codes[valid].astype(np.int64)
+    month = table.month[valid]
+    months = month_range(month)
+    if len(months) == 0:
+        return pd.DataFrame(columns=CONFLICT_COLUMNS)
+
+    cells = codes * len(months) + (month - months[0]).astype(np.int64)
+    cell_count = len(table.employee.labels) * len(months)
+    allocated = np.bincount(cells, weights=table.mds[valid], minlength=cell_count)
+    allocations = np.bincount(cells, minlength=cell_count)
+
+    used = np.flatnonzero(allocations)
+    used_codes, used_months = np.divmod(used, len(months))
+    limits = capacity.of_cells(table.employee.labels, used_codes, months[used_months])
+    over = used[allocated[used] > limits + 1e-9]
+    over_limits = limits[allocated[used] > limits + 1e-9]
+
+    # Streams and workbooks of the allocations in the over-allocated cells only
+    in_conflict = np.isin(cells, over)
+    details = pd.DataFrame({
+        "cell": cells[in_conflict],
+        "stream": table.stream.values()[valid[in_conflict]],
+        "workbook": table.source[valid[in_conflict]],
+    })
+    streams = details.groupby("cell")["stream"].agg(_joined)
+    workbooks = details.groupby("cell")["workbook"].agg(_joined)
+
+    over_codes, over_months = np.divmod(over, len(months))
+    conflicts = pd.DataFrame({
+        "employee": [table.employee.labels[code] for code in over_codes.tolist()],
+        "month": pd.PeriodIndex(months[over_months].astype('datetime64[ns]'), freq='M'),
+        "allocated": allocated[over],
+        "capacity": over_limits,
+        "excess": allocated[over] - over_limits,
+        "allocations": allocations[over],
+        "streams": streams.reindex(over).to_numpy(),
+        "workbooks": workbooks.reindex(over).to_numpy(),
+    }, columns=CONFLICT_COLUMNS)
+    return conflicts.sort_values(["employee", "month"], kind='stable', ignore_index=True)
+
+
+def _joined(values: pd.Series) -> str:
+    return "; ".join(sorted({str(value) for value in values if value is not None and not pd.isna(value)}))
@@ -1,8 +1,14 @@
 
 from dataclasses import dataclass
+from datetime import datetime
 import pandas as pd
 from typing import List, Optional
 
+from allocaly.allocation_table import AllocationTable
+from ganttly.activity_table import first_data_row
+from ganttly.sheet_reader import read_sheet
+from ganttly.workbook_cache import WorkbookCache
+
 DATE_FORMAT = "%d-%b-%y"
 
 
@@ -13,6 +19,8 @@ class AllocationDto:
     stream: str
     activity_category: str
     mds: float
+    # First day of the month the man-days are allocated in
+    month: Optional[datetime] = None
 
 
 PERSON_HEADER = "Persone"
@@ -36,10 +44,16 @@ class ExcelRepository:
         # Start Date
         # End Date
     ]
+    OPTIONAL_COLUMNS = [
+        ACTIVITY_CATEGORY_HEADER,
+    ]
 
-    def __init__(self, file_path: str, sheet_name: str = "Sheet1"):
+    def __init__(self, file_path: str, sheet_name: str = "Sheet1", cache: Optional[WorkbookCache] = None,
+                 streaming: bool = False):
         self.file_path = file_path
         self.sheet_name = sheet_name
+        self.cache = cache
+        self.streaming = streaming
 
     def validate_columns(self, df: pd.DataFrame):
         missing_columns = [
@@ -48,9 +62,14 @@ class ExcelRepository:
             raise ValueError(
                 f"Missing columns in the Excel sheet: {', '.join(missing_columns)}")
 
-    def load_allocation(self, stream_filter: Optional[List[str]] = None) -> List[AllocationDto]:
-        df = pd.read_excel(self.file_path, sheet_name=self.sheet_name)
-        activities = []
+    def _read_sheet(self, stream_filter: Optional[List[str]] = None) -> pd.DataFrame:
+        return read_sheet(self.file_path, self.sheet_name,
+                          self.EXPECTED_COLUMNS, self.OPTIONAL_COLUMNS,
+                          row_filter=(STREAM_HEADER, stream_filter) if stream_filter else None,
+                          streaming=self.streaming, cache=self.cache)
+
+    def load_allocation(self, stream_filter: Optional[List[str]] = None) -> AllocationTable:
+        df = self._read_sheet(stream_filter)
 
         # Validate the columns
         self.validate_columns(df)
@@ -58,14 +77,7 @@ class ExcelRepository:
         if stream_filter:
             df = df[df[STREAM_HEADER].isin(stream_filter)]
 
-        for _, row in df.iterrows():
-            activity = AllocationDto(
-                stream=row[STREAM_HEADER],
-                activity=row[ACTIVITY_HEADER],
-                activity_category=row[ACTIVITY_CATEGORY_HEADER],
-                employee=row[PERSON_HEADER],
-                mds=row[MDS_HEADER],
-            )
-            activities.append(activity)
-
-        return activities
+        return AllocationTable.from_frame(df, employee=PERSON_HEADER, activity=ACTIVITY_HEADER,
+                                          stream=STREAM_HEADER, activity_category=ACTIVITY_CATEGORY_HEADER,
+                                          month=DATE_HEADER, mds=MDS_HEADER, first_row=first_data_row(df),
+                                          source=self.file_path)
@@ -0,0 +1,48 @@
+# pivot.py
+
+import numpy as np
+import pandas as pd
+
+from allocaly.allocation_table import AllocationTable
+
+BY_EMPLOYEE = "employee"
+BY_STREAM = "stream"
+BY_CATEGORY = "activity_category"
+PIVOT_KEYS = [BY_EMPLOYEE, BY_STREAM, BY_CATEGORY]
+
+
+def month_range(month: np.ndarray) -> np.ndarray:
+    """ Every month from the first to the last one of `month`, as datetime64[M] """
+    allocated = month[~np.isnat(month)]
+    if len(allocated) == 0:
+        return np.array([], dtype='datetime64[M]')
+    return np.arange(allocated.min(), allocated.max() + 1)
+
+
+def man_days_by_month(table: AllocationTable, by: str = BY_EMPLOYEE) -> pd.DataFrame:
+    """ The man-days allocated to each employee, stream or category (`by`) in
+    each month.
+
+    Rows are the labels in order of first appearance, columns every month from
+    the first to the last allocated one as a monthly PeriodIndex, so months
+    without allocations show as 0. Allocations without a month or a number of
+    man-days are left out."""
+    if by not in PIVOT_KEYS:
+        raise ValueError(f"Unknown pivot key '{by}', expected one of: {', '.join(PIVOT_KEYS)}")
+    column = getattr(table, by)
+    valid = ~np.isnat(table.month) & ~np.isnan(table.mds)
+    codes, month, mds = column.codes[valid].astype(np.int64), table.month[valid], table.mds[valid]
+    columns = month_range(month)
+
+    # A cell per (label, month), the man-days summed into it in one pass
+    month_codes = (month - columns[0]).astype(np.int64) if len(columns) else codes
+    cells = codes * len(columns) + month_codes
+    sums = np.bincount(cells, weights=mds, minlength=len(column.labels) * len(columns))
+    matrix = sums.reshape(len(column.labels), len(columns))
+
+    # The labels of the allocations left, in order of first appearance
+    labels = pd.unique(codes)
+    index = pd.Index([column.labels[code] for code in labels], name=by)
+    period_index = pd.PeriodIndex(columns.astype('datetime64[ns]'), freq='M', name="month")
+    return pd.DataFrame(matrix[labels], index=index, columns=period_index)
+
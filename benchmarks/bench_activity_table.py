@@ -0,0 +1,59 @@
+# bench_activity_table.py
+#
+# Compares the heap held by a list of ActivityDTO objects with the one held by
+# an ActivityTable of the same activities, and the time the generators take to
+# build their chart frame from each.
+#
+#   python -m benchmarks.bench_activity_table [rows ...]
+
+import sys
+import time
+import tracemalloc
+
+import pandas as pd
+
+from benchmarks.synthetic_plan import synthetic_plan
+from ganttly.activity_table import ActivityTable
+from ganttly.gantt_chart_generator import to_gantt_row
+
+
+def _allocated(builder):
+    tracemalloc.start()
+    try:
+        value = builder()
+        return value, tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+
+
+def dto_frame(activities) -> pd.DataFrame:
+    """ The frame building used by the generators before the table """
+    return pd.DataFrame([{
+        'Sub Stream': row.sub_stream,
+        'Activity': row.activity,
+        'Activity Category': row.activity_category,
+        'Activity Type': row.activity_type,
+        'Start Date': row.start_date,
+        'End Date': row.end_date,
+    } for row in map(to_gantt_row, activities)])
+
+
+def _seconds(action) -> float:
+    started = time.perf_counter()
+    action()
+    return time.perf_counter() - started
+
+
+def main(sizes):
+    print(f"{'rows':>8} {'DTO MiB':>9} {'table MiB':>10} {'DTO frame s':>12} {'table frame s':>14}")
+    for rows in sizes:
+        df = synthetic_plan(rows)
+        table = ActivityTable.from_frame(df)
+        dtos, dto_bytes = _allocated(lambda: [row.to_dto() for row in table])
+        table, table_bytes = _allocated(lambda: ActivityTable.from_frame(df))
+        print(f"{rows:>8} {dto_bytes / 2 ** 20:>9.1f} {table_bytes / 2 ** 20:>10.1f} "
+              f"{_seconds(lambda: dto_frame(dtos)):>12.3f} {_seconds(table.to_gantt_frame):>14.3f}")
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or [10_000, 100_000])
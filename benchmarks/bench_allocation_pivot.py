@@ -0,0 +1,46 @@
+# bench_allocation_pivot.py
+#
+# Times the man-day matrices of a large allocation sheet, from the parsed
+# frame to the employee, stream and category tables.
+#
+#   python -m benchmarks.bench_allocation_pivot [rows [employees]]
+
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from allocaly.allocation_table import AllocationTable
+from allocaly.pivot import PIVOT_KEYS, man_days_by_month
+
+
+def synthetic_allocations(rows: int, employees: int = 500, seed: int = 42) -> pd.DataFrame:
+    """ Builds an allocation sheet shaped like the ones read from the Excel workbook """
+    rng = np.random.default_rng(seed)
+    months = pd.Timestamp("2024-01-01") + pd.to_timedelta(rng.integers(0, 24, rows) * 31, unit="D")
+    return pd.DataFrame({
+        'Persone': [f"Employee {i}" for i in rng.integers(0, employees, rows)],
+        'Attività': [f"Activity {i}" for i in rng.integers(0, rows // 4 + 1, rows)],
+        'Stream': [f"Stream {i}" for i in rng.integers(0, 80, rows)],
+        'Activity Type': rng.choice(["AFU", "ATE", "Sviluppi", "System Test", "UAT"], rows),
+        'Mese-Anno': months,
+        'Giornate': rng.integers(1, 40, rows) / 2,
+    })
+
+
+def main(rows, employees):
+    df = synthetic_allocations(rows, employees)
+    started = time.perf_counter()
+    table = AllocationTable.from_frame(df, employee='Persone', activity='Attività', stream='Stream',
+                                       activity_category='Activity Type', month='Mese-Anno', mds='Giornate')
+    print(f"{'table':>18}: {time.perf_counter() - started:6.3f}s, {len(table)} allocations")
+    for by in PIVOT_KEYS:
+        started = time.perf_counter()
+        matrix = man_days_by_month(table, by)
+        print(f"{by:>18}: {time.perf_counter() - started:6.3f}s, {matrix.shape[0]} x {matrix.shape[1]}")
+
+
+if __name__ == "__main__":
+    args = [int(arg) for arg in sys.argv[1:]]
+    main(*(args + [200_000, 500][len(args):]))
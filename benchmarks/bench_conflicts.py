@@ -0,0 +1,33 @@
+# bench_conflicts.py
+#
+# Times the over-allocation detection on growing allocation sheets split
+# across several workbooks, to check that it scales linearly with the rows.
+#
+#   python -m benchmarks.bench_conflicts [rows [workbooks]]
+
+import sys
+import time
+
+from allocaly.allocation_table import AllocationTable
+from allocaly.conflicts import Capacity, over_allocations
+from benchmarks.bench_allocation_pivot import synthetic_allocations
+
+
+def main(rows, workbooks):
+    for size in [rows // 4, rows // 2, rows]:
+        tables = [AllocationTable.from_frame(synthetic_allocations(size // workbooks, seed=seed),
+                                             employee='Persone', activity='Attività', stream='Stream',
+                                             activity_category='Activity Type', month='Mese-Anno',
+                                             mds='Giornate', source=f"workbook {seed}")
+                  for seed in range(workbooks)]
+        started = time.perf_counter()
+        table = AllocationTable.concat(tables)
+        conflicts = over_allocations(table, Capacity(default=400.0))
+        elapsed = time.perf_counter() - started
+        print(f"{len(table):>9} rows: {elapsed:6.3f}s, {elapsed / len(table) * 1e6:5.2f}us/row, "
+              f"{len(conflicts)} conflicts")
+
+
+if __name__ == "__main__":
+    args = [int(arg) for arg in sys.argv[1:]]
+    main(*(args + [400_000, 20][len(args):]))
@@ -0,0 +1,49 @@
+# bench_incremental.py
+#
+# Times a per-stream report drawn from scratch against an incremental run
+# after one sub-stream changed.
+#
+#   python -m benchmarks.bench_incremental [rows [streams]]
+
+import os
+import sys
+import tempfile
+import time
+
+from benchmarks.synthetic_plan import synthetic_plan
+from ganttly.activity_table import ActivityTable
+from ganttly.fragment_cache import FragmentCache
+from ganttly.gantt_chart_aggregator import GanttChartAggregator
+from ganttly.gantt_chart_generator import GanttChartSubStreamGenerator
+
+
+def _generators(df):
+    return [GanttChartSubStreamGenerator(activities, title=stream)
+            for stream, activities in ActivityTable.from_frame(df).group_by_sub_stream().items()]
+
+
+def _report(output, cache_dir, df) -> FragmentCache:
+    fragments = FragmentCache(output, cache_dir)
+    with GanttChartAggregator().open(output) as aggregator:
+        for chart_html in fragments.render(_generators(df)):
+            aggregator.add_rendered_chart(chart_html)
+    fragments.save()
+    return fragments
+
+
+def main(rows, streams):
+    df = synthetic_plan(rows, streams=streams)
+    edited = df.copy()
+    edited.loc[0, 'Activity'] = f"{edited.loc[0, 'Activity']} (renamed)"
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        output = os.path.join(tmp_dir, "report.html")
+        for label, plan in [("full", df), ("one stream edited", edited)]:
+            started = time.perf_counter()
+            fragments = _report(output, tmp_dir, plan)
+            print(f"{label:>18}: {time.perf_counter() - started:6.2f}s "
+                  f"({fragments.rendered} drawn, {fragments.reused} reused)")
+
+
+if __name__ == "__main__":
+    args = [int(arg) for arg in sys.argv[1:]]
+    main(*(args + [8_000, 80][len(args):]))
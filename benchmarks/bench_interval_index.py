@@ -0,0 +1,44 @@
+# bench_interval_index.py
+#
+# Compares the six-week window queries of the interval index against a scan
+# of the whole date columns, on a large plan.
+#
+#   python -m benchmarks.bench_interval_index [rows [queries]]
+
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.synthetic_plan import synthetic_plan
+from ganttly.activity_table import ActivityTable
+from ganttly.dto import ActivityTypeEnum
+from ganttly.interval_index import ActivityIntervalIndex
+
+
+def main(rows, queries):
+    table = ActivityTable.from_frame(synthetic_plan(rows, streams=500))
+    started = time.perf_counter()
+    index = ActivityIntervalIndex(table)
+    print(f"{'build':>6}: {time.perf_counter() - started:8.4f}s for {rows} activities")
+
+    rng = np.random.default_rng(42)
+    windows = [(start, start + pd.Timedelta(weeks=6))
+               for start in pd.Timestamp("2024-01-01") + pd.to_timedelta(rng.integers(0, 720, queries), unit="D")]
+    is_task = table.activity_type.values() == ActivityTypeEnum.TASK
+    ends = np.where(is_task, table.end_date, table.start_date)
+
+    def scan(start, end):
+        return np.flatnonzero((table.start_date <= np.datetime64(end)) & (ends >= np.datetime64(start)))
+
+    for label, query in [("index", index.overlapping), ("scan", scan)]:
+        started = time.perf_counter()
+        found = sum(len(query(start, end)) for start, end in windows)
+        elapsed = time.perf_counter() - started
+        print(f"{label:>6}: {elapsed / queries * 1000:8.3f}ms per query, {found / queries:,.0f} activities found")
+
+
+if __name__ == "__main__":
+    args = [int(arg) for arg in sys.argv[1:]]
+    main(*(args + [500_000, 200][len(args):]))
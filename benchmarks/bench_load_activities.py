@@ -0,0 +1,65 @@
+# bench_load_activities.py
+#
+# Measures how fast ExcelRepository turns a parsed sheet into activities.
+# The Excel parse is patched out so only the DTO building is measured.
+#
+#   python -m benchmarks.bench_load_activities [rows ...]
+
+import sys
+import time
+from unittest.mock import patch
+
+import pandas as pd
+
+from benchmarks.synthetic_plan import synthetic_plan
+from ganttly.dto import ActivityCategoryEnum, ActivityDTO, ActivityTypeEnum
+from ganttly.excel_repository import ExcelRepository
+
+
+def _linear_from_string(enum_type, value):
+    for item in enum_type:
+        if item.value == value:
+            return item
+    return enum_type.UNKNOWN
+
+
+def iterrows_baseline(df: pd.DataFrame):
+    """ The per-row loading loop used before the columnar path """
+    activities = []
+    for _, row in df.iterrows():
+        activities.append(ActivityDTO(
+            sub_stream=row['Sub Stream'],
+            activity=row['Activity'],
+            activity_category=_linear_from_string(ActivityCategoryEnum, row['Activity Category']),
+            activity_type=_linear_from_string(ActivityTypeEnum, row['Activity Type']),
+            start_date=row['Start Date'],
+            end_date=row['End Date'] if row['Activity Type'] == 'Task' else None,
+            owner=row['Owner'] if 'Owner' in df.columns else None,
+            state=row['State'] if 'State' in df.columns else None,
+            notes=row['Notes'] if 'Notes' in df.columns else None
+        ))
+    return activities
+
+
+def columnar(df: pd.DataFrame):
+    with patch('ganttly.excel_repository.pd.read_excel', return_value=df):
+        return ExcelRepository('synthetic.xlsx').load_activities()
+
+
+def _rows_per_second(loader, df: pd.DataFrame) -> float:
+    started = time.perf_counter()
+    loader(df)
+    return len(df) / (time.perf_counter() - started)
+
+
+def main(sizes):
+    print(f"{'rows':>8} {'iterrows rows/s':>16} {'columnar rows/s':>16} {'speedup':>8}")
+    for rows in sizes:
+        df = synthetic_plan(rows)
+        before = _rows_per_second(iterrows_baseline, df)
+        after = _rows_per_second(columnar, df)
+        print(f"{rows:>8} {before:>16,.0f} {after:>16,.0f} {after / before:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or [1_000, 10_000, 50_000])
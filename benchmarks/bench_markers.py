@@ -0,0 +1,50 @@
+# bench_markers.py
+#
+# Figure build time, trace count and JSON size when drawing milestone and
+# dependency markers one trace per marker versus one trace per category.
+#
+#   python -m benchmarks.bench_markers [markers ...]
+
+import sys
+import time
+
+import plotly.graph_objects as go
+
+from benchmarks.synthetic_plan import synthetic_plan
+from ganttly.gantt_chart_generator import MILESTONE_SYMBOL, GanttChartGenerator, GanttChartSubStreamGenerator
+
+
+def per_marker_traces(markers, fig: go.Figure) -> go.Figure:
+    """ The drawing loop used before markers were batched """
+    for _, marker in markers.iterrows():
+        fig.add_trace(go.Scatter(
+            x=[marker['Start Date']],
+            y=[marker['Activity']],
+            mode='markers',
+            marker=dict(symbol=MILESTONE_SYMBOL, size=GanttChartGenerator.LABEL_TEXT_SIZE, color='blue'),
+            text=marker['Activity'],
+            textposition='top center',
+            name=marker['Activity Category']
+        ))
+    return fig
+
+
+def batched_traces(markers, fig: go.Figure) -> go.Figure:
+    generator = GanttChartSubStreamGenerator([])
+    return generator._add_depenencies(markers, 'Activity', MILESTONE_SYMBOL, fig)
+
+
+def main(sizes):
+    print(f"{'markers':>8} {'drawing':>10} {'seconds':>8} {'traces':>7} {'JSON KB':>8}")
+    for size in sizes:
+        markers = synthetic_plan(size)
+        for name, draw in [("per-marker", per_marker_traces), ("batched", batched_traces)]:
+            started = time.perf_counter()
+            fig = draw(markers, go.Figure())
+            elapsed = time.perf_counter() - started
+            print(f"{size:>8} {name:>10} {elapsed:>8.2f} {len(fig.data):>7} "
+                  f"{len(fig.to_json()) / 1024:>8.0f}")
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or [100, 1_000, 3_000])
@@ -0,0 +1,31 @@
+# bench_overview.py
+#
+# Compares the chart with a row per activity against the overview chart on a
+# large plan: drawing time and size of the rendered figure.
+#
+#   python -m benchmarks.bench_overview [rows [streams]]
+
+import sys
+import time
+
+from benchmarks.synthetic_plan import synthetic_plan
+from ganttly.activity_table import ActivityTable
+from ganttly.gantt_chart_aggregator import render_chart
+from ganttly.gantt_chart_generator import GanttChartOverviewGenerator, GanttChartSubStreamGenerator
+
+
+def main(rows, streams):
+    activities = ActivityTable.from_frame(synthetic_plan(rows, streams=streams))
+    for label, generator in [("row per activity", GanttChartSubStreamGenerator(activities)),
+                             ("overview", GanttChartOverviewGenerator(activities))]:
+        started = time.perf_counter()
+        fig = generator.draw_chart()
+        chart_html = render_chart(fig, 0)
+        y_rows = len({value for trace in fig.data for value in trace.y})
+        print(f"{label:>16}: {time.perf_counter() - started:6.2f}s, {y_rows:6d} rows, "
+              f"{len(chart_html) / 1e6:6.2f} MB")
+
+
+if __name__ == "__main__":
+    args = [int(arg) for arg in sys.argv[1:]]
+    main(*(args + [50_000, 500][len(args):]))
@@ -0,0 +1,51 @@
+# bench_repositories.py
+#
+# Compares how fast each input backend loads the same plan into activities,
+# whole and filtered on one stream. Parquet is skipped without pyarrow.
+#
+#   python -m benchmarks.bench_repositories [rows]
+
+import importlib.util
+import os
+import sys
+import tempfile
+import time
+
+from benchmarks.bench_streaming_reader import write_workbook
+from benchmarks.synthetic_plan import synthetic_plan
+from ganttly.configuration import INPUT_FORMATS
+from ganttly.repository import repository_class
+
+EXTENSIONS = {"excel": ".xlsx", "csv": ".csv", "parquet": ".parquet", "sqlite": ".sqlite"}
+
+
+def timed(load) -> tuple:
+    started = time.perf_counter()
+    activities = load()
+    return len(activities), time.perf_counter() - started
+
+
+def main(rows: int):
+    df = synthetic_plan(rows)
+    one_stream = ["Stream 7"]
+    print(f"{rows} rows, filter {one_stream}")
+    print(f"{'format':>8} {'MB':>6} {'all s':>7} {'kept':>6} {'filter s':>8}")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for input_format in INPUT_FORMATS:
+            if input_format == "parquet" and importlib.util.find_spec("pyarrow") is None:
+                print(f"{input_format:>8} skipped, needs pyarrow")
+                continue
+            file_path = os.path.join(tmp_dir, f"plan{EXTENSIONS[input_format]}")
+            repository = repository_class(input_format)
+            if input_format == "excel":
+                write_workbook(df, file_path)
+            else:
+                repository.write_frame(df, file_path)
+            size = os.path.getsize(file_path) / 2 ** 20
+            _, every = timed(lambda: repository(file_path).load_activities())
+            kept, filtered = timed(lambda: repository(file_path).load_activities(one_stream))
+            print(f"{input_format:>8} {size:>6.1f} {every:>7.2f} {kept:>6} {filtered:>8.2f}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 50_000)
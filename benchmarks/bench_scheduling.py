@@ -0,0 +1,47 @@
+# bench_scheduling.py
+#
+# Times the critical path of a large plan with a chain of predecessors in
+# every stream plus links across streams: resolving the Predecessors column,
+# sorting the graph and the forward and backward passes.
+#
+#   python -m benchmarks.bench_scheduling [rows [streams]]
+
+import sys
+import time
+
+import numpy as np
+
+from benchmarks.synthetic_plan import synthetic_plan
+from ganttly.activity_table import ActivityTable
+from ganttly.scheduling import DependencyGraph, schedule
+
+
+def with_predecessors(rows, streams, seed=42):
+    """ A synthetic plan where each activity waits for the previous one of its
+    stream and, once every few rows, for an earlier activity of another stream """
+    df = synthetic_plan(rows, streams=streams, seed=seed)
+    rng = np.random.default_rng(seed)
+    previous = df.groupby('Sub Stream')['Activity'].shift()
+    across = rng.integers(0, np.arange(1, rows + 1))
+    cross_stream = df['Sub Stream'].to_numpy()[across] + "/" + df['Activity'].to_numpy()[across]
+    predecessors = previous.fillna("").to_numpy(dtype=object)
+    linked = (rng.random(rows) < 0.3) & (across < np.arange(rows))
+    predecessors[linked] = predecessors[linked] + ";" + cross_stream[linked]
+    df['Predecessors'] = predecessors
+    return df
+
+
+def main(rows, streams):
+    table = ActivityTable.from_frame(with_predecessors(rows, streams))
+    started = time.perf_counter()
+    graph = DependencyGraph.from_table(table)
+    resolved = time.perf_counter()
+    result = schedule(table, graph)
+    done = time.perf_counter()
+    print(f"{len(table)} activities, {len(graph.sources)} edges: graph {resolved - started:.3f}s, "
+          f"schedule {done - resolved:.3f}s, {int(result.critical.sum())} critical")
+
+
+if __name__ == "__main__":
+    args = [int(arg) for arg in sys.argv[1:]]
+    main(*(args + [50_000, 500][len(args):]))
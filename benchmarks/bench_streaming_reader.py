@@ -0,0 +1,65 @@
+# bench_streaming_reader.py
+#
+# Compares time and peak Python memory of reading one stream out of a large
+# workbook with pd.read_excel, the streaming read-only reader, and the
+# streaming reader using the persisted sub-stream row-range index.
+#
+#   python -m benchmarks.bench_streaming_reader [rows]
+
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import openpyxl
+import pandas as pd
+
+from benchmarks.synthetic_plan import synthetic_plan
+from ganttly.excel_repository import ExcelRepository
+from ganttly.workbook_cache import WorkbookCache
+
+
+def write_workbook(df: pd.DataFrame, file_path: str):
+    """ Writes with openpyxl's write-only mode, which is much faster than to_excel """
+    workbook = openpyxl.Workbook(write_only=True)
+    sheet = workbook.create_sheet("Sheet1")
+    sheet.append(list(df.columns))
+    for row in df.itertuples(index=False):
+        sheet.append([None if pd.isna(value) else value for value in row])
+    workbook.save(file_path)
+
+
+def measure(load):
+    tracemalloc.start()
+    started = time.perf_counter()
+    activities = load()
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return len(activities), elapsed, peak
+
+
+def main(rows: int):
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        file_path = os.path.join(tmp_dir, "plan.xlsx")
+        write_workbook(synthetic_plan(rows), file_path)
+        one_stream = ["Stream 7"]
+
+        print(f"{rows} rows, filter {one_stream}")
+        print(f"{'reader':>10} {'kept':>6} {'seconds':>8} {'peak MB':>8}")
+        for name, streaming in [("read_excel", False), ("streaming", True)]:
+            repository = ExcelRepository(file_path, streaming=streaming)
+            kept, elapsed, peak = measure(lambda: repository.load_activities(one_stream))
+            print(f"{name:>10} {kept:>6} {elapsed:>8.2f} {peak / 2 ** 20:>8.1f}")
+
+        repository = ExcelRepository(file_path, streaming=True,
+                                     cache=WorkbookCache(os.path.join(tmp_dir, "cache")))
+        # the first filtered run builds the index, a run on another stream uses it
+        repository.load_activities(["Stream 3"])
+        kept, elapsed, peak = measure(lambda: repository.load_activities(one_stream))
+        print(f"{'indexed':>10} {kept:>6} {elapsed:>8.2f} {peak / 2 ** 20:>8.1f}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20_000)
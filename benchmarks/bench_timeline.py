@@ -0,0 +1,53 @@
+# bench_timeline.py
+#
+# Side by side build time and serialized size of the gantt bars drawn with
+# plotly.express.timeline and with ganttly.timeline.
+#
+#   python -m benchmarks.bench_timeline [rows ...]
+
+import sys
+import time
+
+import plotly.express as px
+
+from benchmarks.synthetic_plan import synthetic_plan
+from ganttly.dto import ActivityCategoryEnum
+from ganttly.gantt_chart_generator import color_from_activity_category
+from ganttly.timeline import timeline
+
+CATEGORY_ORDER = [e.value for e in ActivityCategoryEnum.get_ordered()]
+
+
+def with_plotly_express(df):
+    return px.timeline(df, x_start="Start Date", x_end="End Date", y="Activity",
+                       color="Activity Category", text="Activity",
+                       category_orders={"Activity Category": CATEGORY_ORDER},
+                       color_discrete_map=color_from_activity_category())
+
+
+def with_graph_objects(df):
+    return timeline(df, "Start Date", "End Date", "Activity", "Activity Category",
+                    text="Activity", category_order=CATEGORY_ORDER,
+                    color_map=color_from_activity_category())
+
+
+def _best_of(build, df, repeat=3):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fig = build(df)
+        timings.append(time.perf_counter() - started)
+    return min(timings), fig
+
+
+def main(sizes):
+    print(f"{'rows':>8} {'builder':>14} {'build ms':>9} {'JSON KB':>8}")
+    for rows in sizes:
+        df = synthetic_plan(rows)
+        for name, build in [("px.timeline", with_plotly_express), ("go.Bar", with_graph_objects)]:
+            elapsed, fig = _best_of(build, df)
+            print(f"{rows:>8} {name:>14} {elapsed * 1000:>9.1f} {len(fig.to_json()) / 1024:>8.0f}")
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or [100, 1_000, 10_000])
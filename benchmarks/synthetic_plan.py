@@ -0,0 +1,30 @@
+# synthetic_plan.py
+
+import numpy as np
+import pandas as pd
+
+from ganttly.dto import ActivityCategoryEnum, ActivityTypeEnum
+
+TYPES = [ActivityTypeEnum.TASK.value] * 6 + [
+    ActivityTypeEnum.MILESTONE.value,
+    ActivityTypeEnum.DEPENDENCY.value,
+]
+
+
+def synthetic_plan(rows: int, streams: int = 80, seed: int = 42) -> pd.DataFrame:
+    """ Builds a plan shaped like the ones read from the Excel sheet """
+    rng = np.random.default_rng(seed)
+    categories = [e.value for e in ActivityCategoryEnum.get_ordered()]
+    start = pd.Timestamp("2024-01-01") + pd.to_timedelta(rng.integers(0, 720, rows), unit="D")
+    duration = pd.to_timedelta(rng.integers(1, 90, rows), unit="D")
+    return pd.DataFrame({
+        'Sub Stream': [f"Stream {i}" for i in rng.integers(0, streams, rows)],
+        'Activity': [f"Activity {i}" for i in range(rows)],
+        'Activity Category': rng.choice(categories, rows),
+        'Activity Type': rng.choice(TYPES, rows),
+        'Start Date': start,
+        'End Date': start + duration,
+        'Owner': rng.choice(["Mario", "Emanuelo", "Vittoriana"], rows),
+        'State': rng.choice(["Open", "Closed"], rows),
+        'Notes': None,
+    })
@@ -1,24 +1,32 @@
 # activity_service.py
 
-from collections import defaultdict
-from ganttly.excel_repository import ExcelRepository
-from ganttly.dto import ActivityDTO
+from ganttly.activity_store import ActivityStore
+from ganttly.repository import ActivityRepository
+from ganttly.activity_table import ActivityTable
+from ganttly.interval_index import DateWindow
 from typing import Dict, List, Optional
 
 
 class ActivityService:
-    def __init__(self, repository: ExcelRepository):
+    def __init__(self, repository: ActivityRepository, store: Optional[ActivityStore] = None):
         self.repository = repository
+        self.store = store if store is not None else ActivityStore()
 
-    def get_all_activities(self) -> List[ActivityDTO]:
-        return self.repository.load_activities()
+    def get_all_activities(self) -> ActivityTable:
+        return self.store.get(self.repository)
 
-    def get_activities(self, sub_stream_filter: Optional[List[str]] = None) -> List[ActivityDTO]:
-        return self.repository.load_activities(sub_stream_filter=sub_stream_filter)
+    def get_plan(self, sub_stream_filter: Optional[List[str]] = None) -> ActivityTable:
+        """ Every activity, stopped only by the errors of the filtered sub-streams and of what they wait for """
+        return self.store.get_plan(self.repository, sub_stream_filter)
 
-    def get_activities_by_stream(self, sub_stream_filter: Optional[List[str]] = None) -> Dict[str, List[ActivityDTO]]:
-        grouped_activities = defaultdict(list)
-        activities = self.repository.load_activities(sub_stream_filter)
-        for activity in activities:
-            grouped_activities[activity.sub_stream].append(activity)
-        return {k: v for k, v in grouped_activities.items()}
+    def get_activities(self, sub_stream_filter: Optional[List[str]] = None,
+                       window: Optional[DateWindow] = None) -> ActivityTable:
+        return self.store.get(self.repository, sub_stream_filter, window)
+
+    def get_activities_by_stream(self, sub_stream_filter: Optional[List[str]] = None,
+                                 window: Optional[DateWindow] = None) -> Dict[str, ActivityTable]:
+        return self.store.get_by_stream(self.repository, sub_stream_filter, window)
+
+    def invalidate(self):
+        """ Forgets the loaded activities, so the next call reads the repository again """
+        self.store.invalidate(self.repository)
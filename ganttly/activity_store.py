@@ -0,0 +1,205 @@
+# activity_store.py
+
+import threading
+from collections import OrderedDict
+from typing import Dict, FrozenSet, Hashable, Optional, Sequence
+
+import numpy as np
+
+from ganttly.activity_table import ActivityTable
+from ganttly.interval_index import ActivityIntervalIndex, DateWindow, clip_to_window
+from ganttly.scheduling import DependencyGraph
+from ganttly.validation import PlanValidationError, ValidationReport
+
+
+def _requested_streams(sub_stream_filter: Optional[Sequence[str]]) -> Optional[FrozenSet[str]]:
+    # An empty filter means "every sub-stream", as in the repositories
+    return frozenset(sub_stream_filter) if sub_stream_filter else None
+
+
+class _Dataset:
+    """ The activities loaded from one repository, indexed lazily by sub-stream and by date.
+
+    The plan is validated once, when loaded. Its errors only stop the views
+    holding the rows in error, so a report filtered to valid sub-streams is
+    drawn whatever the errors of the others """
+
+    def __init__(self, activities: ActivityTable, streams: Optional[FrozenSet[str]],
+                 report: Optional[ValidationReport] = None):
+        self.activities = activities
+        # None when the whole sheet was loaded
+        self.streams = streams
+        # The errors of the loaded activities, None when there are none
+        self.report = report if report is not None and not report.is_valid else None
+        self._index: Optional[Dict[str, np.ndarray]] = None
+        self._intervals: Optional[ActivityIntervalIndex] = None
+
+    def covers(self, requested: Optional[FrozenSet[str]]) -> bool:
+        if self.streams is None:
+            return True
+        return requested is not None and requested <= self.streams
+
+    @property
+    def table(self) -> ActivityTable:
+        # Repositories returning plain activity lists are converted on first use
+        if not isinstance(self.activities, ActivityTable):
+            self.activities = ActivityTable.from_activities(self.activities)
+        return self.activities
+
+    @property
+    def index(self) -> Dict[str, np.ndarray]:
+        """ Positions of the activities of each sub-stream, in sheet order """
+        if self._index is None:
+            self._index = self.table.positions_by_sub_stream()
+        return self._index
+
+    @property
+    def intervals(self) -> ActivityIntervalIndex:
+        """ Date index of the activities, built on the first window query """
+        if self._intervals is None:
+            self._intervals = ActivityIntervalIndex(self.table)
+        return self._intervals
+
+    def in_window(self, window: DateWindow) -> np.ndarray:
+        """ Whether each activity runs in the window """
+        mask = np.zeros(len(self.table), dtype=bool)
+        mask[self.intervals.overlapping(*window)] = True
+        return mask
+
+    def check(self, positions: Optional[np.ndarray] = None):
+        """ Raises PlanValidationError with the errors of the activities at
+        `positions`, or of all of them when omitted """
+        if self.report is None:
+            return
+        report = self.report if positions is None else self.report.for_rows(self.table.row_number[positions])
+        if not report.is_valid:
+            raise PlanValidationError(report)
+
+    def positions(self, requested: Optional[FrozenSet[str]]) -> np.ndarray:
+        """ Positions of the activities of the requested sub-streams, in sheet order """
+        if requested is None or requested == self.streams:
+            return np.arange(len(self.table))
+        selected = [self.index[stream] for stream in requested if stream in self.index]
+        return np.sort(np.concatenate(selected)) if selected else np.array([], dtype=np.intp)
+
+    def select(self, requested: Optional[FrozenSet[str]], window: Optional[DateWindow] = None) -> ActivityTable:
+        if requested == self.streams and window is None:
+            self.check()
+            return self.activities
+        positions = self.positions(requested)
+        self.check(positions)
+        if window is None:
+            return self.table.take(positions)
+        return clip_to_window(self.table, positions[self.in_window(window)[positions]], *window)
+
+    def group(self, requested: Optional[FrozenSet[str]],
+              window: Optional[DateWindow] = None) -> Dict[str, ActivityTable]:
+        streams = {stream: positions for stream, positions in self.index.items()
+                   if requested is None or stream in requested}
+        self.check(self.positions(requested))
+        if window is None:
+            return {stream: self.table.take(positions) for stream, positions in streams.items()}
+        # The streams with nothing in the window are left out
+        in_window = self.in_window(window)
+        return {stream: clip_to_window(self.table, positions[in_window[positions]], *window)
+                for stream, positions in streams.items() if in_window[positions].any()}
+
+
+class ActivityStore:
+    """ In-memory store of the activities read through the repositories.
+
+    A repository is read once and the views requested afterwards, filtered or
+    grouped by sub-stream, are served from the loaded activities. A filter that
+    is not covered by what was loaded reloads the union of the two.
+    The date index of the window queries is built once per loaded dataset.
+    The store keeps at most `max_rows` activities across repositories and
+    evicts the least recently used ones first; the dataset in use is always
+    kept, even when it alone exceeds the budget."""
+
+    DEFAULT_MAX_ROWS = 500_000
+
+    def __init__(self, max_rows: int = DEFAULT_MAX_ROWS):
+        self.max_rows = max_rows
+        self._datasets: "OrderedDict[Hashable, _Dataset]" = OrderedDict()
+        self._lock = threading.RLock()
+
+    def get(self, repository, sub_stream_filter: Optional[Sequence[str]] = None,
+            window: Optional[DateWindow] = None) -> ActivityTable:
+        """ The activities of the filtered sub-streams; with a (from, to)
+        `window`, only those running in it, with the tasks cut at its bounds """
+        requested = _requested_streams(sub_stream_filter)
+        with self._lock:
+            return self._dataset(repository, sub_stream_filter).select(requested, window)
+
+    def get_by_stream(self, repository, sub_stream_filter: Optional[Sequence[str]] = None,
+                      window: Optional[DateWindow] = None) -> Dict[str, ActivityTable]:
+        requested = _requested_streams(sub_stream_filter)
+        with self._lock:
+            return self._dataset(repository, sub_stream_filter).group(requested, window)
+
+    def get_plan(self, repository, sub_stream_filter: Optional[Sequence[str]] = None) -> ActivityTable:
+        """ Every activity of the plan, for the work spanning the sub-streams
+        such as the critical path. Only the errors of the filtered sub-streams
+        and of the activities they wait for, directly or not, stop it """
+        requested = _requested_streams(sub_stream_filter)
+        with self._lock:
+            dataset = self._dataset(repository, None)
+            if requested is None:
+                dataset.check()
+            elif dataset.report is not None:
+                graph = DependencyGraph.from_table(dataset.table)
+                dataset.check(graph.with_predecessors(dataset.positions(requested)))
+            return dataset.table
+
+    def invalidate(self, repository=None):
+        """ Drops the activities of `repository`, or of every repository when omitted """
+        with self._lock:
+            if repository is None:
+                self._datasets.clear()
+            else:
+                self._datasets.pop(self._key(repository), None)
+
+    @property
+    def row_count(self) -> int:
+        with self._lock:
+            return sum(len(dataset.activities) for dataset in self._datasets.values())
+
+    @staticmethod
+    def _key(repository) -> Hashable:
+        return (type(repository).__name__,
+                getattr(repository, 'file_path', id(repository)),
+                getattr(repository, 'sheet_name', None))
+
+    def _dataset(self, repository, sub_stream_filter: Optional[Sequence[str]]) -> _Dataset:
+        key = self._key(repository)
+        requested = _requested_streams(sub_stream_filter)
+        dataset = self._datasets.get(key)
+        if dataset is None or not dataset.covers(requested):
+            if dataset is not None and dataset.streams is not None and requested is not None:
+                # Widen the loaded set rather than trading one filter for another
+                requested = requested | dataset.streams
+                sub_stream_filter = sorted(requested)
+            else:
+                sub_stream_filter = sub_stream_filter or None
+            try:
+                activities, report = repository.load_activities(sub_stream_filter=sub_stream_filter), None
+            except PlanValidationError as e:
+                if e.activities is None:
+                    raise
+                # Kept with their errors, raised by the views holding them
+                activities, report = e.activities, e.report
+            dataset = _Dataset(activities, requested, report)
+            self._datasets[key] = dataset
+            self._evict(keep=key)
+        self._datasets.move_to_end(key)
+        return dataset
+
+    def _evict(self, keep: Hashable):
+        if len(self._datasets) < 2:
+            return
+        rows = sum(len(dataset.activities) for dataset in self._datasets.values())
+        for key in list(self._datasets):
+            if rows <= self.max_rows:
+                break
+            if key != keep:
+                rows -= len(self._datasets.pop(key).activities)
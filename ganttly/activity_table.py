@@ -0,0 +1,298 @@
+# activity_table.py
+
+import hashlib
+from typing import Callable, Dict, Hashable, Iterable, Iterator, List, Optional, Sequence, Union
+
+import numpy as np
+import pandas as pd
+
+from ganttly.dto import ActivityCategoryEnum, ActivityDTO, ActivityTypeEnum
+
+# Sheet row of the first activity, under the header row
+FIRST_DATA_ROW = 2
+# Key of the attrs where the readers finding the header lower in the sheet keep its row
+HEADER_ROW_ATTR = "header_row"
+
+
+class DictionaryColumn:
+    """ A column stored as integer codes into a list of distinct labels """
+
+    __slots__ = ('codes', 'labels')
+
+    def __init__(self, codes: np.ndarray, labels: Sequence):
+        self.codes = codes
+        self.labels = list(labels)
+
+    @staticmethod
+    def encode(values: Union[Sequence, pd.Series, np.ndarray]) -> 'DictionaryColumn':
+        codes, labels = pd.factorize(pd.Series(values, dtype=object), use_na_sentinel=False)
+        return DictionaryColumn(codes.astype(np.int32), labels.tolist())
+
+    def map_labels(self, mapping: Callable[[Hashable], Hashable]) -> 'DictionaryColumn':
+        """ Applies `mapping` once per label, merging the labels mapped to the same value """
+        mapped = DictionaryColumn.encode([mapping(label) for label in self.labels])
+        return DictionaryColumn(mapped.codes[self.codes], mapped.labels)
+
+    def take(self, positions: np.ndarray) -> 'DictionaryColumn':
+        return DictionaryColumn(self.codes[positions], self.labels)
+
+    def values(self) -> np.ndarray:
+        labels = np.empty(len(self.labels), dtype=object)
+        labels[:] = self.labels
+        return labels[self.codes]
+
+    def positions_by_label(self) -> Dict[Hashable, np.ndarray]:
+        """ The positions holding each label, labels in order of first appearance """
+        order = np.argsort(self.codes, kind='stable')
+        codes, starts = np.unique(self.codes[order], return_index=True)
+        groups = dict(zip(codes.tolist(), np.split(order, starts[1:])))
+        first_seen = sorted(groups, key=lambda code: groups[code][0])
+        return {self.labels[code]: groups[code] for code in first_seen}
+
+    def __getitem__(self, position: int):
+        return self.labels[self.codes[position]]
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+
+def first_data_row(df: pd.DataFrame) -> int:
+    """ The sheet row at 0 in the index of a frame read from a sheet """
+    return df.attrs.get(HEADER_ROW_ATTR, FIRST_DATA_ROW - 1) + 1
+
+
+def object_array(values) -> np.ndarray:
+    """ A 1-d object array of `values`, even when they are sequences themselves """
+    array = np.empty(len(values), dtype=object)
+    array[:] = list(values)
+    return array
+
+
+def _datetime_array(values) -> np.ndarray:
+    return pd.to_datetime(pd.Series(values, dtype=object), errors='coerce').to_numpy(dtype='datetime64[ns]')
+
+
+def _label_values(column: DictionaryColumn) -> np.ndarray:
+    # Enum members read as the text of the sheet
+    return column.map_labels(lambda label: getattr(label, 'value', label)).values()
+
+
+def _timestamp(value: np.datetime64) -> Optional[pd.Timestamp]:
+    return None if np.isnat(value) else pd.Timestamp(value)
+
+
+class _DictionaryField:
+    def __init__(self, name: str):
+        self.name = name
+
+    def __get__(self, row: 'ActivityRow', owner=None):
+        return getattr(row._table, self.name)[row._position]
+
+
+class _DateField(_DictionaryField):
+    def __get__(self, row: 'ActivityRow', owner=None):
+        return _timestamp(getattr(row._table, self.name)[row._position])
+
+
+class ActivityRow:
+    """ Read-only view of one activity of an `ActivityTable`.
+
+    Exposes the same attributes as `ActivityDTO`; missing dates read as None."""
+
+    __slots__ = ('_table', '_position')
+
+    sub_stream = _DictionaryField('sub_stream')
+    activity = _DictionaryField('activity')
+    activity_category = _DictionaryField('activity_category')
+    activity_type = _DictionaryField('activity_type')
+    start_date = _DateField('start_date')
+    end_date = _DateField('end_date')
+    owner = _DictionaryField('owner')
+    state = _DictionaryField('state')
+    notes = _DictionaryField('notes')
+    predecessors = _DictionaryField('predecessors')
+
+    def __init__(self, table: 'ActivityTable', position: int):
+        self._table = table
+        self._position = position
+
+    def to_dto(self) -> ActivityDTO:
+        return ActivityDTO(
+            sub_stream=self.sub_stream,
+            activity=self.activity,
+            activity_category=self.activity_category,
+            activity_type=self.activity_type,
+            start_date=self.start_date,
+            end_date=self.end_date,
+            owner=self.owner,
+            state=self.state,
+            notes=self.notes,
+            predecessors=self.predecessors,
+        )
+
+    def __repr__(self) -> str:
+        return f"ActivityRow({self.to_dto()!r})"
+
+
+class ActivityTable:
+    """ Column-oriented collection of activities.
+
+    Dates are datetime64 arrays and sub-stream, category and type are
+    dictionary encoded, so a table holds a few arrays instead of one object per
+    activity. It behaves as a sequence of `ActivityRow` views for the callers
+    that work on single activities."""
+
+    def __init__(self,
+                 sub_stream: DictionaryColumn,
+                 activity: np.ndarray,
+                 activity_category: DictionaryColumn,
+                 activity_type: DictionaryColumn,
+                 start_date: np.ndarray,
+                 end_date: np.ndarray,
+                 owner: np.ndarray,
+                 state: np.ndarray,
+                 notes: np.ndarray,
+                 row_number: Optional[np.ndarray] = None,
+                 predecessors: Optional[np.ndarray] = None):
+        self.sub_stream = sub_stream
+        self.activity = activity
+        self.activity_category = activity_category
+        self.activity_type = activity_type
+        self.start_date = start_date
+        self.end_date = end_date
+        self.owner = owner
+        self.state = state
+        self.notes = notes
+        # The sheet row of each activity, or its 1-based position when it was not read from a sheet
+        self.row_number = row_number if row_number is not None else np.arange(1, len(start_date) + 1)
+        # The text of the optional Predecessors column
+        self.predecessors = predecessors if predecessors is not None else np.full(len(start_date), None, dtype=object)
+
+    @staticmethod
+    def from_frame(df: pd.DataFrame, first_row: int = FIRST_DATA_ROW) -> 'ActivityTable':
+        """ Builds the table from the columns of the plan sheet.
+        The end date is kept for tasks only, and the sheet rows are taken from
+        the frame index, where `first_row` is at 0 """
+        size = len(df)
+
+        def optional_column(column: str) -> np.ndarray:
+            if column in df.columns:
+                return object_array(df[column].tolist())
+            return np.full(size, None, dtype=object)
+
+        activity_type = DictionaryColumn.encode(df['Activity Type']).map_labels(ActivityTypeEnum.from_string)
+        is_task = activity_type.values() == ActivityTypeEnum.TASK
+        end_date = _datetime_array(df['End Date'])
+        end_date[~is_task] = np.datetime64('NaT')
+
+        return ActivityTable(
+            sub_stream=DictionaryColumn.encode(df['Sub Stream']),
+            activity=object_array(df['Activity'].tolist()),
+            activity_category=DictionaryColumn.encode(df['Activity Category']).map_labels(
+                ActivityCategoryEnum.from_string),
+            activity_type=activity_type,
+            start_date=_datetime_array(df['Start Date']),
+            end_date=end_date,
+            owner=optional_column('Owner'),
+            state=optional_column('State'),
+            notes=optional_column('Notes'),
+            row_number=df.index.to_numpy(dtype=np.int64) + first_row,
+            predecessors=optional_column('Predecessors'),
+        )
+
+    @staticmethod
+    def from_activities(activities: Iterable[Union[ActivityDTO, ActivityRow]]) -> 'ActivityTable':
+        activities = list(activities)
+
+        def column(name: str) -> List:
+            return [getattr(activity, name) for activity in activities]
+
+        return ActivityTable(
+            sub_stream=DictionaryColumn.encode(column('sub_stream')),
+            activity=object_array(column('activity')),
+            activity_category=DictionaryColumn.encode(column('activity_category')),
+            activity_type=DictionaryColumn.encode(column('activity_type')),
+            start_date=_datetime_array(column('start_date')),
+            end_date=_datetime_array(column('end_date')),
+            owner=object_array(column('owner')),
+            state=object_array(column('state')),
+            notes=object_array(column('notes')),
+            predecessors=object_array([getattr(activity, 'predecessors', None) for activity in activities]),
+        )
+
+    @staticmethod
+    def coerce(activities: Union['ActivityTable', Iterable[ActivityDTO]]) -> 'ActivityTable':
+        if isinstance(activities, ActivityTable):
+            return activities
+        return ActivityTable.from_activities(activities)
+
+    def take(self, positions: Union[Sequence[int], np.ndarray]) -> 'ActivityTable':
+        positions = np.asarray(positions, dtype=np.intp)
+        return ActivityTable(
+            sub_stream=self.sub_stream.take(positions),
+            activity=self.activity[positions],
+            activity_category=self.activity_category.take(positions),
+            activity_type=self.activity_type.take(positions),
+            start_date=self.start_date[positions],
+            end_date=self.end_date[positions],
+            owner=self.owner[positions],
+            state=self.state[positions],
+            notes=self.notes[positions],
+            row_number=self.row_number[positions],
+            predecessors=self.predecessors[positions],
+        )
+
+    def positions_by_sub_stream(self) -> Dict[str, np.ndarray]:
+        return self.sub_stream.positions_by_label()
+
+    def group_by_sub_stream(self) -> Dict[str, 'ActivityTable']:
+        return {stream: self.take(positions)
+                for stream, positions in self.positions_by_sub_stream().items()}
+
+    def categories(self) -> List:
+        """ The activity categories present in the table """
+        present = np.unique(self.activity_category.codes)
+        return [self.activity_category.labels[code] for code in present]
+
+    def to_gantt_frame(self) -> pd.DataFrame:
+        """ The columns drawn by the chart generators, as `to_gantt_row` builds them """
+        sub_stream = pd.Series(self.sub_stream.values(), dtype=object)
+        return pd.DataFrame({
+            'Sub Stream': sub_stream,
+            'Activity': sub_stream.astype(str) + "-" + pd.Series(self.activity, dtype=object).astype(str),
+            'Activity Category': _label_values(self.activity_category),
+            'Activity Type': _label_values(self.activity_type),
+            'Start Date': pd.Series(self.start_date),
+            'End Date': pd.Series(self.end_date),
+        })
+
+    def content_hash(self) -> str:
+        """ Digest of every value of the table, in row order.
+        Tables holding the same activities hash the same whatever their encoding """
+        frame = pd.DataFrame({
+            'sub_stream': self.sub_stream.values(),
+            'activity': self.activity,
+            'activity_category': _label_values(self.activity_category),
+            'activity_type': _label_values(self.activity_type),
+            'start_date': self.start_date,
+            'end_date': self.end_date,
+            'owner': self.owner,
+            'state': self.state,
+            'notes': self.notes,
+            'predecessors': self.predecessors,
+        })
+        row_hashes = pd.util.hash_pandas_object(frame, index=False).to_numpy()
+        return hashlib.sha256(row_hashes.tobytes()).hexdigest()
+
+    def __len__(self) -> int:
+        return len(self.start_date)
+
+    def __getitem__(self, position: int) -> ActivityRow:
+        if position < 0:
+            position += len(self)
+        if not 0 <= position < len(self):
+            raise IndexError("activity index out of range")
+        return ActivityRow(self, position)
+
+    def __iter__(self) -> Iterator[ActivityRow]:
+        return (ActivityRow(self, position) for position in range(len(self)))
@@ -0,0 +1,195 @@
+# batch.py
+
+import dataclasses
+import json
+import os
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Iterable, Iterator, List, Optional, Sequence
+
+from ganttly.configuration import GanttlyConfiguration
+from ganttly.gantly_command import GanttlyCommandFactory
+
+# Settings a manifest entry can give besides its file
+MANIFEST_SETTINGS = ["sheet", "output", "filter", "per_stream", "group_per_activity", "hide_legend", "hide_title",
+                     "overview", "max_rows", "critical_path", "input_format"]
+
+
+@dataclass
+class BatchJob:
+    file_path: str
+    config: GanttlyConfiguration
+
+    @property
+    def label(self) -> str:
+        return f"{os.path.basename(self.file_path)} [{self.config.sheet}]"
+
+
+@dataclass
+class BatchResult:
+    job: BatchJob
+    rows: int = 0
+    charts: int = 0
+    seconds: float = 0.0
+    error: Optional[str] = None
+    # The rendered charts, when the job feeds a combined report
+    fragments: List[str] = field(default_factory=list)
+
+
+@dataclass
+class BatchSummary:
+    results: List[BatchResult]
+    seconds: float
+
+    @property
+    def failed(self) -> List[BatchResult]:
+        return [result for result in self.results if result.error is not None]
+
+    @property
+    def rows(self) -> int:
+        return sum(result.rows for result in self.results)
+
+    @property
+    def charts(self) -> int:
+        return sum(result.charts for result in self.results)
+
+    def describe(self) -> str:
+        seconds = max(self.seconds, 1e-9)
+        lines = [f"{result.job.label}: "
+                 + (f"error: {result.error}" if result.error is not None
+                    else f"{result.rows} rows, {result.charts} charts in {result.seconds:.2f}s")
+                 for result in self.results]
+        lines.append(f"{len(self.results)} inputs ({len(self.failed)} failed), {self.rows} rows, "
+                     f"{self.charts} charts in {self.seconds:.2f}s: "
+                     f"{len(self.results) / seconds:.2f} files/s, {self.rows / seconds:,.0f} rows/s")
+        return "\n".join(lines)
+
+
+def jobs_for_files(file_paths: Sequence[str], sheets: Sequence[str], defaults: GanttlyConfiguration,
+                   output_dir: str = ".") -> List[BatchJob]:
+    """ One job per file and sheet, each writing `<file name>[-<sheet>].html` in `output_dir` """
+    sheets = list(sheets) or [defaults.sheet]
+    jobs = []
+    for file_path in file_paths:
+        stem = os.path.splitext(os.path.basename(file_path))[0]
+        for sheet in sheets:
+            name = f"{stem}-{sheet}.html" if len(sheets) > 1 else f"{stem}.html"
+            jobs.append(BatchJob(file_path, dataclasses.replace(
+                defaults, sheet=sheet, output=os.path.join(output_dir, name))))
+    return _checked(jobs)
+
+
+def load_manifest(manifest_path: str, defaults: GanttlyConfiguration, output_dir: str = ".") -> List[BatchJob]:
+    """ Reads the jobs of a JSON manifest: a list of entries with a `file` and
+    any of the MANIFEST_SETTINGS. Relative files are read from the manifest's
+    directory and relative outputs are written to `output_dir` """
+    with open(manifest_path, encoding="utf-8") as f:
+        entries = json.load(f)
+    if not isinstance(entries, list):
+        raise ValueError(f"The manifest {manifest_path} must hold a list of entries")
+    base_dir = os.path.dirname(os.path.abspath(manifest_path))
+    jobs = []
+    for position, entry in enumerate(entries, start=1):
+        if not isinstance(entry, dict) or "file" not in entry:
+            raise ValueError(f"Entry {position} of {manifest_path} has no 'file'")
+        unknown = sorted(set(entry) - {"file", *MANIFEST_SETTINGS})
+        if unknown:
+            raise ValueError(f"Entry {position} of {manifest_path} has unknown settings: {', '.join(unknown)}")
+        file_path = os.path.join(base_dir, entry["file"])
+        settings = {name: entry[name] for name in MANIFEST_SETTINGS if name in entry}
+        if "output" not in settings:
+            stem = os.path.splitext(os.path.basename(file_path))[0]
+            sheet = settings.get("sheet")
+            settings["output"] = f"{stem}-{sheet}.html" if sheet else f"{stem}.html"
+        settings["output"] = os.path.join(output_dir, settings["output"])
+        jobs.append(BatchJob(file_path, dataclasses.replace(defaults, **settings)))
+    return _checked(jobs)
+
+
+def _checked(jobs: List[BatchJob]) -> List[BatchJob]:
+    outputs = [os.path.abspath(job.config.output) for job in jobs]
+    duplicates = sorted({output for output in outputs if outputs.count(output) > 1})
+    if duplicates:
+        raise ValueError(f"Several inputs would write the same report: {', '.join(duplicates)}")
+    return jobs
+
+
+def run_job(job: BatchJob, combined: bool = False, key: str = "") -> BatchResult:
+    """ Renders the report of one job, or only its charts when they go to a combined report.
+    Failing inputs are reported in the result rather than raised """
+    from ganttly.gantt_chart_aggregator import render_chart
+
+    started = time.perf_counter()
+    result = BatchResult(job)
+    try:
+        command = GanttlyCommandFactory(job.file_path, job.config).create()
+        if combined:
+            result.fragments = [render_chart(chart, f"{key}-{position}")
+                                for position, chart in enumerate(command.draw_charts())]
+            result.charts = len(result.fragments)
+        else:
+            command.execute()
+            result.charts = command.aggregator.charts_written
+        result.rows = command.service.store.row_count
+    except (ValueError, OSError, zipfile.BadZipFile) as e:
+        result.error = str(e)
+    except Exception as e:
+        # Any other failure of one input, e.g. a cell plotly cannot draw, must not stop the batch
+        result.error = f"{type(e).__name__}: {e}"
+    result.seconds = time.perf_counter() - started
+    return result
+
+
+def _run_indexed_job(arguments) -> BatchResult:
+    index, job, combined = arguments
+    return run_job(job, combined, key=str(index))
+
+
+def _warm_up():
+    # Each worker imports the data and plotting stack once, not once per job
+    import ganttly.excel_repository  # noqa: F401
+    import ganttly.repository  # noqa: F401
+    import ganttly.gantt_chart_generator  # noqa: F401
+
+
+def run_jobs(jobs: Sequence[BatchJob], workers: int = 1, combined: bool = False) -> Iterator[BatchResult]:
+    """ Runs the jobs in a pool of `workers` processes, yielding the results in job order """
+    arguments = [(index, dataclasses.replace(job, config=dataclasses.replace(job.config, jobs=1)), combined)
+                 for index, job in enumerate(jobs)]
+    if workers <= 1 or len(jobs) <= 1:
+        yield from map(_run_indexed_job, arguments)
+        return
+    with ProcessPoolExecutor(max_workers=min(workers, len(jobs)), initializer=_warm_up) as executor:
+        yield from executor.map(_run_indexed_job, arguments)
+
+
+def run_batch(jobs: Sequence[BatchJob], workers: int = 1,
+              combined_output: Optional[str] = None,
+              include_plotlyjs: Optional[str] = None) -> BatchSummary:
+    """ Renders one report per job, or a single report at `combined_output`
+    with a section per job, in the job order """
+    started = time.perf_counter()
+    if combined_output is None:
+        results = list(run_jobs(jobs, workers))
+    else:
+        results = _write_combined(run_jobs(jobs, workers, combined=True), combined_output,
+                                  include_plotlyjs or GanttlyConfiguration().include_plotlyjs)
+    return BatchSummary(results, time.perf_counter() - started)
+
+
+def _write_combined(results: Iterable[BatchResult], output_file: str, include_plotlyjs: str) -> List[BatchResult]:
+    from ganttly.gantt_chart_aggregator import GanttChartAggregator
+
+    written = []
+    with GanttChartAggregator(include_plotlyjs=include_plotlyjs).open(output_file) as aggregator:
+        for result in results:
+            if result.error is None:
+                aggregator.add_section(result.job.label)
+                for fragment in result.fragments:
+                    aggregator.add_rendered_chart(fragment)
+            # The fragments are in the report, no need to keep them around
+            result.fragments = []
+            written.append(result)
+    return written
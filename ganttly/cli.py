@@ -1,7 +1,12 @@
 # main.py
 
-from ganttly.gantly_command import GanttlyCommandFactory, GanttlyConfiguration
+from ganttly.configuration import (DEFAULT_MAX_ROWS, INPUT_FORMATS, OUTPUT_FORMAT_HTML, OUTPUT_FORMATS,
+                                   PLOTLYJS_DIRECTORY, PLOTLYJS_INLINE, PLOTLYJS_MODES, GanttlyConfiguration)
+from ganttly.gantly_command import GanttlyCommandFactory
+from ganttly.watch import DEFAULT_DEBOUNCE, DEFAULT_INTERVAL, FileWatcher, watch as watch_workbook
 import click
+import os
+import sys
 import webbrowser
 
 
@@ -13,6 +18,20 @@ def args_to_config_mapper(
     filter,
     hide_legend,
     hide_title,
+    no_cache=False,
+    cache_dir=None,
+    streaming=False,
+    jobs=1,
+    plotlyjs=PLOTLYJS_INLINE,
+    incremental=False,
+    overview=False,
+    max_rows=DEFAULT_MAX_ROWS,
+    drill_down=False,
+    output_format=OUTPUT_FORMAT_HTML,
+    critical_path=False,
+    window_start=None,
+    window_end=None,
+    input_format=None,
 ) -> GanttlyConfiguration:
     return GanttlyConfiguration(
         group_per_activity=group_per_activity,
@@ -22,54 +41,317 @@ def args_to_config_mapper(
         filter=filter,
         hide_legend=hide_legend,
         hide_title=hide_title,
+        use_cache=not no_cache,
+        cache_dir=cache_dir,
+        streaming=streaming,
+        jobs=jobs,
+        include_plotlyjs=plotlyjs,
+        incremental=incremental,
+        overview=overview,
+        max_rows=max_rows,
+        drill_down=drill_down,
+        output_format=output_format,
+        critical_path=critical_path,
+        window_start=window_start,
+        window_end=window_end,
+        input_format=input_format,
     )
 
 
-@click.command()
-@click.argument('file_path', type=click.Path(exists=True))
-@click.option('--sheet', type=str, default='Sheet1',
-              help="Name of the sheet in the Excel file to load data from. Default is 'Sheet1'.")
-@click.option('--filter', type=str, multiple=True,
-              help="List of sub-streams to filter activities by. If not provided, all sub-streams will be included.")
-@click.option('--per-stream', '-ps', is_flag=True,
-              help="Print a Gantt chart per sub-stream. Default is False.")
-@click.option('--hide-legend', '-l', is_flag=True, default=False,
-              help="Enable or disable legend. Default is True.")
-@click.option('--hide-title', '-t', is_flag=True, default=False,
-              help="Enable or disable gantt graph title. Default is True.")
-@click.option('--group-per-activity', '-a', is_flag=True,
-              help="""Make a separate bar in the chart for each activity. 
-              The activities are: 
-              - afu
-              - ate
-              - development
-              - integration test
-              - system_test
-              - uat
-              - release
-              - post go live
-              """)
-@click.option('--output', type=str, default='gantt_charts.html',
-              help="Output HTML file to save the charts. Default is 'gantt_charts.html'.")
-def cli(file_path, sheet, filter, per_stream, hide_legend, hide_title, group_per_activity, output):
-    config = args_to_config_mapper(
-        group_per_activity=group_per_activity,
-        per_stream=per_stream,
-        output=output,
-        sheet=sheet,
-        filter=filter,
-        hide_legend=hide_legend,
-        hide_title=hide_title,
-    )
+_CHART_OPTIONS = {
+    'file_path': click.argument('file_path', type=click.Path(exists=True)),
+    'sheet': click.option('--sheet', type=str, default='Sheet1',
+                          help="Name of the sheet in the Excel file to load data from. Default is 'Sheet1'."),
+    'input_format': click.option('--input-format', type=click.Choice(INPUT_FORMATS),
+                                 help="Format of the plan: an Excel workbook, a CSV file, a Parquet file (needs the "
+                                      "pyarrow package) or a SQLite database, where the plan is the table named "
+                                      "like --sheet or the only table. Default is told from the file extension."),
+    'filter': click.option('--filter', type=str, multiple=True,
+                           help="List of sub-streams to filter activities by. If not provided, all sub-streams will be included."),
+    'per_stream': click.option('--per-stream', '-ps', is_flag=True,
+                               help="Print a Gantt chart per sub-stream. Default is False."),
+    'hide_legend': click.option('--hide-legend', '-l', is_flag=True, default=False,
+                                help="Enable or disable legend. Default is True."),
+    'hide_title': click.option('--hide-title', '-t', is_flag=True, default=False,
+                               help="Enable or disable gantt graph title. Default is True."),
+    'group_per_activity': click.option('--group-per-activity', '-a', is_flag=True,
+                                       help="""Make a separate bar in the chart for each activity. 
+                                       The activities are: 
+                                       - afu
+                                       - ate
+                                       - development
+                                       - integration test
+                                       - system_test
+                                       - uat
+                                       - release
+                                       - post go live
+                                       """),
+    'output': click.option('--output', type=str, default='gantt_charts.html',
+                           help="Output HTML file to save the charts. Default is 'gantt_charts.html'."),
+    'no_cache': click.option('--no-cache', is_flag=True, default=False,
+                             help="Always parse the Excel file instead of reusing the parsed sheet from the cache."),
+    'cache_dir': click.option('--cache-dir', type=click.Path(file_okay=False),
+                              help="Directory of the parsed-sheet cache. Default is ~/.cache/ganttly."),
+    'streaming': click.option('--streaming', is_flag=True, default=False,
+                              help="Read the sheet row by row, keeping only the known columns and the filtered sub-streams. "
+                                   "Lowers memory usage on large workbooks."),
+    'jobs': click.option('--jobs', '-j', type=click.IntRange(min=1), default=1,
+                         help="Number of processes drawing the per-stream charts. Default is 1."),
+    'plotlyjs': click.option('--plotlyjs', type=click.Choice(PLOTLYJS_MODES), default=PLOTLYJS_INLINE,
+                             help="How the report loads plotly.js: embedded once in the file ('inline'), "
+                                  "from a plotly.min.js written next to it ('directory') or from the plotly CDN ('cdn'). "
+                                  "Default is 'inline'."),
+    'incremental': click.option('--incremental', is_flag=True, default=False,
+                                help="Only draw the charts whose activities changed since the last run on the same output file, "
+                                     "reusing the others from the cache."),
+    'overview': click.option('--overview', is_flag=True, default=False,
+                             help="Draw a single overview chart with a row per sub-stream, where the activities "
+                                  "of each category are merged into spans. Keeps the report small on large plans."),
+    'max_rows': click.option('--max-rows', type=click.IntRange(min=0), default=DEFAULT_MAX_ROWS,
+                             help="Rows of the overview chart, the sub-streams past them share the last row. "
+                                  f"0 draws them all. Default is {DEFAULT_MAX_ROWS}."),
+    'drill_down': click.option('--drill-down', is_flag=True, default=False,
+                               help="With --overview, also write the chart of every sub-stream in a directory next to "
+                                    "the report, linked from the overview rows."),
+    'output_format': click.option('--format', 'output_format', type=click.Choice(OUTPUT_FORMATS),
+                                  default=OUTPUT_FORMAT_HTML,
+                                  help="Write the HTML report, or every chart to a png, svg or pdf file named after "
+                                       "--output. Images need the kaleido package and are exported by --jobs "
+                                       "renderer processes. Default is 'html'."),
+    'critical_path': click.option('--critical-path', is_flag=True, default=False,
+                                  help="Outline the activities on the critical path of the plan in red, worked out "
+                                       "from the optional Predecessors column: activities of the same sub-stream, "
+                                       "or 'Sub Stream/Activity', separated by ';'. Not drawn on the overview."),
+    'window_start': click.option('--from', 'window_start', type=click.DateTime(formats=["%Y-%m-%d"]),
+                                 help="Only draw the activities still running on this date (YYYY-MM-DD), "
+                                      "with the bars starting before it cut at it."),
+    'window_end': click.option('--to', 'window_end', type=click.DateTime(formats=["%Y-%m-%d"]),
+                               help="Only draw the activities starting by this date (YYYY-MM-DD), "
+                                    "with the bars ending after it cut at it."),
+}
+
+
+def chart_options(*names: str):
+    """ Adds the workbook argument and the chart options shared by the commands
+    rendering a report, or only the ones in `names` """
+    def decorator(command):
+        for name, option in reversed(_CHART_OPTIONS.items()):
+            if not names or name in names:
+                command = option(command)
+        return command
+    return decorator
+
+
+class DefaultCommandGroup(click.Group):
+    """ Group that runs `default_command` when the first argument is not one
+    of its commands, so that `ganttly FILE` keeps rendering the report """
+
+    def __init__(self, *args, default_command: str = "render", **kwargs):
+        super().__init__(*args, **kwargs)
+        self.default_command = default_command
+
+    def parse_args(self, ctx, args):
+        if args and args[0] not in self.commands and args[0] not in ctx.help_option_names:
+            args = [self.default_command, *args]
+        return super().parse_args(ctx, args)
+
+
+@click.group(cls=DefaultCommandGroup)
+def cli():
+    """ Draws Gantt charts from the activities of an Excel plan.
+    Without a command, the report is rendered once. """
+
+
+@cli.command()
+@chart_options()
+@click.option('--profile', is_flag=True, default=False,
+              help="Print the wall time, CPU time and peak memory of every stage and the slowest sub-streams, "
+                   "and write them as a trace-event file next to the output, to open in chrome://tracing or Perfetto.")
+@click.option('--cprofile', is_flag=True, default=False,
+              help="Run under cProfile, print the slowest functions and write the statistics next to the output.")
+def render(file_path, profile, cprofile, **options):
+    """ Renders the report once and opens it in the browser (default command). """
+    from contextlib import nullcontext
+
+    config = args_to_config_mapper(**options)
     command = GanttlyCommandFactory(file_path, config).create()
+    output_stem = os.path.splitext(config.output)[0]
+    stages = None
+    if profile:
+        from ganttly.profiling import Profile
+        stages = Profile()
+        command.add_hook(stages, trace_memory=True)
+    if cprofile:
+        from ganttly.profiling import python_profile
+        profiler = python_profile(f"{output_stem}.prof")
+    else:
+        profiler = nullcontext()
     try:
-        command.execute()
+        with profiler:
+            command.execute()
     except ValueError as e:
         click.echo(f"Error: {e}")
         return
 
+    if stages is not None:
+        stages.write_trace(f"{output_stem}.trace.json")
+        click.echo(stages.summary())
+        click.echo(f"Trace written to {output_stem}.trace.json")
+    if cprofile:
+        from ganttly.profiling import describe_python_profile
+        click.echo(describe_python_profile(f"{output_stem}.prof"))
+
+    if config.output_format != OUTPUT_FORMAT_HTML:
+        from ganttly.image_export import describe_exports
+        click.echo(describe_exports(command.images))
+        return
     webbrowser.open(config.output)
 
 
+@cli.command()
+@chart_options()
+@click.option('--interval', type=click.FloatRange(min=0.05), default=DEFAULT_INTERVAL,
+              help=f"Seconds between two checks of the workbook. Default is {DEFAULT_INTERVAL}.")
+@click.option('--debounce', type=click.FloatRange(min=0), default=DEFAULT_DEBOUNCE,
+              help="Seconds the workbook must stay unchanged after a save before the report is rebuilt. "
+                   f"Default is {DEFAULT_DEBOUNCE}.")
+def watch(file_path, interval, debounce, **options):
+    """ Renders the report, then renders it again every time the workbook is saved.
+
+    The process stays up with the libraries loaded and the charts cached, and
+    only the charts whose activities changed are drawn again. Stop it with Ctrl+C. """
+    config = args_to_config_mapper(**options)
+    opened = []
+
+    def open_once(command):
+        if not opened and config.output_format == OUTPUT_FORMAT_HTML:
+            webbrowser.open(config.output)
+            opened.append(config.output)
+
+    try:
+        watch_workbook(file_path, config, echo=click.echo,
+                       watcher=FileWatcher(file_path, interval=interval, debounce=debounce),
+                       on_build=open_once)
+    except KeyboardInterrupt:
+        pass
+
+
+@cli.command()
+@chart_options('file_path', 'sheet', 'input_format', 'no_cache', 'cache_dir', 'streaming')
+@click.option('--plotlyjs', type=click.Choice(PLOTLYJS_MODES), default=PLOTLYJS_DIRECTORY,
+              help="How the served pages load plotly.js: embedded in every page ('inline'), "
+                   "from the server ('directory') or from the plotly CDN ('cdn'). Default is 'directory'.")
+@click.option('--host', type=str, default="127.0.0.1", help="Address to listen on. Default is 127.0.0.1.")
+@click.option('--port', type=click.IntRange(min=0, max=65535), default=8050,
+              help="Port to listen on. Default is 8050.")
+def serve(file_path, sheet, input_format, no_cache, cache_dir, streaming, plotlyjs, host, port):
+    """ Serves the charts of the workbook over HTTP, rendered on demand.
+
+    GET /chart returns the HTML report and /chart.json the figures as JSON.
+    The query parameters filter (repeatable or comma separated), per_stream,
+    group_per_activity, hide_legend, hide_title, overview, critical_path, from and
+    to (YYYY-MM-DD) select the report, and the overview rows link to the chart of their stream. The
+    workbook is parsed once and read again only when it changes. """
+    from ganttly.server import ReportServer
+
+    config = GanttlyConfiguration(sheet=sheet, input_format=input_format, use_cache=not no_cache,
+                                  cache_dir=cache_dir, streaming=streaming, include_plotlyjs=plotlyjs)
+    with ReportServer((host, port), file_path, config) as server:
+        click.echo(f"Serving {file_path} on {server.url}/chart (Ctrl+C to stop)")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+
+
+@cli.command()
+@chart_options('file_path', 'sheet', 'input_format', 'filter', 'no_cache', 'cache_dir', 'streaming')
+@click.option('--limit', type=click.IntRange(min=0), default=50,
+              help="Maximum number of issues to list, 0 lists them all. Default is 50.")
+def validate(file_path, sheet, input_format, filter, no_cache, cache_dir, streaming, limit):
+    """ Checks every row of the plan and lists all the errors and warnings, without drawing anything.
+
+    Exits with status 1 when the plan has errors. """
+    from ganttly.repository import open_repository
+    from ganttly.workbook_cache import WorkbookCache
+
+    try:
+        repository = open_repository(file_path, input_format, sheet_name=sheet,
+                                     cache=None if no_cache else WorkbookCache(cache_dir),
+                                     streaming=streaming)
+        report = repository.validate(list(filter) or None)
+    except ValueError as e:
+        click.echo(f"Error: {e}")
+        sys.exit(1)
+
+    click.echo(report.describe(limit or None))
+    if not report.is_valid:
+        sys.exit(1)
+
+
+@cli.command()
+@click.argument('file_paths', nargs=-1, type=click.Path(exists=True, dir_okay=False))
+@click.option('--manifest', type=click.Path(exists=True, dir_okay=False),
+              help="JSON list of the inputs to render, each with a 'file' and optionally its 'sheet', 'output', "
+                   "'filter', 'per_stream', 'group_per_activity', 'hide_legend', 'hide_title', 'overview', 'max_rows', 'critical_path' and 'input_format'.")
+@click.option('--sheet', 'sheets', type=str, multiple=True,
+              help="Sheet to render from every file, can be repeated. Default is 'Sheet1'.")
+@click.option('--output-dir', type=click.Path(file_okay=False), default='.',
+              help="Directory of the reports, one per file and sheet. Default is the current directory.")
+@click.option('--combined', type=str,
+              help="Write a single report with a section per input to this file instead of one report per input.")
+@click.option('--workers', '-w', type=click.IntRange(min=1), default=1,
+              help="Number of processes reading and rendering the inputs. Default is 1.")
+@chart_options('input_format', 'filter', 'per_stream', 'hide_legend', 'hide_title', 'group_per_activity',
+               'no_cache', 'cache_dir', 'streaming', 'plotlyjs', 'overview', 'max_rows', 'critical_path',
+               'window_start', 'window_end')
+def batch(file_paths, manifest, sheets, output_dir, combined, workers, **options):
+    """ Renders the reports of many workbooks and sheets in one run.
+
+    The inputs are the FILE_PATHS, each rendered for every --sheet, and the
+    entries of the --manifest. They are read and drawn in a pool of --workers
+    processes, and a throughput summary is printed at the end. """
+    from ganttly.batch import jobs_for_files, load_manifest, run_batch
+
+    defaults = args_to_config_mapper(output=GanttlyConfiguration.output, sheet=GanttlyConfiguration.sheet,
+                                     **options)
+    try:
+        if output_dir != '.':
+            os.makedirs(output_dir, exist_ok=True)
+        jobs = jobs_for_files(file_paths, sheets, defaults, output_dir)
+        if manifest is not None:
+            jobs += load_manifest(manifest, defaults, output_dir)
+        if not jobs:
+            raise click.UsageError("Give the workbooks to render or a --manifest")
+        summary = run_batch(jobs, workers, combined_output=combined, include_plotlyjs=defaults.include_plotlyjs)
+    except ValueError as e:
+        click.echo(f"Error: {e}")
+        sys.exit(1)
+
+    click.echo(summary.describe())
+    if summary.failed:
+        sys.exit(1)
+
+
+@cli.command()
+@click.argument('source', type=click.Path(exists=True, dir_okay=False))
+@click.argument('destination', type=click.Path(dir_okay=False))
+@chart_options('sheet', 'input_format')
+@click.option('--to-format', type=click.Choice(INPUT_FORMATS),
+              help="Format to write. Default is told from the extension of DESTINATION.")
+def convert(source, destination, sheet, input_format, to_format):
+    """ Copies the known columns of a plan to another format, e.g. an Excel
+    plan to a Parquet file or SQLite database that loads faster. """
+    from ganttly.repository import input_format_of, open_repository, repository_class
+
+    try:
+        df = open_repository(source, input_format, sheet_name=sheet).load_frame()
+        repository_class(input_format_of(destination, to_format)).write_frame(df, destination, sheet)
+    except ValueError as e:
+        click.echo(f"Error: {e}")
+        sys.exit(1)
+    click.echo(f"Wrote {len(df)} activities to {destination}")
+
+
 if __name__ == "__main__":
     cli()
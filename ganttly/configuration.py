@@ -0,0 +1,59 @@
+# configuration.py
+#
+# Settings of a ganttly run. Kept free of the data and plotting libraries so
+# that the CLI can parse its arguments without importing them.
+
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import List, Optional
+
+# Where the report loads plotly.js from: embedded once in the page, a
+# plotly.min.js file next to the report, or the plotly CDN
+PLOTLYJS_INLINE = "inline"
+PLOTLYJS_DIRECTORY = "directory"
+PLOTLYJS_CDN = "cdn"
+PLOTLYJS_MODES = [PLOTLYJS_INLINE, PLOTLYJS_DIRECTORY, PLOTLYJS_CDN]
+PLOTLYJS_FILE_NAME = "plotly.min.js"
+# What the report is written as: an HTML page, or an image file per chart
+OUTPUT_FORMAT_HTML = "html"
+IMAGE_FORMATS = ["png", "svg", "pdf"]
+OUTPUT_FORMATS = [OUTPUT_FORMAT_HTML, *IMAGE_FORMATS]
+# What the plan is read from, told from the file extension unless given
+INPUT_FORMAT_EXCEL = "excel"
+INPUT_FORMAT_CSV = "csv"
+INPUT_FORMAT_PARQUET = "parquet"
+INPUT_FORMAT_SQLITE = "sqlite"
+INPUT_FORMATS = [INPUT_FORMAT_EXCEL, INPUT_FORMAT_CSV, INPUT_FORMAT_PARQUET, INPUT_FORMAT_SQLITE]
+# Rows of the overview chart before the remaining streams are merged into one
+DEFAULT_MAX_ROWS = 40
+
+
+@dataclass
+class GanttlyConfiguration:
+    group_per_activity: bool = False
+    per_stream: bool = False
+    output: str = "gantt_charts.html"
+    sheet: str = "Sheet1"
+    filter: List[str] = field(default_factory=list)
+    hide_legend: bool = False
+    hide_title: bool = False
+    use_cache: bool = True
+    cache_dir: Optional[str] = None
+    streaming: bool = False
+    jobs: int = 1
+    include_plotlyjs: str = PLOTLYJS_INLINE
+    incremental: bool = False
+    overview: bool = False
+    max_rows: int = DEFAULT_MAX_ROWS
+    # Write a detail report per stream, linked from the overview rows
+    drill_down: bool = False
+    # Link of each overview row instead, with {stream} replaced by the quoted stream name
+    detail_url: Optional[str] = None
+    output_format: str = OUTPUT_FORMAT_HTML
+    # Highlight the activities on the critical path, worked out from the Predecessors column
+    critical_path: bool = False
+    # Only draw the activities running between these dates, cutting the bars at them
+    window_start: Optional[datetime] = None
+    window_end: Optional[datetime] = None
+    # One of INPUT_FORMATS, or None to tell it from the file extension
+    input_format: Optional[str] = None
@@ -0,0 +1,24 @@
+# csv_repository.py
+
+from typing import List, Optional
+
+import pandas as pd
+
+from ganttly.repository import ActivityRepository, dates_as_text, parse_dates
+
+
+class CsvRepository(ActivityRepository):
+    """ Reads the plan from a CSV file with a header line, with pandas' C
+    parser. Only the known columns are decoded, and the dates are parsed in
+    one pass over each column once read. The sheet name is not used """
+
+    def _read_sheet(self, sub_stream_filter: Optional[List[str]] = None) -> pd.DataFrame:
+        wanted = set(self._wanted_columns())
+        # The dates are read as text, so that the cells that are not dates can be reported
+        df = pd.read_csv(self.file_path, usecols=lambda column: column in wanted,
+                         dtype={'Start Date': object, 'End Date': object})
+        return parse_dates(df)
+
+    @staticmethod
+    def write_frame(df: pd.DataFrame, file_path: str, sheet_name: str = "Sheet1"):
+        dates_as_text(df).to_csv(file_path, index=False)
@@ -16,10 +16,11 @@ class ActivityTypeEnum(Enum):
 
     @staticmethod
     def from_string(value: str) -> 'ActivityTypeEnum':
-        for item in ActivityTypeEnum:
-            if item.value == value:
-                return item
-        return ActivityTypeEnum.UNKNOWN
+        try:
+            return ActivityTypeEnum(value)
+        except ValueError:
+            # cells matching no member, unhashable ones included
+            return ActivityTypeEnum.UNKNOWN
 
 
 class ActivityCategoryEnum(Enum):
@@ -46,13 +47,13 @@ class ActivityCategoryEnum(Enum):
 
     @staticmethod
     def from_string(value: str) -> 'ActivityCategoryEnum':
-        for item in ActivityCategoryEnum:
-            if item.value == value:
-                return item
-        return ActivityCategoryEnum.UNKNOWN
+        try:
+            return ActivityCategoryEnum(value)
+        except ValueError:
+            return ActivityCategoryEnum.UNKNOWN
 
 
-@dataclass
+@dataclass(slots=True)
 class ActivityDTO:
     sub_stream: str
     activity: str
@@ -63,3 +64,5 @@ class ActivityDTO:
     owner: str
     state: str
     notes: Optional[str] = None
+    # References to the activities this one waits for, see ganttly.scheduling
+    predecessors: Optional[str] = None
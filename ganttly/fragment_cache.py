@@ -0,0 +1,70 @@
+# fragment_cache.py
+
+import json
+import os
+from typing import Dict, Iterable, Iterator, Optional
+
+from ganttly.gantt_chart_generator import GanttChartGenerator
+from ganttly.parallel_render import render_charts
+from ganttly.workbook_cache import CACHE_FORMAT_VERSION, _digest, default_cache_dir
+
+FRAGMENTS_DIR = "fragments"
+FRAGMENTS_SUFFIX = ".json"
+
+
+class FragmentCache:
+    """ The charts rendered by the last run of a report, by generator fingerprint.
+
+    A fingerprint covers the activities of the chart, e.g. the ones of one
+    sub-stream, and the options it is drawn with. Charts whose fingerprint was
+    rendered by the previous run are spliced back into the report as they are;
+    only the others are drawn. Each chart is rendered with its fingerprint as
+    div id, so a fragment reads the same wherever it lands in the report.
+    Only the fragments of the last run are kept, as plain JSON."""
+
+    def __init__(self, output_file: str, cache_dir: Optional[str] = None):
+        self.entry = os.path.join(
+            cache_dir or default_cache_dir(), FRAGMENTS_DIR,
+            f"{_digest(CACHE_FORMAT_VERSION, os.path.abspath(output_file))}{FRAGMENTS_SUFFIX}")
+        self._previous = self._read()
+        self._current: Dict[str, str] = {}
+        self.reused = 0
+        self.rendered = 0
+
+    def render(self, generators: Iterable[GanttChartGenerator], jobs: int = 1) -> Iterator[str]:
+        """ Yields the fragment of each generator, in order, drawing only the
+        charts missing from the previous run, in `jobs` processes """
+        charts = [(generator.fingerprint(), generator) for generator in generators]
+        stale = render_charts(((fingerprint, generator) for fingerprint, generator in charts
+                               if fingerprint not in self._previous), jobs)
+        for fingerprint, _ in charts:
+            fragment = self._previous.get(fingerprint)
+            if fragment is None:
+                fragment = next(stale)
+                self.rendered += 1
+            else:
+                self.reused += 1
+            self._current[fingerprint] = fragment
+            yield fragment
+
+    def save(self):
+        """ Keeps the fragments of this run for the next one """
+        try:
+            os.makedirs(os.path.dirname(self.entry), exist_ok=True)
+            tmp_entry = f"{self.entry}.{os.getpid()}.tmp"
+            with open(tmp_entry, "w", encoding="utf-8") as f:
+                json.dump(self._current, f)
+            os.replace(tmp_entry, self.entry)
+        except OSError:
+            # Like the workbook cache, a failed write only costs a full render next time
+            pass
+
+    def _read(self) -> Dict[str, str]:
+        try:
+            with open(self.entry, "r", encoding="utf-8") as f:
+                fragments = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if not isinstance(fragments, dict):
+            return {}
+        return {fingerprint: fragment for fingerprint, fragment in fragments.items() if isinstance(fragment, str)}
@@ -1,36 +1,167 @@
-from typing import List
+import dataclasses
+import os
+import time
+from typing import TYPE_CHECKING, Dict, Iterable, Iterator, List, Optional
 from abc import ABC, abstractmethod
-from dataclasses import dataclass, field
+from contextlib import contextmanager
 
-from ganttly.activity_service import ActivityService
-from ganttly.excel_repository import ExcelRepository
-from ganttly.gantt_chart_aggregator import GanttChartAggregator
-from ganttly.gantt_chart_generator import GanttChartActivityGenerator, GanttChartSubStreamGenerator
+from ganttly.configuration import OUTPUT_FORMAT_HTML, GanttlyConfiguration
+from ganttly.profiling import StageHook, StageRecorder, stage
 
-
-@dataclass
-class GanttlyConfiguration:
-    group_per_activity: bool = False
-    per_stream: bool = False
-    output: str = "gantt_charts.html"
-    sheet: str = "Sheet1"
-    filter: List[str] = field(default_factory=list)
-    hide_legend: bool = False
-    hide_title: bool = False
+# The data and plotting modules are imported by the commands when they run,
+# so that importing this module, e.g. to parse the CLI arguments, stays cheap
+if TYPE_CHECKING:
+    import plotly.graph_objects as go
+    from ganttly.activity_store import ActivityStore
+    from ganttly.fragment_cache import FragmentCache
+    from ganttly.gantt_chart_generator import GanttChartGenerator
+    from ganttly.image_export import ExportedImage
 
 
 class GanttlyCommand(ABC):
-    def __init__(self, file_path: str, config: GanttlyConfiguration):
+    def __init__(self, file_path: str, config: GanttlyConfiguration, store: Optional['ActivityStore'] = None):
+        from ganttly.activity_service import ActivityService
+        from ganttly.gantt_chart_aggregator import GanttChartAggregator
+        from ganttly.repository import open_repository
+        from ganttly.workbook_cache import WorkbookCache
+
         self.file_path = file_path
         self.config = config
-        self.repository = ExcelRepository(
-            file_path=file_path, sheet_name=self.config.sheet)
-        self.service = ActivityService(self.repository)
-        self.aggregator = GanttChartAggregator()
+        cache = WorkbookCache(self.config.cache_dir) if self.config.use_cache else None
+        self.repository = open_repository(
+            file_path, self.config.input_format, sheet_name=self.config.sheet, cache=cache,
+            streaming=self.config.streaming)
+        self.service = ActivityService(self.repository, store)
+        self.aggregator = GanttChartAggregator(include_plotlyjs=self.config.include_plotlyjs)
+        # Seconds spent in each stage by the last execution
+        self.stage_timings: Dict[str, float] = {}
+        # The fragments of the last incremental execution
+        self.fragments: Optional['FragmentCache'] = None
+        # The image files written by the last execution, when exporting images
+        self.images: List['ExportedImage'] = []
+        # Notified of every stage of the executions, see `add_hook`
+        self.hooks: List[StageHook] = []
+        self.trace_memory = False
+
+    def add_hook(self, hook: StageHook, trace_memory: bool = False):
+        """ Passes the record of every stage of the following executions to `hook`:
+        loading, drawing, rendering and writing each chart, with their wall
+        time, CPU time and, with `trace_memory`, peak memory """
+        self.hooks.append(hook)
+        self.trace_memory = self.trace_memory or trace_memory
 
     @abstractmethod
+    def chart_generators(self) -> Iterable['GanttChartGenerator']:
+        """ Loads the activities and returns the generators of the charts of the report, in order """
+
     def execute(self):
-        pass
+        """ Writes the report to the configured output file, or the charts
+        to image files next to it when the output format is an image one """
+        self.stage_timings = {}
+        with self._recording():
+            if self.config.output_format != OUTPUT_FORMAT_HTML:
+                self._export_images(self.chart_generators())
+            else:
+                self._save_charts(self.chart_generators())
+
+    @contextmanager
+    def _recording(self):
+        if not self.hooks:
+            yield
+            return
+        with StageRecorder(self.hooks, self.trace_memory).activate():
+            yield
+
+    def draw_charts(self) -> Iterator['go.Figure']:
+        """ Draws the charts of the report one at a time, without writing anything """
+        self.stage_timings = {}
+        for chart_generator in self.chart_generators():
+            with self._stage("render"):
+                chart = chart_generator.draw_chart()
+            yield chart
+
+    def render_report(self) -> str:
+        """ Renders the whole report page in memory instead of writing it to the output file """
+        from ganttly.gantt_chart_aggregator import render_chart
+
+        return self.aggregator.render_report(
+            render_chart(chart, position) for position, chart in enumerate(self.draw_charts()))
+
+    @contextmanager
+    def _stage(self, name: str):
+        started = time.perf_counter()
+        try:
+            with stage(name):
+                yield
+        finally:
+            self.stage_timings[name] = self.stage_timings.get(name, 0.0) + time.perf_counter() - started
+
+    def _window(self):
+        """ The (from, to) dates of the activities to draw, or None to draw them all """
+        if self.config.window_start is None and self.config.window_end is None:
+            return None
+        return self.config.window_start, self.config.window_end
+
+    def _load_activities(self):
+        with self._stage("load"):
+            return self.service.get_activities(self.config.filter, self._window())
+
+    def _load_activities_by_stream(self):
+        with self._stage("load"):
+            return self.service.get_activities_by_stream(self.config.filter, self._window())
+
+    def _critical_rows(self) -> Optional[List[int]]:
+        """ The sheet rows on the critical path, or None when it is not shown.
+        It is worked out on the whole plan, whatever the filter, so that the
+        charts of the streams and their predecessors in other streams agree on it.
+        Only the errors of the filtered streams and of what they wait for stop it """
+        if not self.config.critical_path:
+            return None
+        from ganttly.scheduling import critical_rows
+
+        with self._stage("load"):
+            activities = self.service.get_plan(self.config.filter)
+        with self._stage("schedule"):
+            return critical_rows(activities).tolist()
+
+    def _save_charts(self, chart_generators: Iterable['GanttChartGenerator']):
+        """ Draws the charts one at a time and appends each to the report as soon as it is ready,
+        in a process pool when more than one job is configured.
+        In incremental mode the charts unchanged since the last run are reused instead """
+        from ganttly.fragment_cache import FragmentCache
+        from ganttly.parallel_render import render_charts_in_parallel
+
+        with self._stage("render"):
+            if self.config.incremental:
+                self.fragments = FragmentCache(self.config.output, self.config.cache_dir)
+                with self.aggregator.open(self.config.output):
+                    for chart_html in self.fragments.render(chart_generators, self.config.jobs):
+                        self.aggregator.add_rendered_chart(chart_html)
+                self.fragments.save()
+                return
+
+            with self.aggregator.open(self.config.output):
+                if self.config.jobs > 1:
+                    for chart_html in render_charts_in_parallel(
+                            chart_generators, self.config.jobs, self.aggregator.next_position):
+                        self.aggregator.add_rendered_chart(chart_html)
+                else:
+                    for chart_generator in chart_generators:
+                        with stage("chart", chart_generator.title):
+                            self.aggregator.add_chart(chart_generator.draw_chart())
+
+    def _export_images(self, chart_generators: Iterable['GanttChartGenerator']):
+        """ Draws the charts one at a time while the previous ones are exported,
+        in a pool of renderer processes when more than one job is configured """
+        from ganttly.image_export import ImageExporter, check_renderer
+
+        check_renderer(self.config.output_format)
+        with self._stage("export"):
+            with ImageExporter(self.config.output_format, self.config.jobs).open(self.config.output) as exporter:
+                for chart_generator in chart_generators:
+                    with stage("chart", chart_generator.title):
+                        exporter.add_chart(chart_generator.draw_chart(), chart_generator.title)
+        self.images = exporter.exported
 
 
 class CreateActivityGanttCommand(GanttlyCommand):
@@ -38,34 +169,33 @@ class CreateActivityGanttCommand(GanttlyCommand):
     For example, all the tasks of type "developmentE are grouped together
     """
 
-    def execute(self):
-        activities = self.service.get_activities(self.config.filter)
+    def chart_generators(self) -> Iterable['GanttChartGenerator']:
+        from ganttly.gantt_chart_generator import GanttChartActivityGenerator
+
+        activities = self._load_activities()
         chart_generator = GanttChartActivityGenerator(activities,
                                                       hide_title=self.config.hide_title,
-                                                      hide_legend=self.config.hide_legend)
-        fig = chart_generator.draw_chart()
-        self.aggregator.add_chart(fig)
-        self.aggregator.save_to_file(self.config.output)
+                                                      hide_legend=self.config.hide_legend,
+                                                      critical_rows=self._critical_rows())
+        return [chart_generator]
 
 
 class CreateSubStreamGanttCommand(GanttlyCommand):
     """ Creates a series of gantt chart where the activities are grouped by substream.
     Therefore a gantt per substream is created"""
 
-    def execute(self):
-        activities_by_stream = self.service.get_activities_by_stream(
-            self.config.filter)
-        figs = []
-        for stream, activities in activities_by_stream.items():
-            chart_generator = GanttChartSubStreamGenerator(
+    def chart_generators(self) -> Iterable['GanttChartGenerator']:
+        from ganttly.gantt_chart_generator import GanttChartSubStreamGenerator
+
+        activities_by_stream = self._load_activities_by_stream()
+        critical_rows = self._critical_rows()
+        return (
+            GanttChartSubStreamGenerator(
                 activities, title=stream,
                 hide_title=self.config.hide_title,
-                hide_legend=self.config.hide_legend)
-            figs.append(chart_generator.draw_chart())
-
-        for fig in figs:
-            self.aggregator.add_chart(fig)
-        self.aggregator.save_to_file(self.config.output)
+                hide_legend=self.config.hide_legend,
+                critical_rows=critical_rows)
+            for stream, activities in activities_by_stream.items())
 
 
 class CreateSubStreamPerActivityGanttCommand(GanttlyCommand):
@@ -74,47 +204,108 @@ class CreateSubStreamPerActivityGanttCommand(GanttlyCommand):
 
     Therefore a gantt per substream is created and all the tasks of the same category are groupped"""
 
-    def execute(self):
-        activities_by_stream = self.service.get_activities_by_stream(
-            self.config.filter)
-        figs = []
-        for stream, activities in activities_by_stream.items():
-            chart_generator = GanttChartActivityGenerator(
+    def chart_generators(self) -> Iterable['GanttChartGenerator']:
+        from ganttly.gantt_chart_generator import GanttChartActivityGenerator
+
+        activities_by_stream = self._load_activities_by_stream()
+        critical_rows = self._critical_rows()
+        return (
+            GanttChartActivityGenerator(
                 activities,
                 title=stream,
                 hide_title=self.config.hide_title,
-                hide_legend=self.config.hide_legend
+                hide_legend=self.config.hide_legend,
+                critical_rows=critical_rows
             )
-            figs.append(chart_generator.draw_chart())
-
-        for fig in figs:
-            self.aggregator.add_chart(fig)
-        self.aggregator.save_to_file(self.config.output)
+            for stream, activities in activities_by_stream.items())
 
 
 class CreateGanttCommand(GanttlyCommand):
     """ Creates a gantt chart."""
 
-    def execute(self):
-        activities = self.service.get_activities(self.config.filter)
+    def chart_generators(self) -> Iterable['GanttChartGenerator']:
+        from ganttly.gantt_chart_generator import GanttChartSubStreamGenerator
+
+        activities = self._load_activities()
         chart_generator = GanttChartSubStreamGenerator(
-            activities, hide_legend=self.config.hide_legend)
-        fig = chart_generator.draw_chart()
-        self.aggregator.add_chart(fig)
-        self.aggregator.save_to_file(self.config.output)
+            activities, hide_legend=self.config.hide_legend, critical_rows=self._critical_rows())
+        return [chart_generator]
+
+
+class CreateOverviewGanttCommand(GanttlyCommand):
+    """ Creates a single overview chart with a row per substream, where the tasks
+    of each category are merged into spans.
+
+    With drill down, a detail chart per substream is written in a directory
+    next to the report and linked from the rows of the overview"""
+
+    def chart_generators(self) -> Iterable['GanttChartGenerator']:
+        from ganttly.gantt_chart_generator import GanttChartOverviewGenerator
+
+        activities = self._load_activities()
+        chart_generator = GanttChartOverviewGenerator(
+            activities,
+            max_rows=self.config.max_rows,
+            detail_links=self.detail_links(activities.positions_by_sub_stream()),
+            hide_title=self.config.hide_title,
+            hide_legend=self.config.hide_legend)
+        return [chart_generator]
+
+    def execute(self):
+        super().execute()
+        if self.config.drill_down:
+            self._save_details()
+
+    def detail_links(self, streams: Iterable) -> Dict[str, str]:
+        """ The link of each stream row of the overview to its detail chart """
+        from urllib.parse import quote
+        from ganttly.overview import detail_file_names
+
+        streams = [stream for stream in streams if isinstance(stream, str)]
+        if self.config.detail_url is not None:
+            return {stream: self.config.detail_url.format(stream=quote(stream, safe=''))
+                    for stream in streams}
+        if self.config.drill_down:
+            directory = os.path.basename(self._details_directory())
+            names = detail_file_names(streams)
+            return {stream: quote(f"{directory}/{names[stream]}") for stream in streams}
+        return {}
+
+    def _details_directory(self) -> str:
+        return os.path.splitext(self.config.output)[0] + "-streams"
+
+    def _save_details(self):
+        """ Writes the detail report of every stream, reading the activities loaded for the overview """
+        from ganttly.overview import detail_file_names
+
+        streams = [stream for stream in self._load_activities().positions_by_sub_stream()
+                   if isinstance(stream, str)]
+        directory = self._details_directory()
+        os.makedirs(directory, exist_ok=True)
+        for stream, file_name in detail_file_names(streams).items():
+            config = dataclasses.replace(self.config, overview=False, drill_down=False, filter=[stream],
+                                         per_stream=False, output=os.path.join(directory, file_name))
+            command = GanttlyCommandFactory(self.file_path, config, self.service.store).create()
+            command.execute()
+            for name, seconds in command.stage_timings.items():
+                self.stage_timings[name] = self.stage_timings.get(name, 0.0) + seconds
 
 
 class GanttlyCommandFactory:
-    def __init__(self, file_path: str, config: GanttlyConfiguration):
+    def __init__(self, file_path: str, config: GanttlyConfiguration, store: Optional['ActivityStore'] = None):
         self.file_path = file_path
         self.config = config
+        # Shared by the commands created, so that they read the workbook once
+        self.store = store
 
     def create(self) -> GanttlyCommand:
         """ Translates the configuration into a command"""
+        if self.config.overview:
+            return CreateOverviewGanttCommand(self.file_path, self.config, self.store)
         if self.config.per_stream and not self.config.group_per_activity:
-            return CreateSubStreamGanttCommand(self.file_path, self.config)
+            return CreateSubStreamGanttCommand(self.file_path, self.config, self.store)
         if self.config.per_stream and self.config.group_per_activity:
-            return CreateSubStreamPerActivityGanttCommand(self.file_path, self.config)
+            return CreateSubStreamPerActivityGanttCommand(self.file_path, self.config, self.store)
         if self.config.group_per_activity:
-            return CreateActivityGanttCommand(self.file_path, self.config)
-        return CreateGanttCommand(self.file_path, self.config)
+            return CreateActivityGanttCommand(self.file_path, self.config, self.store)
+        return CreateGanttCommand(self.file_path, self.config, self.store)
@@ -1,19 +1,151 @@
 # gantt_chart_aggregator.py
 
+import html
+import os
+from typing import Iterable, Optional, TextIO, Union
+
 import plotly.graph_objects as go
+from plotly.offline import get_plotlyjs, get_plotlyjs_version
+
+from ganttly.configuration import (PLOTLYJS_CDN, PLOTLYJS_DIRECTORY, PLOTLYJS_FILE_NAME, PLOTLYJS_INLINE,
+                                   PLOTLYJS_MODES)
+from ganttly.profiling import stage
+
+_FOOTER = '</body></html>\n'
+_PLOTLY_CONFIG_SCRIPT = \
+    '<script type="text/javascript">window.PlotlyConfig = {MathJaxConfig: \'local\'};</script>\n'
+
+
+def chart_div_id(key: Union[int, str]) -> str:
+    # A fixed id keeps the report identical however the charts were rendered.
+    # The key is the chart position, or a key that does not depend on it for
+    # fragments reused across reports
+    return f"gantt-chart-{key}"
+
+
+def render_chart(chart: go.Figure, key: Union[int, str]) -> str:
+    # plotly.js is loaded once by the page, not by every chart
+    with stage("to_html"):
+        return chart.to_html(full_html=False, include_plotlyjs=False, div_id=chart_div_id(key))
+
+
+def chart_json(chart: go.Figure) -> str:
+    """ The figure as plotly.js reads it """
+    figure_json = chart.to_json()
+    # Only None when plotly is asked to write the JSON to a file
+    if figure_json is None:
+        raise ValueError("plotly returned no JSON for the chart")
+    return figure_json
+
+
+def plotlyjs_script(include_plotlyjs: str, output_file: Optional[str]) -> str:
+    """ The <script> tags loading plotly.js, writing the library next to
+    `output_file` in directory mode. Without an output file the page expects
+    the library to be served next to it """
+    if include_plotlyjs == PLOTLYJS_INLINE:
+        source = f'<script type="text/javascript">{get_plotlyjs()}</script>\n'
+    elif include_plotlyjs == PLOTLYJS_DIRECTORY:
+        if output_file is not None:
+            library = os.path.join(os.path.dirname(os.path.abspath(output_file)), PLOTLYJS_FILE_NAME)
+            content = get_plotlyjs().encode("utf-8")
+            # Reports written to the same directory share the library
+            if not os.path.exists(library) or os.path.getsize(library) != len(content):
+                with open(library, 'wb') as f:
+                    f.write(content)
+        source = f'<script charset="utf-8" src="{PLOTLYJS_FILE_NAME}"></script>\n'
+    elif include_plotlyjs == PLOTLYJS_CDN:
+        source = (f'<script charset="utf-8" '
+                  f'src="https://cdn.plot.ly/plotly-{get_plotlyjs_version()}.min.js"></script>\n')
+    else:
+        raise ValueError(
+            f"Unknown plotly.js mode '{include_plotlyjs}', expected one of: {', '.join(PLOTLYJS_MODES)}")
+    return _PLOTLY_CONFIG_SCRIPT + source
 
 
 class GanttChartAggregator:
-    def __init__(self):
-        self.figures = []
+    """ Writes the charts to an HTML report as soon as they are added.
+
+    The page header is written by `open`, each chart is rendered and appended
+    by `add_chart`, and nothing is kept once written, so memory does not grow
+    with the number of charts. The report is written next to the output file
+    and moved in place by `close`: a failed run leaves any previous report
+    untouched."""
+
+    def __init__(self, include_plotlyjs: str = PLOTLYJS_INLINE):
+        self.include_plotlyjs = include_plotlyjs
+        self.charts_written = 0
+        self._output_file: Optional[str] = None
+        self._file: Optional[TextIO] = None
+
+    def open(self, output_file: str) -> 'GanttChartAggregator':
+        self._output_file = output_file
+        self.charts_written = 0
+        self._file = open(self._partial_file, 'w', encoding="utf-8")
+        self._file.write(self._header(output_file))
+        return self
+
+    def render_report(self, charts_html: Iterable[str]) -> str:
+        """ The whole report page with the charts already rendered, kept in memory """
+        return "".join([self._header(None), *(f"{chart_html}<hr>\n" for chart_html in charts_html), _FOOTER])
+
+    def _header(self, output_file: Optional[str]) -> str:
+        return ('<html><head><title>Gantt Charts</title>\n'
+                f'{plotlyjs_script(self.include_plotlyjs, output_file)}'
+                '</head><body>\n')
 
     def add_chart(self, chart: go.Figure):
-        self.figures.append(chart)
-
-    def save_to_file(self, output_file: str):
-        with open(output_file, 'w', encoding="utf-8") as f:
-            f.write('<html><head><title>Gantt Charts</title></head><body>\n')
-            for chart_html in self.figures:
-                f.write(chart_html.to_html(full_html=False))
-                f.write('<hr>\n')  # Separate each chart with a horizontal line
-            f.write('</body></html>\n')
+        self.add_rendered_chart(render_chart(chart, self.next_position))
+
+    def add_rendered_chart(self, chart_html: str):
+        """ Adds a chart already rendered with `render_chart` at `next_position` """
+        if self._file is None:
+            raise ValueError("The report must be opened before adding charts")
+        with stage("write"):
+            self._file.write(chart_html)
+            self._file.write('<hr>\n')  # Separate each chart with a horizontal line
+            self._file.flush()
+        self.charts_written += 1
+
+    def add_section(self, title: str):
+        """ Adds a heading before the charts that follow """
+        if self._file is None:
+            raise ValueError("The report must be opened before adding sections")
+        self._file.write(f'<h2>{html.escape(title)}</h2>\n')
+
+    @property
+    def next_position(self) -> int:
+        return self.charts_written
+
+    def close(self):
+        if self._file is None or self._output_file is None:
+            return
+        self._file.write(_FOOTER)
+        self._file.close()
+        self._file = None
+        os.replace(self._partial_file, self._output_file)
+
+    def discard(self):
+        if self._file is None:
+            return
+        self._file.close()
+        self._file = None
+        os.remove(self._partial_file)
+
+    def save_to_file(self, output_file: str, charts: Iterable[go.Figure] = ()):
+        """ Writes a whole report at once """
+        with self.open(output_file):
+            for chart in charts:
+                self.add_chart(chart)
+
+    @property
+    def _partial_file(self) -> str:
+        return f"{self._output_file}.partial"
+
+    def __enter__(self) -> 'GanttChartAggregator':
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+        else:
+            self.discard()
@@ -3,14 +3,29 @@
 from abc import ABC, abstractmethod
 from dataclasses import dataclass
 from datetime import datetime
-import plotly.express as px
-import plotly.graph_objects as go
+import hashlib
+import html
+import numpy as np
 import pandas as pd
+import plotly
+import plotly.graph_objects as go
+from ganttly.activity_table import ActivityTable
+from ganttly.configuration import DEFAULT_MAX_ROWS
 from ganttly.dto import ActivityCategoryEnum, ActivityDTO, ActivityTypeEnum
-from typing import List, Dict
-
+from ganttly.overview import DEFAULT_RESOLUTION, merge_markers, merge_spans, overview_rows
+from ganttly.profiling import stage
+from ganttly.timeline import timeline
+from ganttly.validation import PlanValidationError, validate_activities
+from typing import Iterable, List, Dict, Optional, Union
+
+# Bump when the charts drawn from the same activities change, so that
+# fragments rendered by previous versions are not reused
+CHART_FORMAT_VERSION = 1
 MILESTONE_SYMBOL = 'diamond'
 DEPENDENCY_SYMBOL = 'diamond-wide'
+MARKER_COLOR = 'blue'
+CRITICAL_PATH_COLOR = 'red'
+CRITICAL_PATH_LABEL = 'Critical path'
 COLOR_MAPPING = {
     ActivityCategoryEnum.AFU.value: '#c1ffc6',  # green
     ActivityCategoryEnum.ATE.value: '#7ac493',  # green
@@ -22,7 +37,7 @@ COLOR_MAPPING = {
 }
 
 
-@dataclass
+@dataclass(slots=True)
 class GantRowDTO:
     sub_stream: str
     activity: str
@@ -54,51 +69,92 @@ class GanttChartGenerator(ABC):
     AXIS_TEXT_SIZE = 22
     LABEL_TEXT_SIZE = 28
 
-    def __init__(self, activities: List[ActivityDTO],
+    def __init__(self, activities: Union[ActivityTable, List[ActivityDTO]],
                  title="Gantt Chart",
                  hide_title=False,
                  hide_legend=False,
+                 critical_rows: Optional[Iterable[int]] = None,
                  **kwargs
                  ):
         self.title = title if not hide_title else None
         self.hide_title = hide_title
-        self.activities = activities
+        # Tables come validated from the repositories: only activity lists are checked again
+        self.checked = isinstance(activities, ActivityTable)
+        self.activities = ActivityTable.coerce(activities)
         self.hide_legend = hide_legend
+        # Sheet rows of the activities on the critical path of the whole plan, highlighted when drawn
+        self.critical_rows = frozenset(int(row) for row in critical_rows) if critical_rows is not None else None
+
+    def fingerprint(self) -> str:
+        """ Identifies the chart `draw_chart` returns: generators with the same
+        fingerprint draw the same figure """
+        parts = [CHART_FORMAT_VERSION, plotly.__version__, type(self).__name__, self.title, self.hide_legend,
+                 *self._drawing_options(), self.activities.content_hash()]
+        return hashlib.sha256("|".join(str(part) for part in parts).encode("utf-8")).hexdigest()[:24]
+
+    def _drawing_options(self) -> List:
+        """ The options of the subclass that change the chart drawn """
+        if self.critical_rows is None:
+            return []
+        return [sorted(self.activities.row_number[self._critical()].tolist())]
+
+    def _critical(self) -> np.ndarray:
+        """ Whether each activity is on the critical path """
+        return np.isin(self.activities.row_number, list(self.critical_rows or ()))
+
+    def _gantt_frame(self) -> pd.DataFrame:
+        """ The rows to draw, flagging the critical ones in 'Critical' when the critical path is shown """
+        df = self.activities.to_gantt_frame()
+        if self.critical_rows is not None:
+            df['Critical'] = self._critical()
+        return df
+
+    def _add_critical_path_legend(self, fig: go.Figure):
+        fig.add_trace(go.Scatter(x=[None], y=[None], mode='markers', name=CRITICAL_PATH_LABEL,
+                                 marker=dict(symbol='square-open', color=CRITICAL_PATH_COLOR,
+                                             size=GanttChartGenerator.LABEL_TEXT_SIZE)))
 
     def _validate_activities(self):
         """
-        Perofrms the following checks depending on the activity type: 
-            1. TASK: both start_date and end_date are set
+        Checks all the activities at once, raising with the rows of every error:
+            1. TASK: both start_date and end_date are set, and the end is not before the start
             2. MILESTONE: start_date is set
             """
-        for activity in self.activities:
-            match activity.activity_type:
-                case ActivityTypeEnum.TASK:
-                    if not activity.start_date or not activity.end_date:
-                        raise ValueError(
-                            f"Activity {activity.activity} is missing start_date or end_date")
-                case ActivityTypeEnum.MILESTONE:
-                    if not activity.start_date:
-                        raise ValueError(
-                            f"Activity {activity.activity} is missing start_date")
+        report = validate_activities(self.activities)
+        if not report.is_valid:
+            raise PlanValidationError(report)
 
     def _add_depenencies(self, dependencies, show_key: str, marker_symbol: str, fig: go.Figure, numerate=False) -> go.Figure:
+        """ Draws the markers with one scatter trace per activity category,
+        so the figure is validated once and the legend keeps one entry per category.
+        The markers on the critical path are drawn in CRITICAL_PATH_COLOR """
         if not dependencies.empty:
-            for _, dependency in dependencies.iterrows():
-                fig.add_trace(go.Scatter(
-                    x=[dependency['Start Date']],
-                    y=[dependency[show_key]],
-                    mode='markers',
-                    marker=dict(
-                        symbol=marker_symbol, size=GanttChartGenerator.LABEL_TEXT_SIZE, color='blue'),
-                    text=dependency['Activity'],
-                    textposition='top center',
-                    name=dependency['Activity Category']
-                ))
+            with stage("markers"):
+                traces = [
+                    go.Scatter(
+                        x=group['Start Date'],
+                        y=group[show_key],
+                        mode='markers',
+                        marker=dict(
+                            symbol=marker_symbol, size=GanttChartGenerator.LABEL_TEXT_SIZE,
+                            color=np.where(group['Critical'], CRITICAL_PATH_COLOR, MARKER_COLOR)
+                            if 'Critical' in group else MARKER_COLOR),
+                        text=group['Activity'],
+                        textposition='top center',
+                        name=category
+                    )
+                    for category, group in dependencies.groupby('Activity Category', sort=False, dropna=False)]
+                fig.add_traces(traces)
         return fig
 
     def draw_chart(self) -> go.Figure:
-        self._validate_activities()
+        with stage("draw"):
+            return self._draw_validated_chart()
+
+    def _draw_validated_chart(self) -> go.Figure:
+        if not self.checked:
+            with stage("validate"):
+                self._validate_activities()
         fig = self._draw_chart()
         fig.update_yaxes(
             title_font=dict(size=GanttChartGenerator.AXIS_TEXT_SIZE),
@@ -119,7 +175,7 @@ class GanttChartGenerator(ABC):
 
 
 class GanttChartSubStreamGenerator(GanttChartGenerator):
-    def __init__(self, activities: List[ActivityDTO],
+    def __init__(self, activities: Union[ActivityTable, List[ActivityDTO]],
                  title="Gantt Chart",
                  **kwargs
                  ):
@@ -127,34 +183,22 @@ class GanttChartSubStreamGenerator(GanttChartGenerator):
 
     def _draw_chart(self) -> go.Figure:
 
-        df = pd.DataFrame([{
-            'Sub Stream': activity.sub_stream,
-            'Activity': activity.activity,
-            'Activity Category': activity.activity_category,
-            'Activity Type': activity.activity_type,
-            'Start Date': activity.start_date,
-            'End Date': activity.end_date,
-        } for activity in map(
-            to_gantt_row, self.activities)])
-
-        sub_streams = df['Sub Stream'].unique()
+        df = self._gantt_frame()
+
         show_key = 'Activity'
         df = df.sort_values(by=[show_key, 'Start Date'], ascending=True)
-        category_orders = {
-            "Sub Stream": sub_streams,
-            "Activity Category": [
-                e.value for e in ActivityCategoryEnum.get_ordered()]
-        }
-        fig = px.timeline(df,
-                          x_start="Start Date",
-                          x_end="End Date",
-                          y=show_key,
-                          color="Activity Category",
-                          title=self.title,
-                          text="Activity",
-                          category_orders=category_orders,
-                          color_discrete_map=color_from_activity_category()
-                          )
+        fig = timeline(df,
+                       x_start="Start Date",
+                       x_end="End Date",
+                       y=show_key,
+                       color="Activity Category",
+                       title=self.title,
+                       text="Activity",
+                       category_order=[e.value for e in ActivityCategoryEnum.get_ordered()],
+                       color_map=color_from_activity_category(),
+                       highlight='Critical' if self.critical_rows is not None else None,
+                       highlight_color=CRITICAL_PATH_COLOR
+                       )
         for shape in fig['data']:
             shape['opacity'] = 0.85
 
@@ -172,6 +216,9 @@ class GanttChartSubStreamGenerator(GanttChartGenerator):
         # Add scatter plot for milestones
         self._add_depenencies(dependencies, show_key, DEPENDENCY_SYMBOL, fig)
 
+        if self.critical_rows is not None:
+            self._add_critical_path_legend(fig)
+
         fig.update_layout(xaxis_title="Date",
                           yaxis_title="Sub Stream",
                           showlegend=not self.hide_legend)
@@ -179,7 +226,7 @@ class GanttChartSubStreamGenerator(GanttChartGenerator):
 
 
 class GanttChartActivityGenerator(GanttChartGenerator):
-    def __init__(self, activities: List[ActivityDTO],
+    def __init__(self, activities: Union[ActivityTable, List[ActivityDTO]],
                  title="Gantt Chart",
                  **kwargs
                  ):
@@ -187,34 +234,23 @@ class GanttChartActivityGenerator(GanttChartGenerator):
 
     def _draw_chart(self) -> go.Figure:
 
-        df = pd.DataFrame([{
-            'Sub Stream': activity.sub_stream,
-            'Activity': activity.activity,
-            'Activity Category': activity.activity_category,
-            'Activity Type': activity.activity_type,
-            'Start Date': activity.start_date,
-            'End Date': activity.end_date,
-        } for activity in map(to_gantt_row, self.activities)])
+        df = self._gantt_frame()
 
-        sub_streams = df['Sub Stream'].unique()
         show_key = 'Activity Category'
-        actual_activities = {e.activity_category for e in self.activities}
+        actual_activities = set(self.activities.categories())
         df = df.sort_values(by=[show_key, 'Start Date'], ascending=True)
-        category_orders = {
-            "Sub Stream": sub_streams,
-            "Activity Category": [
-                e.value for e in ActivityCategoryEnum.get_ordered() if e in actual_activities]
-        }
-        fig = px.timeline(df,
-                          x_start="Start Date",
-                          x_end="End Date",
-                          y=show_key,
-                          color="Activity Category",
-                          title=self.title,
-                          # text="Activity",
-                          category_orders=category_orders,
-                          color_discrete_map=color_from_activity_category()
-                          )
+        fig = timeline(df,
+                       x_start="Start Date",
+                       x_end="End Date",
+                       y=show_key,
+                       color="Activity Category",
+                       title=self.title,
+                       category_order=[
+                           e.value for e in ActivityCategoryEnum.get_ordered() if e in actual_activities],
+                       color_map=color_from_activity_category(),
+                       highlight='Critical' if self.critical_rows is not None else None,
+                       highlight_color=CRITICAL_PATH_COLOR
+                       )
 
         # Extract milestones
         milestones = df[df['Activity Type'] ==
@@ -230,7 +266,69 @@ class GanttChartActivityGenerator(GanttChartGenerator):
         # Add scatter plot for milestones
         self._add_depenencies(dependencies, show_key, DEPENDENCY_SYMBOL, fig)
 
+        if self.critical_rows is not None:
+            self._add_critical_path_legend(fig)
+
         fig.update_layout(xaxis_title="Date",
                           yaxis_title="Activity",
                           showlegend=not self.hide_legend)
         return fig
+
+
+class GanttChartOverviewGenerator(GanttChartGenerator):
+    """ Draws one row per sub-stream, with the tasks of each category merged
+    into the spans they cover, so the chart stays small however large the plan.
+
+    At most `max_rows` rows are drawn, the streams past the cap sharing the
+    last one. `detail_links` maps the streams to the URL of their detail chart,
+    linked from their row label. The critical path is left to the detail charts."""
+
+    def __init__(self, activities: Union[ActivityTable, List[ActivityDTO]],
+                 title="Gantt Chart Overview",
+                 max_rows: int = DEFAULT_MAX_ROWS,
+                 resolution: int = DEFAULT_RESOLUTION,
+                 detail_links: Optional[Dict[str, str]] = None,
+                 **kwargs
+                 ):
+        super().__init__(activities, title, **kwargs)
+        self.max_rows = max_rows
+        self.resolution = resolution
+        self.detail_links = detail_links or {}
+
+    def _drawing_options(self) -> List:
+        return [*super()._drawing_options(), self.max_rows, self.resolution, sorted(self.detail_links.items())]
+
+    def _draw_chart(self) -> go.Figure:
+        show_key = 'Sub Stream'
+        rows = overview_rows(list(self.activities.positions_by_sub_stream()), self.max_rows)
+        spans = merge_spans(self.activities, rows, self.resolution)
+        fig = timeline(spans,
+                       x_start="Start Date",
+                       x_end="End Date",
+                       y=show_key,
+                       color="Activity Category",
+                       title=self.title,
+                       category_order=[e.value for e in ActivityCategoryEnum.get_ordered()],
+                       color_map=color_from_activity_category()
+                       )
+        for shape in fig['data']:
+            shape['opacity'] = 0.85
+
+        markers = merge_markers(self.activities, rows)
+        markers['Activity'] = markers['Activity Type']
+        self._add_depenencies(markers[markers['Activity Type'] == ActivityTypeEnum.MILESTONE.value],
+                              show_key, MILESTONE_SYMBOL, fig)
+        self._add_depenencies(markers[markers['Activity Type'] == ActivityTypeEnum.DEPENDENCY.value],
+                              show_key, DEPENDENCY_SYMBOL, fig)
+
+        # The streams top down, in the order of the plan
+        row_labels = list(dict.fromkeys(rows.values()))
+        fig.update_yaxes(categoryorder='array', categoryarray=list(reversed(row_labels)))
+        if self.detail_links:
+            fig.update_yaxes(tickmode='array', tickvals=row_labels,
+                             ticktext=[f'<a href="{html.escape(self.detail_links[row])}">{html.escape(str(row))}</a>'
+                                       if row in self.detail_links else row for row in row_labels])
+        fig.update_layout(xaxis_title="Date",
+                          yaxis_title="Sub Stream",
+                          showlegend=not self.hide_legend)
+        return fig
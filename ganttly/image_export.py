@@ -0,0 +1,195 @@
+# image_export.py
+
+import json
+import os
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, Deque, List, Optional, Tuple
+
+import plotly
+import plotly.graph_objects as go
+
+from ganttly.configuration import IMAGE_FORMATS
+from ganttly.gantt_chart_aggregator import chart_json
+from ganttly.overview import file_stem
+from ganttly.profiling import stage
+
+# Size of the exported images, in pixels: the charts are drawn for a wide slide
+DEFAULT_IMAGE_WIDTH = 1920
+DEFAULT_IMAGE_HEIGHT = 1080
+# Figures sent to a renderer process at once
+DEFAULT_BATCH_SIZE = 4
+# Batches submitted ahead of the ones being written, per process
+_BATCHES_IN_FLIGHT_PER_WORKER = 2
+_MISSING_KALEIDO = "Exporting images needs the kaleido package (pip install kaleido)"
+
+# (output path, figure as JSON)
+ExportJob = Tuple[str, str]
+
+
+@dataclass
+class ExportedImage:
+    path: str
+    seconds: float
+    size: int
+
+
+class KaleidoRenderer:
+    """ Converts figures with one kaleido renderer, started once and reused.
+
+    The renderer loads the plotly.js shipped with plotly and no MathJax, so
+    nothing is fetched from the network."""
+
+    def __init__(self):
+        try:
+            from kaleido.scopes.plotly import PlotlyScope
+        except ImportError as e:
+            raise ValueError(_MISSING_KALEIDO) from e
+        plotlyjs = os.path.join(os.path.dirname(plotly.__file__), "package_data", "plotly.min.js")
+        self._scope = PlotlyScope(plotlyjs=plotlyjs, mathjax=False)
+
+    def export(self, figure_json: str, image_format: str, width: int, height: int) -> bytes:
+        return self._scope.transform(json.loads(figure_json), format=image_format, width=width, height=height)
+
+
+def check_renderer(image_format: str):
+    """ Raises ValueError when `image_format` can't be exported here """
+    if image_format not in IMAGE_FORMATS:
+        raise ValueError(f"Unknown image format '{image_format}', expected one of: {', '.join(IMAGE_FORMATS)}")
+    import importlib.util
+    if importlib.util.find_spec("kaleido") is None:
+        raise ValueError(_MISSING_KALEIDO)
+
+
+# The renderer of the current process, started by the pool initializer
+_renderer = None
+
+
+def _start_renderer(renderer_factory: Callable):
+    global _renderer
+    _renderer = renderer_factory()
+
+
+def _export_batch(jobs: List[ExportJob], image_format: str, width: int, height: int,
+                  renderer=None) -> List[ExportedImage]:
+    renderer = renderer if renderer is not None else _renderer
+    if renderer is None:
+        raise ValueError("The renderer must be started before exporting charts")
+    exported = []
+    for path, figure_json in jobs:
+        started = time.perf_counter()
+        with stage("export"):
+            image = renderer.export(figure_json, image_format, width, height)
+            with open(path, 'wb') as f:
+                f.write(image)
+        exported.append(ExportedImage(path, time.perf_counter() - started, len(image)))
+    return exported
+
+
+class ImageExporter:
+    """ Exports the charts to image files as they are added.
+
+    The files are named after the output file, the chart position and its
+    title. With more than one worker the figures are sent in batches to a pool
+    of processes, each keeping its renderer running across batches; otherwise
+    a single renderer runs in this process. `exported` lists the files written,
+    in chart order, with the time spent on each."""
+
+    def __init__(self, image_format: str, workers: int = 1,
+                 width: int = DEFAULT_IMAGE_WIDTH, height: int = DEFAULT_IMAGE_HEIGHT,
+                 renderer_factory: Callable = KaleidoRenderer,
+                 batch_size: int = DEFAULT_BATCH_SIZE):
+        if image_format not in IMAGE_FORMATS:
+            raise ValueError(f"Unknown image format '{image_format}', expected one of: {', '.join(IMAGE_FORMATS)}")
+        self.image_format = image_format
+        self.workers = workers
+        self.width = width
+        self.height = height
+        self.renderer_factory = renderer_factory
+        self.batch_size = max(batch_size, 1)
+        self.exported: List[ExportedImage] = []
+        self._output_file: Optional[str] = None
+        self._renderer = None
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._batch: List[ExportJob] = []
+        self._pending: Deque[Future] = deque()
+        self._charts_added = 0
+
+    def open(self, output_file: str) -> 'ImageExporter':
+        self._output_file = output_file
+        self.exported = []
+        self._charts_added = 0
+        if self.workers > 1:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers, initializer=_start_renderer,
+                                                 initargs=(self.renderer_factory,))
+        elif self._renderer is None:
+            self._renderer = self.renderer_factory()
+        return self
+
+    def image_path(self, position: int, title: Optional[str] = None) -> str:
+        if self._output_file is None:
+            raise ValueError("The exporter must be opened before naming images")
+        base = os.path.splitext(self._output_file)[0]
+        name = f"{base}-{position + 1:02d}"
+        if title:
+            name = f"{name}-{file_stem(title, default='chart')}"
+        return f"{name}.{self.image_format}"
+
+    def add_chart(self, chart: go.Figure, title: Optional[str] = None):
+        if self._output_file is None:
+            raise ValueError("The exporter must be opened before adding charts")
+        job = (self.image_path(self._charts_added, title), chart_json(chart))
+        self._charts_added += 1
+        if self._executor is None:
+            self.exported += _export_batch([job], self.image_format, self.width, self.height, self._renderer)
+            return
+        self._batch.append(job)
+        if len(self._batch) >= self.batch_size:
+            self._submit()
+
+    def _submit(self):
+        if self._executor is None:
+            raise ValueError("The exporter must be opened with workers before submitting batches")
+        self._pending.append(self._executor.submit(
+            _export_batch, self._batch, self.image_format, self.width, self.height))
+        self._batch = []
+        # Figures wait in the pool rather than pile up in this process
+        while len(self._pending) > self.workers * _BATCHES_IN_FLIGHT_PER_WORKER:
+            self.exported += self._pending.popleft().result()
+
+    def close(self):
+        if self._executor is None:
+            return
+        try:
+            if self._batch:
+                self._submit()
+            while self._pending:
+                self.exported += self._pending.popleft().result()
+        finally:
+            self.discard()
+
+    def discard(self):
+        if self._executor is not None:
+            self._executor.shutdown(cancel_futures=True)
+            self._executor = None
+        self._batch = []
+        self._pending.clear()
+
+    def __enter__(self) -> 'ImageExporter':
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+        else:
+            self.discard()
+
+
+def describe_exports(exported: List[ExportedImage]) -> str:
+    """ One line per exported image with its time, then the totals """
+    lines = [f"{image.path}: {image.seconds:.2f}s, {image.size / 1024:,.0f} KB" for image in exported]
+    total = sum(image.seconds for image in exported)
+    lines.append(f"{len(exported)} images exported, {total:.2f}s of rendering")
+    return "\n".join(lines)
@@ -0,0 +1,129 @@
+# interval_index.py
+
+from datetime import datetime
+from typing import List, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from ganttly.activity_table import ActivityTable
+from ganttly.dto import ActivityTypeEnum
+
+# Activities a node of the index scans directly rather than splitting further
+LEAF_SIZE = 64
+
+DateBound = Optional[Union[datetime, np.datetime64, str]]
+# (from, to), either end open when None
+DateWindow = Tuple[DateBound, DateBound]
+
+
+def _bound(value: DateBound, default: int) -> int:
+    if value is None:
+        return default
+    return int(pd.Timestamp(value).value)
+
+
+class ActivityIntervalIndex:
+    """ Centered interval tree over the dates of the activities of a table.
+
+    Tasks span their start to their end date, the other activities their
+    start date only; activities without a start date are never found. Each node
+    keeps the activities spanning its center sorted by start and by end, so a
+    window query walks one path down the tree, plus the nodes inside the
+    window, and takes a prefix of each list: O(log n + k) for k activities
+    found. The index is built once per table and can serve any number of
+    queries."""
+
+    def __init__(self, table: ActivityTable):
+        starts = table.start_date.astype(np.int64)
+        is_task = table.activity_type.values() == ActivityTypeEnum.TASK
+        ends = np.where(is_task & ~np.isnat(table.end_date), table.end_date.astype(np.int64), starts)
+        self._starts = starts
+        self._ends = np.maximum(starts, ends)
+        self.size = len(table)
+        # Per node: center, children, and the positions spanning the center by
+        # start ascending and by end descending, with those dates
+        self._centers: List[int] = []
+        self._children: List[Tuple[int, int]] = []
+        self._by_start: List[np.ndarray] = []
+        self._sorted_starts: List[np.ndarray] = []
+        self._by_end: List[np.ndarray] = []
+        self._negated_ends: List[np.ndarray] = []
+        self._root = self._build(np.flatnonzero(~np.isnat(table.start_date)))
+
+    def _build(self, positions: np.ndarray) -> int:
+        """ Adds the node of `positions` and its subtrees, returning its number """
+        if len(positions) == 0:
+            return -1
+        node = len(self._centers)
+        self._centers.append(0)
+        self._children.append((-1, -1))
+        starts, ends = self._starts[positions], self._ends[positions]
+        if len(positions) <= LEAF_SIZE:
+            # A leaf is scanned whole: it keeps its positions in the start list only
+            self._add_lists(positions, starts, ends)
+            self._children[node] = (-2, -2)
+            return node
+
+        endpoints = np.concatenate([starts, ends])
+        center = int(np.partition(endpoints, len(endpoints) // 2)[len(endpoints) // 2])
+        before, after = ends < center, starts > center
+        spanning = ~before & ~after
+        self._centers[node] = center
+        self._add_lists(positions[spanning], starts[spanning], ends[spanning])
+        self._children[node] = (self._build(positions[before]), self._build(positions[after]))
+        return node
+
+    def _add_lists(self, positions: np.ndarray, starts: np.ndarray, ends: np.ndarray):
+        by_start = np.argsort(starts, kind='stable')
+        by_end = np.argsort(-ends, kind='stable')
+        self._by_start.append(positions[by_start])
+        self._sorted_starts.append(starts[by_start])
+        self._by_end.append(positions[by_end])
+        self._negated_ends.append(-ends[by_end])
+
+    def overlapping(self, start: DateBound = None, end: DateBound = None) -> np.ndarray:
+        """ The positions of the activities running at some time between
+        `start` and `end` included, in table order. Either bound can be left open """
+        low = _bound(start, np.iinfo(np.int64).min)
+        high = _bound(end, np.iinfo(np.int64).max)
+        if low > high:
+            raise ValueError(f"The window starts after it ends: {start} > {end}")
+        found = []
+        pending = [self._root]
+        while pending:
+            node = pending.pop()
+            if node < 0:
+                continue
+            left, right = self._children[node]
+            if left == -2:
+                positions = self._by_start[node]
+                found.append(positions[(self._starts[positions] <= high) & (self._ends[positions] >= low)])
+                continue
+            center = self._centers[node]
+            if high < center:
+                # Every activity of the node ends after the window: those starting in time overlap it
+                found.append(self._by_start[node][:np.searchsorted(self._sorted_starts[node], high, 'right')])
+                pending.append(left)
+            elif low > center:
+                # Every activity of the node starts before the window: those ending in time overlap it
+                found.append(self._by_end[node][:np.searchsorted(self._negated_ends[node], -low, 'right')])
+                pending.append(right)
+            else:
+                found.append(self._by_start[node])
+                pending += [left, right]
+        if not found:
+            return np.array([], dtype=np.int64)
+        return np.sort(np.concatenate(found))
+
+
+def clip_to_window(table: ActivityTable, positions: np.ndarray,
+                   start: DateBound = None, end: DateBound = None) -> ActivityTable:
+    """ The activities of `table` at `positions`, with the task bars cut at the window bounds """
+    window = table.take(positions)
+    if start is not None:
+        window.start_date = np.maximum(window.start_date, np.datetime64(pd.Timestamp(start), 'ns'))
+    if end is not None:
+        # Only tasks have an end date: the missing ones stay missing
+        window.end_date = np.minimum(window.end_date, np.datetime64(pd.Timestamp(end), 'ns'))
+    return window
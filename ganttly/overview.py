@@ -0,0 +1,105 @@
+# overview.py
+
+import re
+from typing import Dict, Hashable, Iterable, List
+
+import numpy as np
+import pandas as pd
+
+from ganttly.activity_table import ActivityTable, _label_values
+from ganttly.dto import ActivityTypeEnum
+
+# Number of time slots the overview tells apart across the plan: spans closer
+# than one slot are merged, so the detail follows the time range drawn
+DEFAULT_RESOLUTION = 400
+OTHER_STREAMS_LABEL = "Other ({} streams)"
+
+
+def overview_rows(streams: List[Hashable], max_rows: int) -> Dict[Hashable, str]:
+    """ The row of each stream: its own for the first `max_rows - 1` ones and
+    a shared one for the others, when there are more than `max_rows` streams """
+    if max_rows <= 0 or len(streams) <= max_rows:
+        return {stream: stream for stream in streams}
+    kept = streams[:max_rows - 1]
+    other = OTHER_STREAMS_LABEL.format(len(streams) - len(kept))
+    return {stream: stream if position < len(kept) else other for position, stream in enumerate(streams)}
+
+
+def merge_tolerance(start: pd.Series, end: pd.Series, resolution: int = DEFAULT_RESOLUTION) -> pd.Timedelta:
+    """ The gap under which two spans are drawn as one, for the time range of the spans """
+    if start.empty:
+        return pd.Timedelta(0)
+    return (end.max() - start.min()) / max(resolution, 1)
+
+
+def merge_spans(table: ActivityTable, rows: Dict[Hashable, str],
+                resolution: int = DEFAULT_RESOLUTION) -> pd.DataFrame:
+    """ Merges the tasks of each overview row and category into the spans they cover.
+
+    Tasks overlapping, or closer than the level of detail of `resolution` slots
+    over the whole plan, make one span. Returns a frame with the Sub Stream row,
+    Activity Category, Start Date, End Date and the number of Activities merged,
+    the rows in the order of `rows`."""
+    is_task = (table.activity_type.values() == ActivityTypeEnum.TASK) \
+        & ~np.isnat(table.start_date) & ~np.isnat(table.end_date)
+    row_labels = list(dict.fromkeys(rows.values()))
+    tasks = pd.DataFrame({
+        'Sub Stream': pd.Categorical(table.sub_stream.map_labels(rows.get).values()[is_task],
+                                     categories=row_labels),
+        'Activity Category': _label_values(table.activity_category)[is_task],
+        'Start Date': table.start_date[is_task],
+        'End Date': table.end_date[is_task],
+    })
+    tolerance = merge_tolerance(tasks['Start Date'], tasks['End Date'], resolution)
+
+    tasks = tasks.sort_values(['Sub Stream', 'Activity Category', 'Start Date'], kind='stable')
+    group_keys = [tasks['Sub Stream'], tasks['Activity Category']]
+    # The furthest end reached so far in the group: a task starting past it, by
+    # more than the tolerance, opens a new span
+    reach = tasks.groupby(group_keys, observed=True, sort=False)['End Date'].cummax()
+    previous_reach = reach.groupby(group_keys, observed=True, sort=False).shift()
+    opens_span = previous_reach.isna() | (tasks['Start Date'] > previous_reach + tolerance)
+    spans = tasks.groupby(opens_span.cumsum().to_numpy(), sort=False).agg(**{
+        'Sub Stream': ('Sub Stream', 'first'),
+        'Activity Category': ('Activity Category', 'first'),
+        'Start Date': ('Start Date', 'min'),
+        'End Date': ('End Date', 'max'),
+        'Activities': ('Start Date', 'size'),
+    })
+    spans['Sub Stream'] = spans['Sub Stream'].astype(object)
+    return spans.reset_index(drop=True)
+
+
+def merge_markers(table: ActivityTable, rows: Dict[Hashable, str]) -> pd.DataFrame:
+    """ The milestones and dependencies of the overview, one marker per row,
+    category, type and day """
+    activity_types = _label_values(table.activity_type)
+    is_marker = np.isin(activity_types, [ActivityTypeEnum.MILESTONE.value, ActivityTypeEnum.DEPENDENCY.value]) \
+        & ~np.isnat(table.start_date)
+    markers = pd.DataFrame({
+        'Sub Stream': table.sub_stream.map_labels(rows.get).values()[is_marker],
+        'Activity Category': _label_values(table.activity_category)[is_marker],
+        'Activity Type': activity_types[is_marker],
+        'Start Date': pd.Series(table.start_date[is_marker]).dt.normalize().to_numpy(),
+    })
+    return markers.drop_duplicates().reset_index(drop=True)
+
+
+def file_stem(name: Hashable, default: str = "stream") -> str:
+    """ `name` with only the characters that are safe in a file name """
+    return re.sub(r'[^\w.-]+', '_', str(name)).strip('._') or default
+
+
+def detail_file_names(streams: Iterable[Hashable]) -> Dict[Hashable, str]:
+    """ A distinct file name per stream for its detail report """
+    names: Dict[Hashable, str] = {}
+    used = set()
+    for stream in streams:
+        base = file_stem(stream)
+        name, suffix = base, 1
+        while name.lower() in used:
+            suffix += 1
+            name = f"{base}_{suffix}"
+        used.add(name.lower())
+        names[stream] = f"{name}.html"
+    return names
@@ -0,0 +1,46 @@
+# parallel_render.py
+
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterable, Iterator, Tuple, Union
+
+from ganttly.gantt_chart_aggregator import render_chart
+from ganttly.gantt_chart_generator import GanttChartGenerator
+from ganttly.profiling import stage
+
+# Charts submitted ahead of the one being written, per process
+_CHARTS_IN_FLIGHT_PER_JOB = 2
+
+
+def _draw_and_render(job: Tuple[Union[int, str], GanttChartGenerator]) -> str:
+    key, generator = job
+    with stage("chart", generator.title):
+        return render_chart(generator.draw_chart(), key)
+
+
+def render_charts(jobs: Iterable[Tuple[Union[int, str], GanttChartGenerator]], processes: int) -> Iterator[str]:
+    """ Draws and renders each (div key, generator) pair, in a pool of
+    `processes` processes when more than one.
+
+    The fragments are yielded in the order of `jobs` and are the same that
+    `render_chart` produces serially. Only a few charts per process are in
+    flight at any time, so the rendered fragments can be written out as they
+    come without piling up in memory."""
+    if processes <= 1:
+        yield from map(_draw_and_render, jobs)
+        return
+    pending = deque()
+    with ProcessPoolExecutor(max_workers=processes) as executor:
+        for job in jobs:
+            pending.append(executor.submit(_draw_and_render, job))
+            if len(pending) >= processes * _CHARTS_IN_FLIGHT_PER_JOB:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def render_charts_in_parallel(generators: Iterable[GanttChartGenerator], jobs: int,
+                              first_position: int = 0) -> Iterator[str]:
+    """ Draws and renders each chart in a pool of `jobs` processes, keyed by
+    its position in the report starting at `first_position` """
+    return render_charts(enumerate(generators, start=first_position), jobs)
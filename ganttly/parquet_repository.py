@@ -0,0 +1,39 @@
+# parquet_repository.py
+
+from typing import List, Optional
+
+import pandas as pd
+
+from ganttly.repository import ActivityRepository, dates_as_text, parse_dates
+
+
+def _require_pyarrow():
+    try:
+        import pyarrow.parquet  # noqa: F401
+    except ImportError:
+        raise ValueError("Reading and writing Parquet files needs the pyarrow package (pip install pyarrow)")
+
+
+class ParquetRepository(ActivityRepository):
+    """ Reads the plan from a Parquet file, memory-mapped, decoding only the
+    known columns. Dates stored as timestamps are used as they are. The sheet
+    name is not used """
+
+    def _read_sheet(self, sub_stream_filter: Optional[List[str]] = None) -> pd.DataFrame:
+        _require_pyarrow()
+        import pyarrow.parquet as pq
+
+        names = pq.read_schema(self.file_path).names
+        columns = [column for column in self._wanted_columns() if column in names]
+        # The whole columns are read, rather than the filtered rows only, so
+        # that the rows keep their position in the file
+        df = pd.read_parquet(self.file_path, columns=columns, memory_map=True)
+        return parse_dates(df.reset_index(drop=True))
+
+    @staticmethod
+    def write_frame(df: pd.DataFrame, file_path: str, sheet_name: str = "Sheet1"):
+        _require_pyarrow()
+        # A date column holding some text is stored as text
+        mixed = [column for column in ['Start Date', 'End Date']
+                 if column in df.columns and df[column].dtype == object]
+        (dates_as_text(df) if mixed else df).to_parquet(file_path, index=False)
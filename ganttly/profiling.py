@@ -0,0 +1,187 @@
+# profiling.py
+
+import cProfile
+import io
+import json
+import os
+import pstats
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence
+
+
+@dataclass
+class StageRecord:
+    name: str
+    # The stream the stage worked on, inherited from the enclosing stage
+    stream: Optional[str]
+    # Seconds from the start of the recording
+    started: float
+    wall: float
+    cpu: float
+    # Bytes allocated at the peak of the stage above what was allocated when
+    # it started, when memory is traced
+    peak_memory: Optional[int]
+    depth: int
+    pid: int
+    thread: int
+    # Whether the stage is the outermost one of its stream
+    opens_stream: bool = False
+
+
+StageHook = Callable[[StageRecord], None]
+
+
+class StageRecorder:
+    """ Times the stages run while it is active and passes each one, as it
+    ends, to the hooks.
+
+    Stages nest: the stream of a stage defaults to the one of the stage it runs
+    in. With `trace_memory` the peak of the memory allocated by Python is
+    followed with tracemalloc, which slows the run down."""
+
+    def __init__(self, hooks: Sequence[StageHook] = (), trace_memory: bool = False):
+        self.hooks = list(hooks)
+        self.trace_memory = trace_memory
+        self._origin = time.perf_counter()
+        self._stack: List[list] = []
+
+    @contextmanager
+    def activate(self) -> Iterator['StageRecorder']:
+        """ Records the stages run in this context """
+        started_tracing = self.trace_memory and not tracemalloc.is_tracing()
+        if started_tracing:
+            tracemalloc.start()
+        token = _active_recorder.set(self)
+        try:
+            yield self
+        finally:
+            _active_recorder.reset(token)
+            if started_tracing:
+                tracemalloc.stop()
+
+    @contextmanager
+    def stage(self, name: str, stream: Optional[str] = None) -> Iterator[None]:
+        enclosing_stream = self._stack[-1][0] if self._stack else None
+        stream = stream if stream is not None else enclosing_stream
+        memory_at_start = None
+        if self.trace_memory:
+            memory_at_start, peak = tracemalloc.get_traced_memory()
+            # The peak so far belongs to the enclosing stage
+            if self._stack:
+                self._stack[-1][1] = max(self._stack[-1][1], peak)
+            tracemalloc.reset_peak()
+        # [stream, highest peak of the nested stages]
+        self._stack.append([stream, 0])
+        started, cpu_started = time.perf_counter(), time.process_time()
+        try:
+            yield
+        finally:
+            wall, cpu = time.perf_counter() - started, time.process_time() - cpu_started
+            _, nested_peak = self._stack.pop()
+            peak_memory = None
+            if memory_at_start is not None:
+                peak = max(tracemalloc.get_traced_memory()[1], nested_peak)
+                peak_memory = max(peak - memory_at_start, 0)
+                if self._stack:
+                    self._stack[-1][1] = max(self._stack[-1][1], peak)
+            record = StageRecord(name, stream, started - self._origin, wall, cpu, peak_memory,
+                                 depth=len(self._stack), pid=os.getpid(), thread=threading.get_ident(),
+                                 opens_stream=stream is not None and stream != enclosing_stream)
+            for hook in self.hooks:
+                hook(record)
+
+
+_active_recorder: ContextVar[Optional[StageRecorder]] = ContextVar("ganttly_stage_recorder", default=None)
+
+
+@contextmanager
+def stage(name: str, stream: Optional[str] = None) -> Iterator[None]:
+    """ Marks a stage of the pipeline; costs nothing when no recorder is active """
+    recorder = _active_recorder.get()
+    if recorder is None:
+        yield
+        return
+    with recorder.stage(name, stream):
+        yield
+
+
+class Profile:
+    """ Stage hook keeping the records of a run, to summarize them or write
+    them as a trace-event file for a timeline viewer (chrome://tracing, Perfetto) """
+
+    def __init__(self):
+        self.records: List[StageRecord] = []
+
+    def __call__(self, record: StageRecord):
+        self.records.append(record)
+
+    def by_stage(self) -> Dict[str, List[StageRecord]]:
+        stages: Dict[str, List[StageRecord]] = {}
+        for record in sorted(self.records, key=lambda record: record.started):
+            stages.setdefault(record.name, []).append(record)
+        return stages
+
+    def by_stream(self) -> Dict[str, float]:
+        """ Wall time of the outermost stages of each stream """
+        streams: Dict[str, float] = {}
+        for record in self.records:
+            if record.opens_stream and record.stream is not None:
+                streams[record.stream] = streams.get(record.stream, 0.0) + record.wall
+        return streams
+
+    def summary(self, streams: int = 10) -> str:
+        """ The totals of each stage, then the slowest `streams` streams """
+        lines = [f"{'stage':<24}{'calls':>7}{'wall s':>10}{'cpu s':>10}{'peak MB':>10}"]
+        for name, records in self.by_stage().items():
+            peaks = [record.peak_memory for record in records if record.peak_memory is not None]
+            peak = f"{max(peaks) / 2 ** 20:10.1f}" if peaks else f"{'-':>10}"
+            indent = "  " * min(record.depth for record in records)
+            lines.append(f"{indent + name:<24}{len(records):>7}{sum(r.wall for r in records):10.3f}"
+                         f"{sum(r.cpu for r in records):10.3f}{peak}")
+        slowest = sorted(self.by_stream().items(), key=lambda item: item[1], reverse=True)[:streams]
+        if slowest:
+            lines.append(f"{'stream':<41}{'wall s':>10}")
+            lines += [f"{stream[:40]:<41}{wall:10.3f}" for stream, wall in slowest]
+        return "\n".join(lines)
+
+    def trace_events(self) -> dict:
+        """ The records in the Trace Event Format, as complete events """
+        events = []
+        for record in self.records:
+            args: Dict[str, Any] = {"cpu_ms": round(record.cpu * 1000, 3)}
+            if record.stream is not None:
+                args["stream"] = record.stream
+            if record.peak_memory is not None:
+                args["peak_memory_kb"] = round(record.peak_memory / 1024, 1)
+            events.append({"name": record.name, "cat": "ganttly", "ph": "X",
+                           "ts": round(record.started * 1e6, 1), "dur": round(record.wall * 1e6, 1),
+                           "pid": record.pid, "tid": record.thread, "args": args})
+        return {"traceEvents": sorted(events, key=lambda event: event["ts"]), "displayTimeUnit": "ms"}
+
+    def write_trace(self, path: str):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.trace_events(), f)
+
+
+@contextmanager
+def python_profile(path: str) -> Iterator[cProfile.Profile]:
+    """ Runs the block under cProfile and writes the statistics to `path` """
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield profiler
+    finally:
+        profiler.disable()
+        profiler.dump_stats(path)
+
+
+def describe_python_profile(path: str, limit: int = 20) -> str:
+    """ The `limit` functions with the highest cumulative time in the statistics at `path` """
+    output = io.StringIO()
+    pstats.Stats(path, stream=output).sort_stats(pstats.SortKey.CUMULATIVE).print_stats(limit)
+    return output.getvalue()
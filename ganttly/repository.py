@@ -0,0 +1,185 @@
+# repository.py
+
+import os
+from datetime import date
+from abc import ABC, abstractmethod
+from typing import List, Optional
+
+import pandas as pd
+
+from ganttly.activity_table import ActivityTable, first_data_row
+from ganttly.configuration import (INPUT_FORMAT_CSV, INPUT_FORMAT_EXCEL, INPUT_FORMAT_PARQUET, INPUT_FORMAT_SQLITE,
+                                   INPUT_FORMATS)
+from ganttly.profiling import stage
+from ganttly.validation import PlanValidationError, ValidationReport, validate_sheet
+from ganttly.workbook_cache import WorkbookCache
+
+DATE_COLUMNS = ['Start Date', 'End Date']
+
+# The input format of each file extension
+INPUT_FORMAT_EXTENSIONS = {
+    ".xlsx": INPUT_FORMAT_EXCEL,
+    ".xlsm": INPUT_FORMAT_EXCEL,
+    ".xls": INPUT_FORMAT_EXCEL,
+    ".csv": INPUT_FORMAT_CSV,
+    ".parquet": INPUT_FORMAT_PARQUET,
+    ".pq": INPUT_FORMAT_PARQUET,
+    ".sqlite": INPUT_FORMAT_SQLITE,
+    ".sqlite3": INPUT_FORMAT_SQLITE,
+    ".db": INPUT_FORMAT_SQLITE,
+}
+
+
+class ActivityRepository(ABC):
+    """ Reads the activities of a plan from a file.
+
+    Every backend returns the plan as a frame with the EXPECTED_COLUMNS and
+    whichever OPTIONAL_COLUMNS the file has, indexed by the position of each
+    row in the file, where the first row under the header is at 0. The columns
+    are then validated and turned into activities the same way for all of
+    them. `file_path` and `sheet_name` identify the plan in the stores."""
+
+    EXPECTED_COLUMNS = [
+        'Sub Stream',
+        'Activity',
+        'Activity Category',
+        'Activity Type',
+        'Start Date',
+        'End Date',
+    ]
+    OPTIONAL_COLUMNS = [
+        'Owner',
+        'State',
+        'Notes',
+        'Predecessors',
+    ]
+
+    def __init__(self, file_path: str, sheet_name: str = "Sheet1"):
+        self.file_path = file_path
+        self.sheet_name = sheet_name
+
+    def validate_columns(self, df: pd.DataFrame):
+        missing_columns = [
+            col for col in self.EXPECTED_COLUMNS if col not in df.columns]
+        if missing_columns:
+            raise ValueError(
+                f"Missing columns in {self._source()}: {', '.join(missing_columns)}")
+
+    def load_activities(self, sub_stream_filter: Optional[List[str]] = None) -> ActivityTable:
+        with stage("read"):
+            df = self._load_frame(sub_stream_filter)
+        with stage("build"):
+            activities = self._to_activities(df)
+        # Every row is checked before any chart work, so all the errors are reported at once
+        with stage("validate"):
+            report = validate_sheet(df, activities)
+        if not report.is_valid:
+            raise PlanValidationError(report, activities=activities)
+        return activities
+
+    def validate(self, sub_stream_filter: Optional[List[str]] = None) -> ValidationReport:
+        """ Checks the rows of the sheet without raising on their errors """
+        return validate_sheet(self._load_frame(sub_stream_filter))
+
+    def load_frame(self) -> pd.DataFrame:
+        """ The known columns of every row, as read from the file """
+        df = self._read_sheet()
+        self.validate_columns(df)
+        return df
+
+    def _load_frame(self, sub_stream_filter: Optional[List[str]] = None) -> pd.DataFrame:
+        df = self._read_sheet(sub_stream_filter)
+        # Validate the columns
+        self.validate_columns(df)
+
+        if sub_stream_filter:
+            df = df[df['Sub Stream'].isin(sub_stream_filter)]
+        return df
+
+    @abstractmethod
+    def _read_sheet(self, sub_stream_filter: Optional[List[str]] = None) -> pd.DataFrame:
+        """ Reads the known columns of the file. Backends able to skip the rows
+        of other sub-streams may, the caller filters what is left """
+
+    @staticmethod
+    @abstractmethod
+    def write_frame(df: pd.DataFrame, file_path: str, sheet_name: str = "Sheet1"):
+        """ Writes the columns of a plan, as `load_frame` returns them, to a file of the backend """
+
+    def _source(self) -> str:
+        """ The plan, as named in the errors """
+        return self.file_path
+
+    def _to_activities(self, df: pd.DataFrame) -> ActivityTable:
+        return ActivityTable.from_frame(df, first_data_row(df))
+
+    def _wanted_columns(self) -> List[str]:
+        return [*self.EXPECTED_COLUMNS, *self.OPTIONAL_COLUMNS]
+
+
+def parse_dates(df: pd.DataFrame) -> pd.DataFrame:
+    """ Turns the date columns read as text into dates, keeping the text of the
+    cells that are not dates for validation to report them, as read_excel does """
+    for column in DATE_COLUMNS:
+        if column not in df.columns or df[column].dtype != object:
+            continue
+        text = df[column]
+        # ISO dates, as the backends write them, are parsed vectorized; only the others one by one
+        parsed = pd.to_datetime(text, errors='coerce', format='ISO8601')
+        unparsed = parsed.isna() & text.notna()
+        if unparsed.any():
+            parsed[unparsed] = pd.to_datetime(text[unparsed], errors='coerce', format='mixed')
+            unparsed = parsed.isna() & text.notna()
+        df[column] = parsed.astype(object).where(~unparsed, text) if unparsed.any() else parsed
+    return df
+
+
+def dates_as_text(df: pd.DataFrame) -> pd.DataFrame:
+    """ A copy of `df` with the date columns written as ISO text, and the cells
+    that are not dates as they are, for the backends storing a column as a single type """
+    df = df.copy()
+    for column in DATE_COLUMNS:
+        if column in df.columns:
+            df[column] = [_iso(value) for value in df[column].astype(object)]
+    return df
+
+
+def _iso(value):
+    if isinstance(value, date):
+        return None if pd.isna(value) else value.isoformat()
+    return value
+
+
+def input_format_of(file_path: str, input_format: Optional[str] = None) -> str:
+    """ The format given, or the one of the file extension. Files with
+    another extension are read as Excel workbooks, as they always were """
+    if input_format is not None:
+        if input_format not in INPUT_FORMATS:
+            raise ValueError(f"Unknown input format '{input_format}', expected one of: {', '.join(INPUT_FORMATS)}")
+        return input_format
+    extension = os.path.splitext(file_path)[1].lower()
+    return INPUT_FORMAT_EXTENSIONS.get(extension, INPUT_FORMAT_EXCEL)
+
+
+def repository_class(input_format: str) -> type:
+    from ganttly.csv_repository import CsvRepository
+    from ganttly.excel_repository import ExcelRepository
+    from ganttly.parquet_repository import ParquetRepository
+    from ganttly.sqlite_repository import SqliteRepository
+
+    return {
+        INPUT_FORMAT_EXCEL: ExcelRepository,
+        INPUT_FORMAT_CSV: CsvRepository,
+        INPUT_FORMAT_PARQUET: ParquetRepository,
+        INPUT_FORMAT_SQLITE: SqliteRepository,
+    }[input_format]
+
+
+def open_repository(file_path: str, input_format: Optional[str] = None, sheet_name: str = "Sheet1",
+                    cache: Optional[WorkbookCache] = None, streaming: bool = False) -> ActivityRepository:
+    """ The repository reading `file_path`, in `input_format` or the one of its extension.
+    The cache and the streaming reader only apply to Excel workbooks """
+    input_format = input_format_of(file_path, input_format)
+    if input_format == INPUT_FORMAT_EXCEL:
+        return repository_class(input_format)(file_path, sheet_name, cache=cache, streaming=streaming)
+    return repository_class(input_format)(file_path, sheet_name)
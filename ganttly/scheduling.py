@@ -0,0 +1,221 @@
+# scheduling.py
+#
+# Critical path method over the activities of a plan. The optional
+# Predecessors column lists the activities each one waits for, separated by
+# ';': an activity of the same sub-stream by name, or one of another
+# sub-stream as 'Sub Stream/Activity'.
+
+from collections import deque
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from ganttly.activity_table import ActivityTable
+from ganttly.dto import ActivityTypeEnum
+
+PREDECESSOR_SEPARATOR = ";"
+STREAM_SEPARATOR = "/"
+
+
+class DependencyCycleError(ValueError):
+    """ Raised when the predecessors of the activities loop back on themselves """
+
+    def __init__(self, rows: List[int]):
+        shown = ", ".join(str(row) for row in rows[:10])
+        more = f" and {len(rows) - 10} more" if len(rows) > 10 else ""
+        super().__init__(f"The predecessors of rows {shown}{more} form a cycle")
+        self.rows = rows
+
+
+def _adjacency(sources: np.ndarray, targets: np.ndarray, size: int) -> Tuple[List[int], List[int]]:
+    """ The targets of the edges leaving each source, in compressed rows: those
+    of position p are neighbours[offsets[p]:offsets[p + 1]] """
+    offsets = np.zeros(size + 1, dtype=np.int64)
+    np.cumsum(np.bincount(sources, minlength=size), out=offsets[1:])
+    return targets[np.argsort(sources, kind='stable')].tolist(), offsets.tolist()
+
+
+@dataclass
+class DependencyGraph:
+    """ The edges from each predecessor to the activity waiting for it, as
+    positions into the table it was built from """
+    # Sheet row of each position
+    rows: np.ndarray
+    sources: np.ndarray
+    targets: np.ndarray
+    # (position, reference) of the references matching no activity
+    unknown: List[Tuple[int, str]]
+
+    @property
+    def size(self) -> int:
+        return len(self.rows)
+
+    @staticmethod
+    def from_table(table: ActivityTable) -> 'DependencyGraph':
+        """ Resolves the Predecessors column of `table`: a reference names an
+        activity of the same sub-stream first, and otherwise 'Sub Stream/Activity' """
+        listed = np.flatnonzero(pd.notna(table.predecessors))
+        if len(listed) == 0:
+            empty = np.array([], dtype=np.int64)
+            return DependencyGraph(table.row_number, empty, empty, [])
+
+        # The first activity of each (sub-stream, name), names compared as text
+        streams = table.sub_stream.values().tolist()
+        names = [str(name) for name in table.activity.tolist()]
+        keys = list(zip(streams, names))
+        positions = dict(zip(reversed(keys), range(len(keys) - 1, -1, -1)))
+
+        sources, targets, unknown = [], [], []
+        for target, text in zip(listed.tolist(), table.predecessors[listed].tolist()):
+            for reference in str(text).split(PREDECESSOR_SEPARATOR):
+                reference = reference.strip()
+                if not reference:
+                    continue
+                source = positions.get((streams[target], reference))
+                if source is None:
+                    stream, separator, name = reference.partition(STREAM_SEPARATOR)
+                    source = positions.get((stream, name)) if separator else None
+                if source is None:
+                    unknown.append((target, reference))
+                else:
+                    sources.append(source)
+                    targets.append(target)
+        return DependencyGraph(table.row_number, np.array(sources, dtype=np.int64),
+                               np.array(targets, dtype=np.int64), unknown)
+
+    def topological_order(self) -> np.ndarray:
+        """ The positions linked by an edge, each after all its predecessors
+        (Kahn's algorithm, O(V + E)). Raises DependencyCycleError on a cycle """
+        linked = np.unique(np.concatenate([self.sources, self.targets]))
+        successors, offsets = _adjacency(self.sources, self.targets, self.size)
+        indegree = np.bincount(self.targets, minlength=self.size).tolist()
+
+        ready = deque(position for position in linked.tolist() if indegree[position] == 0)
+        order = []
+        while ready:
+            position = ready.popleft()
+            order.append(position)
+            for successor in successors[offsets[position]:offsets[position + 1]]:
+                indegree[successor] -= 1
+                if indegree[successor] == 0:
+                    ready.append(successor)
+        if len(order) < len(linked):
+            cycle = self.cycle_positions(np.array(order, dtype=np.int64))
+            raise DependencyCycleError(np.sort(self.rows[cycle]).tolist())
+        return np.array(order, dtype=np.int64)
+
+    def with_predecessors(self, positions: np.ndarray) -> np.ndarray:
+        """ `positions` and the positions they wait for, directly or not, sorted """
+        predecessors, offsets = _adjacency(self.targets, self.sources, self.size)
+        found = set(np.asarray(positions).tolist())
+        pending = list(found)
+        while pending:
+            position = pending.pop()
+            for predecessor in predecessors[offsets[position]:offsets[position + 1]]:
+                if predecessor not in found:
+                    found.add(predecessor)
+                    pending.append(predecessor)
+        return np.array(sorted(found), dtype=np.int64)
+
+    def without_cycles(self) -> 'DependencyGraph':
+        """ The graph without the edges into the positions of a cycle, which can then be ordered """
+        graph = self
+        while True:
+            try:
+                graph.topological_order()
+                return graph
+            except DependencyCycleError as e:
+                kept = ~np.isin(self.rows[graph.targets], e.rows)
+                graph = DependencyGraph(self.rows, graph.sources[kept], graph.targets[kept], self.unknown)
+
+    def cycle_positions(self, ordered: np.ndarray) -> np.ndarray:
+        """ The linked positions left out of the partial order `ordered` that
+        lead back to themselves, rather than only following a cycle """
+        left = np.setdiff1d(np.unique(np.concatenate([self.sources, self.targets])), ordered)
+        inside = np.isin(self.sources, left) & np.isin(self.targets, left)
+        sources, targets = self.sources[inside], self.targets[inside]
+        # Peel the positions no edge leaves from, which only follow a cycle
+        while True:
+            stuck = np.isin(targets, sources)
+            if stuck.all():
+                return np.unique(targets)
+            sources, targets = sources[stuck], targets[stuck]
+
+
+@dataclass
+class Schedule:
+    """ Earliest and latest dates of the activities of a table, by position.
+
+    `slack` is how long an activity can slip without moving the end of the
+    plan; the activities without slack form the critical path."""
+    earliest_start: np.ndarray
+    earliest_finish: np.ndarray
+    latest_start: np.ndarray
+    latest_finish: np.ndarray
+    slack: np.ndarray
+    critical: np.ndarray
+
+
+def schedule(table: ActivityTable, graph: Optional[DependencyGraph] = None) -> Schedule:
+    """ Runs the critical path method on the activities of `table`.
+
+    An activity starts on its start date, or as soon as its last predecessor
+    finishes if that is later, and lasts as long as planned: tasks from their
+    start to their end date, milestones and dependencies not at all. An
+    activity without a start date starts with the plan. The latest dates are
+    then worked back from the end of the plan. The activities without an edge
+    are computed on whole columns, and only the linked ones are walked in
+    topological order, so the cost is O(V + E)."""
+    graph = graph if graph is not None else DependencyGraph.from_table(table)
+    size = len(table)
+    start = table.start_date.astype(np.int64)
+    has_start = ~np.isnat(table.start_date)
+    is_task = (table.activity_type.values() == ActivityTypeEnum.TASK) & ~np.isnat(table.end_date)
+    duration = np.where(is_task & has_start, table.end_date.astype(np.int64) - start, 0)
+    plan_start = start[has_start].min() if has_start.any() else 0
+
+    earliest_start = np.where(has_start, start, plan_start)
+    order = graph.topological_order()
+    if len(order):
+        predecessors, offsets = _adjacency(graph.targets, graph.sources, size)
+        es, length = earliest_start.tolist(), duration.tolist()
+        for position in order.tolist():
+            for predecessor in predecessors[offsets[position]:offsets[position + 1]]:
+                finish = es[predecessor] + length[predecessor]
+                if finish > es[position]:
+                    es[position] = finish
+        earliest_start = np.array(es, dtype=np.int64)
+    earliest_finish = earliest_start + duration
+
+    plan_finish = earliest_finish.max() if size else 0
+    latest_finish = np.full(size, plan_finish, dtype=np.int64)
+    if len(order):
+        successors, offsets = _adjacency(graph.sources, graph.targets, size)
+        lf, length = latest_finish.tolist(), duration.tolist()
+        for position in reversed(order.tolist()):
+            for successor in successors[offsets[position]:offsets[position + 1]]:
+                start_by = lf[successor] - length[successor]
+                if start_by < lf[position]:
+                    lf[position] = start_by
+        latest_finish = np.array(lf, dtype=np.int64)
+    latest_start = latest_finish - duration
+
+    slack = latest_start - earliest_start
+    return Schedule(
+        earliest_start=earliest_start.astype('datetime64[ns]'),
+        earliest_finish=earliest_finish.astype('datetime64[ns]'),
+        latest_start=latest_start.astype('datetime64[ns]'),
+        latest_finish=latest_finish.astype('datetime64[ns]'),
+        slack=slack.astype('timedelta64[ns]'),
+        # Rows without a date are scheduled through, but not drawn
+        critical=(slack <= 0) & has_start,
+    )
+
+
+def critical_rows(table: ActivityTable) -> np.ndarray:
+    """ The sheet rows of the activities on the critical path. The activities
+    on a dependency cycle are scheduled without their predecessors: the
+    validation reports the cycle, and only stops the charts drawing them """
+    return table.row_number[schedule(table, DependencyGraph.from_table(table).without_cycles()).critical]
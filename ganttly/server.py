@@ -0,0 +1,191 @@
+# server.py
+
+import dataclasses
+import os
+import sys
+import threading
+import traceback
+from collections import OrderedDict
+from datetime import datetime
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Hashable, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+from ganttly.activity_store import ActivityStore
+from ganttly.configuration import PLOTLYJS_FILE_NAME, GanttlyConfiguration
+from ganttly.gantly_command import GanttlyCommandFactory
+from ganttly.gantt_chart_aggregator import chart_json
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8050
+DEFAULT_MAX_REPORTS = 32
+DETAIL_URL = "/chart?filter={stream}"
+
+FORMAT_HTML = "html"
+FORMAT_JSON = "json"
+_PATHS = {
+    "/": FORMAT_HTML,
+    "/chart": FORMAT_HTML,
+    "/chart.html": FORMAT_HTML,
+    "/chart.json": FORMAT_JSON,
+}
+_CONTENT_TYPES = {
+    FORMAT_HTML: "text/html; charset=utf-8",
+    FORMAT_JSON: "application/json",
+}
+# Report options that can be set per request
+_FLAGS = ["per_stream", "group_per_activity", "hide_legend", "hide_title", "overview", "critical_path"]
+# Date window of the report, as YYYY-MM-DD, by query parameter
+_DATES = {"from": "window_start", "to": "window_end"}
+_TRUE = {"1", "true", "yes", "on", ""}
+_FALSE = {"0", "false", "no", "off"}
+
+
+def config_from_query(query: str, defaults: GanttlyConfiguration) -> GanttlyConfiguration:
+    """ Applies the query parameters of a request to the server configuration.
+
+    `filter` can be repeated or hold comma separated sub-streams; the flags
+    accept 1/0, true/false, yes/no and on/off; `from` and `to` are dates."""
+    parameters = parse_qs(query, keep_blank_values=True)
+    unknown = sorted(set(parameters) - {"filter", *_FLAGS, *_DATES})
+    if unknown:
+        raise ValueError(f"Unknown query parameters: {', '.join(unknown)}")
+    changes = {}
+    if "filter" in parameters:
+        changes["filter"] = [stream.strip() for value in parameters["filter"]
+                             for stream in value.split(",") if stream.strip()]
+    for flag in _FLAGS:
+        if flag in parameters:
+            value = parameters[flag][-1].lower()
+            if value not in _TRUE | _FALSE:
+                raise ValueError(f"Invalid value for {flag}: '{parameters[flag][-1]}'")
+            changes[flag] = value in _TRUE
+    for parameter, setting in _DATES.items():
+        if parameter in parameters:
+            value = parameters[parameter][-1]
+            try:
+                changes[setting] = datetime.strptime(value, "%Y-%m-%d") if value else None
+            except ValueError:
+                raise ValueError(f"Invalid date for {parameter}: '{value}', expected YYYY-MM-DD") from None
+    return dataclasses.replace(defaults, **changes)
+
+
+def _config_key(config: GanttlyConfiguration) -> Hashable:
+    return tuple((name, tuple(value) if isinstance(value, list) else value)
+                 for name, value in dataclasses.asdict(config).items())
+
+
+class ReportServer(ThreadingHTTPServer):
+    """ HTTP server rendering the reports of one workbook on demand.
+
+    Every request is served through `GanttlyCommandFactory` with the server
+    configuration updated by the query parameters. The commands share one
+    `ActivityStore`, so concurrent requests parse the workbook once, and the
+    last `max_reports` rendered responses are kept in an LRU. Both are dropped
+    as soon as the workbook changes on disk."""
+
+    daemon_threads = True
+
+    def __init__(self, address: Tuple[str, int], file_path: str,
+                 config: Optional[GanttlyConfiguration] = None,
+                 max_reports: int = DEFAULT_MAX_REPORTS,
+                 store: Optional[ActivityStore] = None,
+                 log_requests: bool = True):
+        super().__init__(address, ReportRequestHandler)
+        self.file_path = file_path
+        self.config = config or GanttlyConfiguration()
+        if self.config.detail_url is None:
+            # The overview rows drill down to the chart of their stream
+            self.config = dataclasses.replace(self.config, detail_url=DETAIL_URL)
+        self.max_reports = max_reports
+        self.store = store if store is not None else ActivityStore()
+        self.log_requests = log_requests
+        self.renders = 0
+        self._reports: "OrderedDict[Hashable, bytes]" = OrderedDict()
+        self._workbook_signature: Optional[Tuple[int, int]] = None
+        self._lock = threading.Lock()
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def render(self, config: GanttlyConfiguration, report_format: str) -> bytes:
+        """ The report for `config`, from the LRU when it was already rendered """
+        key = (self._check_workbook(), report_format, _config_key(config))
+        with self._lock:
+            if key in self._reports:
+                self._reports.move_to_end(key)
+                return self._reports[key]
+
+        command = GanttlyCommandFactory(self.file_path, config, self.store).create()
+        if report_format == FORMAT_JSON:
+            body = ('{"charts": [' + ",".join(chart_json(chart) for chart in command.draw_charts()) + ']}')
+        else:
+            body = command.render_report()
+        body = body.encode("utf-8")
+
+        with self._lock:
+            self.renders += 1
+            self._reports[key] = body
+            while len(self._reports) > self.max_reports:
+                self._reports.popitem(last=False)
+        return body
+
+    def _check_workbook(self) -> Tuple[int, int]:
+        stat = os.stat(self.file_path)
+        signature = (stat.st_mtime_ns, stat.st_size)
+        with self._lock:
+            if signature != self._workbook_signature:
+                if self._workbook_signature is not None:
+                    self.store.invalidate()
+                    self._reports.clear()
+                self._workbook_signature = signature
+        return signature
+
+
+class ReportRequestHandler(BaseHTTPRequestHandler):
+    server: ReportServer
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        if url.path == f"/{PLOTLYJS_FILE_NAME}":
+            # Pages rendered in directory mode load the library from the server
+            from plotly.offline import get_plotlyjs
+            self._send(HTTPStatus.OK, "text/javascript; charset=utf-8", get_plotlyjs().encode("utf-8"))
+            return
+        report_format = _PATHS.get(url.path)
+        if report_format is None:
+            self._send_error(HTTPStatus.NOT_FOUND, f"No report at {url.path}")
+            return
+        try:
+            config = config_from_query(url.query, self.server.config)
+            body = self.server.render(config, report_format)
+        except ValueError as e:
+            # Invalid parameters and plans that fail validation are the client's to fix
+            self._send_error(HTTPStatus.BAD_REQUEST, str(e))
+            return
+        except FileNotFoundError as e:
+            self._send_error(HTTPStatus.NOT_FOUND, str(e))
+            return
+        except Exception:
+            # Anything else, e.g. a corrupt workbook, is the server's: logged, and answered with a status
+            sys.stderr.write(f"Error rendering {self.path}:\n{traceback.format_exc()}")
+            self._send_error(HTTPStatus.INTERNAL_SERVER_ERROR, "The report could not be rendered, see the server log")
+            return
+        self._send(HTTPStatus.OK, _CONTENT_TYPES[report_format], body)
+
+    def _send_error(self, status: HTTPStatus, message: str):
+        self._send(status, "text/plain; charset=utf-8", f"Error: {message}\n".encode("utf-8"))
+
+    def _send(self, status: HTTPStatus, content_type: str, body: bytes):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        if self.server.log_requests:
+            sys.stderr.write(f"{self.address_string()} - {format % args}\n")
@@ -0,0 +1,245 @@
+# sheet_reader.py
+
+from bisect import bisect_right
+from typing import Any, Collection, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+import openpyxl
+import pandas as pd
+
+from ganttly.activity_table import HEADER_ROW_ATTR
+from ganttly.workbook_cache import WorkbookCache
+
+RowFilter = Tuple[str, Collection]
+
+
+class RowRanges:
+    """ Sorted, non overlapping ranges of sheet rows (1-based, inclusive) """
+
+    def __init__(self, ranges: Iterable[Tuple[int, int]]):
+        self.starts: List[int] = []
+        self.ends: List[int] = []
+        for start, end in sorted(ranges):
+            if self.ends and start <= self.ends[-1] + 1:
+                self.ends[-1] = max(self.ends[-1], end)
+            else:
+                self.starts.append(start)
+                self.ends.append(end)
+
+    def __contains__(self, row: int) -> bool:
+        position = bisect_right(self.starts, row) - 1
+        return position >= 0 and row <= self.ends[position]
+
+    @property
+    def last(self) -> int:
+        return self.ends[-1] if self.ends else 0
+
+
+class RowRangeIndex:
+    """ The row ranges where each value of a column appears.
+
+    Built during a full read and persisted next to the cached sheets, so that
+    the following filtered reads only decode the rows of the requested values."""
+
+    def __init__(self, column: str):
+        self.column = column
+        self.ranges: Dict[Any, List[List[int]]] = {}
+        self._last_row = 0
+
+    def add(self, row: int, value):
+        ranges = self.ranges.setdefault(value, [])
+        # Rows missing from the sheet between two visited ones are blank and
+        # can be absorbed by the range
+        if ranges and ranges[-1][1] == self._last_row:
+            ranges[-1][1] = row
+        else:
+            ranges.append([row, row])
+        self._last_row = row
+
+    def rows_for(self, values: Collection) -> RowRanges:
+        return RowRanges((start, end)
+                         for value in values
+                         for start, end in self.ranges.get(value, []))
+
+    def to_frame(self) -> pd.DataFrame:
+        """ One row per range, the form the index is cached in """
+        rows = [(value, start, end) for value, ranges in self.ranges.items() for start, end in ranges]
+        return pd.DataFrame({
+            'value': pd.Series([value for value, _, _ in rows], dtype=object),
+            'start': pd.Series([start for _, start, _ in rows], dtype=np.int64),
+            'end': pd.Series([end for _, _, end in rows], dtype=np.int64),
+        })
+
+    @staticmethod
+    def from_frame(column: str, df: pd.DataFrame) -> 'RowRangeIndex':
+        index = RowRangeIndex(column)
+        for value, start, end in zip(df['value'], df['start'].tolist(), df['end'].tolist()):
+            index.ranges.setdefault(value, []).append([start, end])
+        return index
+
+
+def _to_series(values: List) -> pd.Series:
+    series = pd.Series(values)
+    if series.dtype == object:
+        # Empty cells come back as None: read_excel reports them as NaN
+        series = series.where(series.notna(), np.nan)
+        if series.isna().all():
+            series = series.astype(float)
+    return series
+
+
+def _header_positions(header: Dict[int, Any], columns: Iterable[str]) -> Dict[str, int]:
+    positions = {}
+    for position, name in sorted(header.items()):
+        if name in columns and name not in positions:
+            positions[name] = position
+    return positions
+
+
+def read_sheet_streaming(file_path: str, sheet_name: str,
+                         columns: Sequence[str],
+                         optional_columns: Sequence[str] = (),
+                         row_filter: Optional[RowFilter] = None,
+                         rows: Optional[RowRanges] = None,
+                         index: Optional[RowRangeIndex] = None) -> pd.DataFrame:
+    """ Reads a sheet row by row with openpyxl's read-only reader.
+
+    Only `columns` and `optional_columns` are kept, and when `row_filter` is
+    given as (column, values) only the rows whose column value is in `values`.
+    Cells right of the last wanted column are never read. The workbook is
+    never loaded as a whole, so memory grows with the rows kept. Only the
+    public iter_rows API is used, so any openpyxl 3.1 release reads the same.
+    `rows` restricts the read to the span of those sheet rows, skipping the others;
+    `index`, when given, is filled with the row ranges of the filter column.
+    Missing columns are left out of the result for the caller to validate."""
+    workbook = openpyxl.load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        if sheet_name not in workbook.sheetnames:
+            raise ValueError(f"Worksheet named '{sheet_name}' not found")
+        header_row, header = _header(workbook[sheet_name])
+        df = _read_rows(workbook[sheet_name], header_row, header, [*columns, *optional_columns],
+                        row_filter, rows, index)
+        # The rows of the frame are numbered from the header found
+        df.attrs[HEADER_ROW_ATTR] = header_row
+        return df
+    finally:
+        workbook.close()
+
+
+def _header(worksheet) -> Tuple[int, Dict[int, Any]]:
+    """ The first row holding a value, and its values by column (1-based) """
+    for row_number, values in enumerate(worksheet.iter_rows(values_only=True), start=1):
+        if any(value is not None for value in values):
+            return row_number, {position: value for position, value in enumerate(values, start=1)}
+    return 0, {}
+
+
+def _cell(values: Tuple, position: int):
+    return values[position - 1] if position <= len(values) else None
+
+
+def _read_rows(worksheet, header_row: int, header: Dict[int, Any], columns: List[str],
+               row_filter: Optional[RowFilter],
+               rows: Optional[RowRanges],
+               index: Optional[RowRangeIndex]) -> pd.DataFrame:
+    positions = _header_positions(header, columns)
+    projected = list(positions.items())
+
+    filter_position = None
+    allowed = set()
+    if row_filter is None or index is not None:
+        rows = None
+    if row_filter is not None:
+        filter_position = positions.get(row_filter[0])
+        if filter_position is None:
+            # Without the column nothing can match: let the validation report it
+            return pd.DataFrame(columns=list(positions))
+        allowed = set(row_filter[1])
+
+    # Only the span of the wanted rows is read, up to the last projected column
+    first_row, last_row = header_row + 1, None
+    if rows is not None:
+        if not rows.starts:
+            return pd.DataFrame({name: _to_series([]) for name, _ in projected})
+        first_row, last_row = max(first_row, rows.starts[0]), rows.last
+
+    data: Dict[str, List] = {name: [] for name, _ in projected}
+    row_numbers: List[int] = []
+    pending_empty_rows = 0
+    sheet_rows = worksheet.iter_rows(min_row=first_row, max_row=last_row,
+                                     max_col=max(positions.values(), default=1), values_only=True)
+    for row_number, row in enumerate(sheet_rows, start=first_row):
+        if rows is not None and row_number not in rows:
+            continue
+        values = [_cell(row, position) for _, position in projected]
+        if filter_position is not None:
+            value = _cell(row, filter_position)
+            # Blank rows are absorbed by the ranges around them
+            if index is not None and any(cell is not None for cell in row):
+                index.add(row_number, value)
+            if value not in allowed:
+                continue
+        elif all(value is None for value in values):
+            # read_excel keeps the blank rows between data rows and drops the trailing ones
+            pending_empty_rows += 1
+            continue
+        for empty_row in range(row_number - pending_empty_rows, row_number):
+            row_numbers.append(empty_row)
+            for name, _ in projected:
+                data[name].append(None)
+        pending_empty_rows = 0
+        row_numbers.append(row_number)
+        for (name, _), value in zip(projected, values):
+            data[name].append(value)
+
+    df = pd.DataFrame({name: _to_series(values) for name, values in data.items()})
+    # Like read_excel, the row under the header is at 0, also when rows were filtered out
+    df.index = np.array(row_numbers, dtype=np.int64) - header_row - 1
+    return df
+
+
+def read_sheet(file_path: str, sheet_name: str,
+               columns: Sequence[str],
+               optional_columns: Sequence[str] = (),
+               row_filter: Optional[RowFilter] = None,
+               streaming: bool = False,
+               cache: Optional[WorkbookCache] = None) -> pd.DataFrame:
+    """ Reads a sheet through the cache, when given.
+
+    Only `columns` and `optional_columns` are kept. With `streaming` the row
+    filter is pushed down into the read, and with a cache the row ranges of the
+    filter column are remembered so that later filtered reads skip the rows of
+    the other values. Otherwise the whole sheet is parsed by pandas and the
+    caller filters it."""
+    wanted = [*columns, *optional_columns]
+    if not streaming:
+        def reader():
+            return pd.read_excel(file_path, sheet_name=sheet_name,
+                                 usecols=lambda column: column in wanted)
+        if cache is None:
+            return reader()
+        return cache.load_sheet(file_path, sheet_name, reader, f"columns:{sorted(wanted)}")
+
+    if row_filter is None or cache is None:
+        def reader():
+            return read_sheet_streaming(file_path, sheet_name, columns, optional_columns,
+                                        row_filter=row_filter)
+        if cache is None:
+            return reader()
+        return cache.load_sheet(file_path, sheet_name, reader, f"streaming:{sorted(wanted)}")
+
+    def filtered_reader():
+        index_variant = f"row-index:{row_filter[0]}"
+        cached_index = cache.lookup(file_path, sheet_name, index_variant)
+        if cached_index is not None:
+            index = RowRangeIndex.from_frame(row_filter[0], cached_index)
+            return read_sheet_streaming(file_path, sheet_name, columns, optional_columns,
+                                        row_filter=row_filter, rows=index.rows_for(row_filter[1]))
+        index = RowRangeIndex(row_filter[0])
+        df = read_sheet_streaming(file_path, sheet_name, columns, optional_columns,
+                                  row_filter=row_filter, index=index)
+        cache.store(file_path, sheet_name, index_variant, index.to_frame())
+        return df
+
+    variant = f"streaming:{sorted(wanted)}:{row_filter[0]}:{sorted(row_filter[1], key=str)}"
+    return cache.load_sheet(file_path, sheet_name, filtered_reader, variant)
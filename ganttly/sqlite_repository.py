@@ -0,0 +1,71 @@
+# sqlite_repository.py
+
+import sqlite3
+from contextlib import closing
+from pathlib import Path
+from typing import List, Optional
+
+import pandas as pd
+
+from ganttly.repository import ActivityRepository, dates_as_text, parse_dates
+
+# Position of a row in the table, from its rowid
+_POSITION = "_position"
+
+
+def _quoted(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+
+class SqliteRepository(ActivityRepository):
+    """ Reads the plan from a table of a SQLite database: the one named like
+    the sheet, or the only table of the database.
+
+    Rows are numbered by their rowid, and a sub-stream filter is run by the
+    database, on the index of the 'Sub Stream' column when the table has one,
+    so only the rows of the filtered streams are decoded """
+
+    def _read_sheet(self, sub_stream_filter: Optional[List[str]] = None) -> pd.DataFrame:
+        try:
+            df = self._query(sub_stream_filter)
+        except sqlite3.Error as e:
+            # A corrupt or non-SQLite file is reported like any other unreadable plan
+            raise ValueError(f"Cannot read {self.file_path}: {e}") from e
+        df.index.name = None
+        return parse_dates(df)
+
+    def _query(self, sub_stream_filter: Optional[List[str]]) -> pd.DataFrame:
+        # Read-only, through a URI quoting the characters of the path that mean something in one
+        uri = Path(self.file_path).resolve().as_uri() + "?mode=ro"
+        with closing(sqlite3.connect(uri, uri=True)) as connection:
+            table = self._table(connection)
+            names = [row[1] for row in connection.execute(f"PRAGMA table_info({_quoted(table)})")]
+            columns = [column for column in self._wanted_columns() if column in names]
+            query = (f"SELECT rowid - 1 AS {_POSITION}, {', '.join(_quoted(column) for column in columns)} "
+                     f"FROM {_quoted(table)}")
+            parameters = []
+            if sub_stream_filter and 'Sub Stream' in columns:
+                query += f" WHERE \"Sub Stream\" IN ({', '.join('?' * len(sub_stream_filter))})"
+                parameters = list(sub_stream_filter)
+            return pd.read_sql_query(query + " ORDER BY rowid", connection, params=parameters,
+                                     index_col=_POSITION)
+
+    def _table(self, connection: sqlite3.Connection) -> str:
+        tables = [row[0] for row in connection.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%'")]
+        if self.sheet_name in tables:
+            return self.sheet_name
+        if len(tables) == 1:
+            return tables[0]
+        raise ValueError(f"No table '{self.sheet_name}' in {self.file_path}, "
+                         f"which has: {', '.join(tables) or 'no tables'}")
+
+    @staticmethod
+    def write_frame(df: pd.DataFrame, file_path: str, sheet_name: str = "Sheet1"):
+        """ Replaces the table `sheet_name` with the rows of `df`, in order, and indexes its sub-streams """
+        with closing(sqlite3.connect(file_path)) as connection:
+            dates_as_text(df).to_sql(sheet_name, connection, if_exists='replace', index=False)
+            if 'Sub Stream' in df.columns:
+                connection.execute(f"CREATE INDEX {_quoted(sheet_name + ' Sub Stream')} "
+                                   f"ON {_quoted(sheet_name)} (\"Sub Stream\")")
+            connection.commit()
@@ -0,0 +1,107 @@
+# timeline.py
+
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+from plotly.colors import qualitative
+
+from ganttly.profiling import stage
+
+# Width of the outline of the highlighted bars, in pixels
+HIGHLIGHT_WIDTH = 4
+
+
+def _ordered_categories(values: pd.Series, order: List[str]) -> List:
+    """ The categories found in `values`: first the ones listed in `order`, then the others as they appear """
+    present = list(dict.fromkeys(values.tolist()))
+    return [c for c in order if c in present] + [c for c in present if c not in order]
+
+
+def _category_colors(categories: List, color_map: Dict[str, str]) -> Dict:
+    colors = dict(color_map)
+    sequence = qualitative.Plotly
+    for category in categories:
+        if category not in colors:
+            colors[category] = sequence[len(colors) % len(sequence)]
+    return colors
+
+
+def timeline(df: pd.DataFrame, x_start: str, x_end: str, y: str, color: str,
+             title: Optional[str] = None,
+             text: Optional[str] = None,
+             category_order: Optional[List[str]] = None,
+             color_map: Optional[Dict[str, str]] = None,
+             highlight: Optional[str] = None,
+             highlight_color: str = 'red') -> go.Figure:
+    """ Draws a gantt chart with one horizontal bar trace per `color` category.
+
+    The bars start at `x_start` and are as long as the time to `x_end`, as
+    plotly.express.timeline draws them, but the traces are built straight from
+    the column arrays. When `y` is the `color` column the y axis follows
+    `category_order` top down. The bars flagged by the boolean `highlight`
+    column are outlined with `highlight_color`."""
+    with stage("timeline"):
+        return _timeline(df, x_start, x_end, y, color, title, text, category_order, color_map,
+                         highlight, highlight_color)
+
+
+def _timeline(df: pd.DataFrame, x_start: str, x_end: str, y: str, color: str,
+              title: Optional[str], text: Optional[str],
+              category_order: Optional[List[str]], color_map: Optional[Dict[str, str]],
+              highlight: Optional[str] = None, highlight_color: str = 'red') -> go.Figure:
+    category_order = category_order or []
+    start = pd.to_datetime(df[x_start])
+    duration = (pd.to_datetime(df[x_end]) - start) / np.timedelta64(1, "ms")
+    categories = _ordered_categories(df[color], category_order)
+    colors = _category_colors(categories, color_map or {})
+    codes = df[color].to_numpy()
+
+    traces = []
+    for category in categories:
+        mask = codes == category
+        if y == color:
+            hover = f"{color}=%{{y}}<br>{x_start}=%{{base}}<br>{x_end}=%{{x}}"
+        else:
+            hover = f"{color}={category}<br>{x_start}=%{{base}}<br>{x_end}=%{{x}}<br>" \
+                    f"{y}=%{{{'text' if text == y else 'y'}}}"
+        bar = dict(
+            alignmentgroup='True',
+            base=start[mask],
+            hovertemplate=hover + "<extra></extra>",
+            legendgroup=category,
+            marker=dict(color=colors[category], pattern=dict(shape='')),
+            name=category,
+            offsetgroup=category,
+            orientation='h',
+            showlegend=True,
+            textposition='auto',
+            x=duration[mask],
+            xaxis='x',
+            y=df[y][mask],
+            yaxis='y',
+        )
+        if text is not None:
+            bar['text'] = df[text][mask]
+        if highlight is not None:
+            flagged = df[highlight].to_numpy(dtype=bool)[mask]
+            bar['marker']['line'] = dict(color=highlight_color, width=np.where(flagged, HIGHLIGHT_WIDTH, 0))
+        traces.append(go.Bar(**bar))
+
+    yaxis = dict(anchor='x', domain=[0.0, 1.0], title=dict(text=y))
+    if y == color:
+        yaxis.update(categoryorder='array',
+                     categoryarray=list(reversed(category_order + [c for c in categories
+                                                                   if c not in category_order])))
+    layout = dict(
+        xaxis=dict(anchor='y', domain=[0.0, 1.0], type='date'),
+        yaxis=yaxis,
+        legend=dict(title=dict(text=color), tracegroupgap=0),
+        barmode='overlay',
+    )
+    if title is None:
+        layout['margin'] = dict(t=60)
+    else:
+        layout['title'] = dict(text=title)
+    return go.Figure(data=traces, layout=layout)
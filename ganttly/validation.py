@@ -0,0 +1,173 @@
+# validation.py
+
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+import numpy as np
+import pandas as pd
+
+from ganttly.activity_table import ActivityTable, _datetime_array, _label_values, first_data_row
+from ganttly.dto import ActivityCategoryEnum, ActivityTypeEnum
+from ganttly.scheduling import DependencyCycleError, DependencyGraph
+
+ERROR = "error"
+WARNING = "warning"
+
+
+@dataclass(frozen=True)
+class ValidationIssue:
+    row: int
+    column: str
+    message: str
+    severity: str = ERROR
+
+    def __str__(self) -> str:
+        return f"Row {self.row} [{self.column}]: {self.message}"
+
+
+@dataclass
+class ValidationReport:
+    issues: List[ValidationIssue] = field(default_factory=list)
+    rows: int = 0
+    # Sheet rows counted in `rows`, the blank ones left out
+    checked_rows: Optional[np.ndarray] = field(default=None, repr=False, compare=False)
+
+    @property
+    def errors(self) -> List[ValidationIssue]:
+        return [issue for issue in self.issues if issue.severity == ERROR]
+
+    @property
+    def warnings(self) -> List[ValidationIssue]:
+        return [issue for issue in self.issues if issue.severity == WARNING]
+
+    @property
+    def is_valid(self) -> bool:
+        return not self.errors
+
+    def for_rows(self, rows: np.ndarray) -> 'ValidationReport':
+        """ The issues of the given sheet rows only """
+        rows = np.asarray(rows)
+        issue_rows = np.array([issue.row for issue in self.issues], dtype=np.int64)
+        kept = np.isin(issue_rows, rows) if len(issue_rows) else np.zeros(0, dtype=bool)
+        checked = rows if self.checked_rows is None else self.checked_rows[np.isin(self.checked_rows, rows)]
+        return ValidationReport([issue for issue, keep in zip(self.issues, kept.tolist()) if keep],
+                                len(checked), checked)
+
+    def describe(self, limit: Optional[int] = None) -> str:
+        """ One line per issue, errors first, followed by a summary line.
+        With `limit` only the first issues are listed """
+        issues = self.errors + self.warnings
+        shown = issues if limit is None else issues[:limit]
+        lines = [f"{issue.severity.capitalize()}: {issue}" for issue in shown]
+        if len(shown) < len(issues):
+            lines.append(f"... and {len(issues) - len(shown)} more")
+        lines.append(f"{self.rows} rows checked: {len(self.errors)} errors, {len(self.warnings)} warnings")
+        return "\n".join(lines)
+
+
+class PlanValidationError(ValueError):
+    """ Raised when a plan has errors, carrying the whole report and, when
+    given, the activities read anyway, for the callers that only draw some of them """
+
+    def __init__(self, report: ValidationReport, limit: int = 20, activities: Optional[ActivityTable] = None):
+        super().__init__(f"The plan has {len(report.errors)} errors:\n"
+                         + ValidationReport(report.errors, report.rows).describe(limit))
+        self.report = report
+        self.activities = activities
+
+
+def _issues(rows: np.ndarray, mask: np.ndarray, column: str, message: str,
+            severity: str = ERROR, values: Optional[np.ndarray] = None) -> List[ValidationIssue]:
+    """ One issue per masked row; `message` is formatted with the row value, when given """
+    positions = np.flatnonzero(mask)
+    if values is None:
+        return [ValidationIssue(int(rows[position]), column, message, severity) for position in positions]
+    return [ValidationIssue(int(rows[position]), column, message.format(values[position]), severity)
+            for position in positions]
+
+
+def _check(table: ActivityTable,
+           invalid_start: np.ndarray, invalid_end: np.ndarray,
+           category_text: np.ndarray, type_text: np.ndarray,
+           start_text: np.ndarray, end_text: np.ndarray) -> ValidationReport:
+    """ Runs every check on whole columns and collects the issues in row order """
+    rows = table.row_number
+    activity_types = table.activity_type.values()
+    categories = table.activity_category.values()
+    missing_start = np.isnat(table.start_date)
+    missing_end = np.isnat(table.end_date)
+    # Blank rows between the activities are read but never drawn
+    blank = (pd.isna(table.activity) & pd.isna(table.sub_stream.values())
+             & pd.isna(category_text) & pd.isna(type_text) & missing_start & missing_end)
+    is_task = activity_types == ActivityTypeEnum.TASK
+    is_milestone = activity_types == ActivityTypeEnum.MILESTONE
+
+    issues = [
+        *_issues(rows, invalid_start, 'Start Date', "'{}' is not a date", values=start_text),
+        *_issues(rows, invalid_end, 'End Date', "'{}' is not a date", values=end_text),
+        *_issues(rows, is_task & missing_start & ~invalid_start, 'Start Date',
+                 "Task {} is missing the start date", values=table.activity),
+        *_issues(rows, is_task & missing_end & ~invalid_end, 'End Date',
+                 "Task {} is missing the end date", values=table.activity),
+        *_issues(rows, is_milestone & missing_start & ~invalid_start, 'Start Date',
+                 "Milestone {} is missing its date", values=table.activity),
+        *_issues(rows, is_task & (table.end_date < table.start_date), 'End Date',
+                 "Task {} ends before it starts", values=table.activity),
+        *_issues(rows, ~blank & (categories == ActivityCategoryEnum.UNKNOWN), 'Activity Category',
+                 "Unknown activity category '{}'", WARNING, values=category_text),
+        *_issues(rows, ~blank & (activity_types == ActivityTypeEnum.UNKNOWN), 'Activity Type',
+                 "Unknown activity type '{}'", WARNING, values=type_text),
+    ]
+    issues.sort(key=lambda issue: (issue.row, issue.severity != ERROR))
+    return ValidationReport(issues, int(np.count_nonzero(~blank)), rows[~blank])
+
+
+def validate_activities(activities: ActivityTable) -> ValidationReport:
+    """ Checks the activities of a table, reporting every issue with its row """
+    none = np.zeros(len(activities), dtype=bool)
+    return _check(activities, none, none,
+                  _label_values(activities.activity_category), _label_values(activities.activity_type),
+                  activities.start_date, activities.end_date)
+
+
+def validate_sheet(df: pd.DataFrame, activities: Optional[ActivityTable] = None) -> ValidationReport:
+    """ Checks the rows of a plan sheet, read into `df`, before any chart work.
+
+    On top of the checks of `validate_activities`, cells holding something
+    that is not a date are told apart from empty ones, and the predecessors
+    are checked across the whole sheet. `activities`, when given, must be the
+    table built from `df`."""
+    activities = activities if activities is not None else ActivityTable.from_frame(df, first_data_row(df))
+    is_task = activities.activity_type.values() == ActivityTypeEnum.TASK
+    report = _check(activities,
+                    _invalid_dates(df['Start Date']),
+                    _invalid_dates(df['End Date']) & is_task,
+                    df['Activity Category'].to_numpy(dtype=object),
+                    df['Activity Type'].to_numpy(dtype=object),
+                    df['Start Date'].to_numpy(dtype=object),
+                    df['End Date'].to_numpy(dtype=object))
+    if 'Predecessors' in df.columns:
+        report.issues = sorted(report.issues + _dependency_issues(activities),
+                               key=lambda issue: (issue.row, issue.severity != ERROR))
+    return report
+
+
+def _dependency_issues(activities: ActivityTable) -> List[ValidationIssue]:
+    """ Warns of the predecessors matching no activity and rejects the cycles """
+    graph = DependencyGraph.from_table(activities)
+    issues = [ValidationIssue(int(activities.row_number[position]), 'Predecessors',
+                              f"Unknown predecessor '{reference}'", WARNING)
+              for position, reference in graph.unknown]
+    try:
+        graph.topological_order()
+    except DependencyCycleError as e:
+        issues += _issues(activities.row_number, np.isin(activities.row_number, e.rows), 'Predecessors',
+                          "{} is part of a dependency cycle", values=activities.activity)
+    return issues
+
+
+def _invalid_dates(values: pd.Series) -> np.ndarray:
+    """ The cells holding a value that can't be read as a date """
+    if pd.api.types.is_datetime64_any_dtype(values):
+        return np.zeros(len(values), dtype=bool)
+    return values.notna().to_numpy() & np.isnat(_datetime_array(values))
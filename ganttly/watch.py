@@ -0,0 +1,93 @@
+# watch.py
+
+import dataclasses
+import os
+import time
+from typing import Callable, Optional, Tuple
+
+from ganttly.gantly_command import GanttlyCommand, GanttlyCommandFactory, GanttlyConfiguration
+
+DEFAULT_INTERVAL = 0.5
+DEFAULT_DEBOUNCE = 1.0
+
+
+class FileWatcher:
+    """ Polls a file for modifications.
+
+    A change is reported once the file has stopped changing for `debounce`
+    seconds, so that a save written in several steps, or a burst of saves,
+    triggers a single rebuild. A file briefly missing, as while an editor
+    replaces it, counts as a change."""
+
+    def __init__(self, file_path: str,
+                 interval: float = DEFAULT_INTERVAL,
+                 debounce: float = DEFAULT_DEBOUNCE,
+                 clock: Callable[[], float] = time.monotonic,
+                 sleep: Callable[[float], None] = time.sleep):
+        self.file_path = file_path
+        self.interval = interval
+        self.debounce = debounce
+        self._clock = clock
+        self._sleep = sleep
+        self._seen = self._signature()
+
+    def _signature(self) -> Optional[Tuple[int, int]]:
+        try:
+            stat = os.stat(self.file_path)
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def wait_for_change(self):
+        """ Blocks until the file changed and then stayed the same for `debounce` seconds """
+        changed_at = None
+        while True:
+            signature = self._signature()
+            if signature != self._seen:
+                self._seen = signature
+                changed_at = self._clock()
+            elif changed_at is not None and signature is not None \
+                    and self._clock() - changed_at >= self.debounce:
+                return
+            self._sleep(self.interval)
+
+
+def describe_build(command: GanttlyCommand, elapsed: float) -> str:
+    stages = ", ".join(f"{stage} {seconds:.2f}s" for stage, seconds in command.stage_timings.items())
+    summary = f"Rebuilt {command.config.output} in {elapsed:.2f}s ({stages})"
+    if command.fragments is not None:
+        summary += f", {command.fragments.rendered} charts drawn, {command.fragments.reused} reused"
+    return summary
+
+
+def watch(file_path: str, config: GanttlyConfiguration,
+          echo: Callable[[str], None] = print,
+          watcher: Optional[FileWatcher] = None,
+          on_build: Optional[Callable[[GanttlyCommand], None]] = None,
+          max_builds: Optional[int] = None):
+    """ Renders the report, then renders it again after every change of `file_path`.
+
+    The same command, with its loaded modules, caches and rendered fragments,
+    serves every build, and the charts are rendered incrementally, so a build
+    only parses the workbook and draws the charts whose activities changed.
+    A build that fails is reported and the watch goes on. `max_builds` stops
+    the watch after that many builds."""
+    command = GanttlyCommandFactory(file_path, dataclasses.replace(config, incremental=True)).create()
+    watcher = watcher or FileWatcher(file_path)
+    builds = 0
+    while True:
+        started = time.perf_counter()
+        try:
+            command.service.invalidate()
+            command.execute()
+        except Exception as e:
+            # A workbook caught mid-save or an invalid plan must not end the watch
+            echo(f"Error: {e}")
+        else:
+            echo(describe_build(command, time.perf_counter() - started))
+            if on_build is not None:
+                on_build(command)
+        builds += 1
+        if max_builds is not None and builds >= max_builds:
+            return
+        watcher.wait_for_change()
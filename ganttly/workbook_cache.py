@@ -0,0 +1,281 @@
+# workbook_cache.py
+
+import hashlib
+import json
+import os
+import re
+import zipfile
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Callable, Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+# Bump when the layout of the cached entries changes
+CACHE_FORMAT_VERSION = 4
+CACHE_SUFFIX = ".npz"
+# Entries of the earlier formats, removed when their sheet is stored again
+_STALE_SUFFIXES = (CACHE_SUFFIX, ".pkl")
+# Names of the entries, of the earlier formats and of interrupted writes:
+# the only files of the directory the cache ever removes
+_ENTRY_NAME = re.compile(r"[0-9a-f]{24}(-[0-9a-f]{24})?\.(npz|pkl)(\.\d+\.tmp)?")
+_HASH_CHUNK_SIZE = 1 << 20
+
+# The kind of each value of an object column, stored next to the values
+_NONE, _NAN, _TEXT, _INT, _FLOAT, _BOOL, _TIMESTAMP, _NAT = range(8)
+
+
+def default_cache_dir() -> str:
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(
+        os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "ganttly")
+
+
+def _digest(*parts) -> str:
+    return hashlib.sha256("|".join(str(p) for p in parts).encode("utf-8")).hexdigest()[:24]
+
+
+@dataclass(frozen=True)
+class WorkbookFingerprint:
+    path: str
+    mtime_ns: int
+    size: int
+    content_hash: str
+
+    @staticmethod
+    def of(file_path: str) -> 'WorkbookFingerprint':
+        stat = os.stat(file_path)
+        content_hash = hashlib.sha256()
+        with open(file_path, "rb") as f:
+            for chunk in iter(lambda: f.read(_HASH_CHUNK_SIZE), b""):
+                content_hash.update(chunk)
+        return WorkbookFingerprint(
+            path=os.path.abspath(file_path),
+            mtime_ns=stat.st_mtime_ns,
+            size=stat.st_size,
+            content_hash=content_hash.hexdigest(),
+        )
+
+
+class UnsupportedFrame(ValueError):
+    """ A frame holding values the cache cannot store without pickling them """
+
+
+class WorkbookCache:
+    """ On-disk cache of parsed sheets and of the indexes built on them.
+
+    Each sheet has one entry, named after its path, sheet and variant, which
+    records the size, mtime and content hash of the workbook it was read from.
+    The workbook is only hashed when its size or mtime differ from the entry,
+    so an unchanged workbook is never read; a touched but unchanged one still
+    hits. A changed workbook replaces the entry the next time it is stored.
+    Entries are .npz archives of plain arrays with a JSON header, loaded with
+    allow_pickle=False: nothing in the cache directory is ever executed. Frames
+    holding values other than text, numbers, booleans and naive timestamps
+    are read every time rather than cached."""
+
+    def __init__(self, cache_dir: Optional[str] = None):
+        self.cache_dir = cache_dir or default_cache_dir()
+        self._content_hashes: Dict[Tuple[str, int, int], str] = {}
+
+    def load_sheet(self, file_path: str, sheet_name: str,
+                   reader: Callable[[], pd.DataFrame], variant: str = "") -> pd.DataFrame:
+        """ Returns the cached sheet, calling `reader` to parse it on a miss.
+
+        `variant` tells apart the frames read from the same sheet in different
+        ways, e.g. with a column projection or a row filter."""
+        df = self.lookup(file_path, sheet_name, variant)
+        if df is None:
+            df = reader()
+            self.store(file_path, sheet_name, variant, df)
+        return df
+
+    def lookup(self, file_path: str, sheet_name: str, variant: str = "") -> Optional[pd.DataFrame]:
+        """ Returns the frame stored for the current content of the sheet, if any """
+        try:
+            with np.load(self._entry(file_path, sheet_name, variant), allow_pickle=False) as arrays:
+                header = json.loads(arrays["header"].tobytes().decode("utf-8"))
+                if not self._is_current(header, file_path):
+                    return None
+                return _decode_frame(header, arrays)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, KeyError, TypeError, zipfile.BadZipFile):
+            # A truncated, foreign or incompatible entry is treated as a miss
+            return None
+
+    def store(self, file_path: str, sheet_name: str, variant: str, df: pd.DataFrame):
+        entry = self._entry(file_path, sheet_name, variant)
+        try:
+            header, arrays = _encode_frame(df)
+        except UnsupportedFrame:
+            return
+        fingerprint = self._fingerprint(file_path)
+        header.update(format=CACHE_FORMAT_VERSION, pandas=pd.__version__, mtime_ns=fingerprint.mtime_ns,
+                      size=fingerprint.size, content_hash=fingerprint.content_hash)
+        self._write_entry(entry, header, arrays)
+
+    def clear(self):
+        """ Removes the entries of the cache, leaving any other file of the directory """
+        if not os.path.isdir(self.cache_dir):
+            return
+        for name in os.listdir(self.cache_dir):
+            if _ENTRY_NAME.fullmatch(name):
+                os.remove(os.path.join(self.cache_dir, name))
+
+    def _is_current(self, header: dict, file_path: str) -> bool:
+        if header.get("format") != CACHE_FORMAT_VERSION or header.get("pandas") != pd.__version__:
+            return False
+        stat = os.stat(file_path)
+        if stat.st_size != header["size"]:
+            return False
+        if stat.st_mtime_ns == header["mtime_ns"]:
+            return True
+        # Touched, e.g. by a checkout: only the content tells whether it changed
+        return self._fingerprint(file_path).content_hash == header["content_hash"]
+
+    def _fingerprint(self, file_path: str) -> WorkbookFingerprint:
+        # The content is hashed once per version of the file seen by this cache
+        stat = os.stat(file_path)
+        key = (os.path.abspath(file_path), stat.st_mtime_ns, stat.st_size)
+        if key not in self._content_hashes:
+            self._content_hashes[key] = WorkbookFingerprint.of(file_path).content_hash
+        return WorkbookFingerprint(*key, self._content_hashes[key])
+
+    def _entry(self, file_path: str, sheet_name: str, variant: str) -> str:
+        return os.path.join(
+            self.cache_dir,
+            f"{_digest(os.path.abspath(file_path), sheet_name, variant)}{CACHE_SUFFIX}")
+
+    def _write_entry(self, entry: str, header: dict, arrays: Dict[str, np.ndarray]):
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            prefix = os.path.basename(entry)[:-len(CACHE_SUFFIX)]
+            for name in os.listdir(self.cache_dir):
+                if name.startswith(f"{prefix}-") and name.endswith(_STALE_SUFFIXES):
+                    os.remove(os.path.join(self.cache_dir, name))
+            tmp_entry = f"{entry}.{os.getpid()}.tmp"
+            with open(tmp_entry, "wb") as f:
+                np.savez(f, header=np.frombuffer(json.dumps(header).encode("utf-8"), dtype=np.uint8),
+                         **arrays)
+            os.replace(tmp_entry, entry)
+        except OSError:
+            # The cache is an optimisation: a read-only or full disk must not fail the run
+            pass
+
+
+def _encode_frame(df: pd.DataFrame) -> Tuple[dict, Dict[str, np.ndarray]]:
+    """ The header and the arrays storing `df`, none of them of object dtype """
+    arrays: Dict[str, np.ndarray] = {}
+    columns = []
+    for position, (name, series) in enumerate(df.items()):
+        if not isinstance(name, (str, int, float)) or isinstance(name, np.generic):
+            raise UnsupportedFrame(f"column name {name!r}")
+        key = f"c{position}"
+        if series.dtype == object:
+            arrays.update(_encode_objects(key, series.to_numpy()))
+            columns.append({"name": name, "objects": True})
+        elif isinstance(series.dtype, np.dtype) and series.dtype.kind in "biufmM":
+            arrays[key] = series.to_numpy()
+            columns.append({"name": name, "objects": False})
+        else:
+            raise UnsupportedFrame(f"column {name!r} of dtype {series.dtype}")
+    try:
+        header = {"columns": columns, "attrs": json.loads(json.dumps(df.attrs))}
+    except (TypeError, ValueError) as e:
+        raise UnsupportedFrame(f"attrs {df.attrs!r}") from e
+    if isinstance(df.index, pd.RangeIndex):
+        header["range_index"] = [df.index.start, df.index.stop, df.index.step]
+    elif df.index.dtype.kind in "iu":
+        arrays["index"] = df.index.to_numpy()
+    else:
+        raise UnsupportedFrame(f"index of dtype {df.index.dtype}")
+    return header, arrays
+
+
+def _decode_frame(header: dict, arrays) -> pd.DataFrame:
+    if "range_index" in header:
+        index = pd.RangeIndex(*header["range_index"])
+    else:
+        index = pd.Index(arrays["index"])
+    data = {}
+    for position, column in enumerate(header["columns"]):
+        key = f"c{position}"
+        data[position] = _decode_objects(key, arrays) if column["objects"] else arrays[key]
+    df = pd.DataFrame(data, index=index)
+    df.columns = [column["name"] for column in header["columns"]]
+    df.attrs.update(header["attrs"])
+    return df
+
+
+def _encode_objects(key: str, values: np.ndarray) -> Dict[str, np.ndarray]:
+    """ An object column as the kind of each value, its numbers, and its texts
+    as codes into their distinct labels, written as one UTF-8 buffer """
+    kinds = np.empty(len(values), dtype=np.uint8)
+    numbers = np.zeros(len(values), dtype=np.float64)
+    integers = np.zeros(len(values), dtype=np.int64)
+    texts, text_rows = [], []
+    try:
+        for row, value in enumerate(values):
+            if value is None:
+                kinds[row] = _NONE
+            elif isinstance(value, str):
+                kinds[row] = _TEXT
+                texts.append(value)
+                text_rows.append(row)
+            elif isinstance(value, (bool, np.bool_)):
+                kinds[row] = _BOOL
+                numbers[row] = value
+            elif isinstance(value, (int, np.integer)):
+                kinds[row] = _INT
+                integers[row] = value
+            elif isinstance(value, (float, np.floating)):
+                kinds[row] = _NAN if value != value else _FLOAT
+                numbers[row] = value
+            elif value is pd.NaT:
+                kinds[row] = _NAT
+            elif isinstance(value, datetime) and value.tzinfo is None:
+                kinds[row] = _TIMESTAMP
+                integers[row] = pd.Timestamp(value).value
+            else:
+                raise UnsupportedFrame(f"value {value!r}")
+    except OverflowError as e:
+        raise UnsupportedFrame(str(e)) from e
+    codes = np.full(len(values), -1, dtype=np.int64)
+    text_codes, labels = pd.factorize(np.array(texts, dtype=object))
+    codes[text_rows] = text_codes
+    encoded = [label.encode("utf-8") for label in labels]
+    return {
+        f"{key}.kinds": kinds,
+        f"{key}.numbers": numbers,
+        f"{key}.integers": integers,
+        f"{key}.codes": codes,
+        f"{key}.labels": np.frombuffer(b"".join(encoded), dtype=np.uint8),
+        f"{key}.offsets": np.cumsum([0, *map(len, encoded)], dtype=np.int64),
+    }
+
+
+def _decode_objects(key: str, arrays) -> np.ndarray:
+    kinds = arrays[f"{key}.kinds"]
+    if (kinds > _NAT).any():
+        raise ValueError(f"Unknown value kind in {key}")
+    numbers = arrays[f"{key}.numbers"]
+    integers = arrays[f"{key}.integers"]
+    buffer = arrays[f"{key}.labels"].tobytes()
+    offsets = arrays[f"{key}.offsets"].tolist()
+    labels = np.array([buffer[start:end].decode("utf-8") for start, end in zip(offsets, offsets[1:])],
+                      dtype=object)
+    values = np.empty(len(kinds), dtype=object)
+    for kind, decode in (
+            (_NAN, lambda rows: np.nan),
+            (_NAT, lambda rows: pd.NaT),
+            (_TEXT, lambda rows: labels[arrays[f"{key}.codes"][rows]]),
+            (_INT, lambda rows: integers[rows].astype(object)),
+            (_FLOAT, lambda rows: numbers[rows].astype(object)),
+            (_BOOL, lambda rows: numbers[rows].astype(bool).astype(object)),
+            (_TIMESTAMP, lambda rows: pd.DatetimeIndex(integers[rows]).to_numpy(dtype=object))):
+        rows = kinds == kind
+        if rows.any():
+            values[rows] = decode(rows)
+    return values
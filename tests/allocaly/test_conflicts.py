@@ -0,0 +1,85 @@
+# test_conflicts.py
+
+import os
+import tempfile
+import unittest
+
+import pandas as pd
+from click.testing import CliRunner
+
+from allocaly.allocation_table import AllocationTable
+from allocaly.cli import cli
+from allocaly.conflicts import Capacity, over_allocations
+
+
+def _sheet(rows) -> pd.DataFrame:
+    df = pd.DataFrame(rows, columns=['Persone', 'Attività', 'Stream', 'Activity Type', 'Mese-Anno', 'Giornate'])
+    df['Mese-Anno'] = pd.to_datetime(df['Mese-Anno'])
+    return df
+
+
+BILLING = _sheet([
+    ["Mario", "Dev", "Billing", "Sviluppi", "2024-01-01", 12.0],
+    ["Mario", "Test", "Billing", "ATE", "2024-02-01", 5.0],
+    ["Emanuelo", "Dev", "Billing", "Sviluppi", "2024-01-01", 15.0],
+])
+PAYMENTS = _sheet([
+    ["Mario", "Dev", "Payments", "Sviluppi", "2024-01-01", 10.0],
+    ["Emanuelo", "Dev", "Payments", "Sviluppi", "2024-02-01", 18.0],
+    ["Emanuelo", "Test", "Payments", "ATE", "2024-02-01", 4.0],
+])
+
+
+def _table(df: pd.DataFrame, source: str) -> AllocationTable:
+    return AllocationTable.from_frame(df, employee='Persone', activity='Attività', stream='Stream',
+                                      activity_category='Activity Type', month='Mese-Anno', mds='Giornate',
+                                      source=source)
+
+
+class TestOverAllocations(unittest.TestCase):
+    def setUp(self):
+        self.table = AllocationTable.concat([_table(BILLING, "billing.xlsx"), _table(PAYMENTS, "payments.xlsx")])
+
+    def test_default_capacity(self):
+        conflicts = over_allocations(self.table)
+
+        self.assertEqual([("Emanuelo", "2024-02", 22.0, 2.0, 2), ("Mario", "2024-01", 22.0, 2.0, 2)],
+                         [(row.employee, str(row.month), row.allocated, row.excess, row.allocations)
+                          for row in conflicts.itertuples()])
+        self.assertEqual(["Payments", "Billing; Payments"], conflicts["streams"].tolist())
+        self.assertEqual(["payments.xlsx", "billing.xlsx; payments.xlsx"], conflicts["workbooks"].tolist())
+
+    def test_capacity_per_person_and_month(self):
+        capacity = Capacity(default=25.0, employees={"Mario": 4.0}, months={("Mario", "2024-01"): 22.0})
+
+        conflicts = over_allocations(self.table, capacity)
+
+        self.assertEqual([("Mario", "2024-02", 5.0, 4.0)],
+                         [(row.employee, str(row.month), row.allocated, row.capacity)
+                          for row in conflicts.itertuples()])
+
+    def test_capacity_file(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "capacity.csv")
+            with open(path, "w", encoding="utf-8") as f:
+                f.write("employee,month,capacity\nMario,,10\nMario,2024-01,22\n")
+            capacity = Capacity.from_csv(path, default=18.0)
+
+        self.assertEqual(Capacity(18.0, {"Mario": 10.0}, {("Mario", "2024-01"): 22.0}), capacity)
+
+
+class TestConflictsCommand(unittest.TestCase):
+    def test_several_workbooks(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            paths = []
+            for name, df in [("billing", BILLING), ("payments", PAYMENTS)]:
+                paths.append(os.path.join(tmp_dir, f"{name}.xlsx"))
+                df.to_excel(paths[-1], index=False)
+
+            result = CliRunner().invoke(cli, ['conflicts', *paths, '--no-cache'])
+            within_capacity = CliRunner().invoke(cli, ['conflicts', *paths, '--no-cache', '--capacity', '22'])
+
+        self.assertEqual(1, result.exit_code, result.output)
+        self.assertIn("2 over-allocated months, 2 people", result.output)
+        self.assertEqual(0, within_capacity.exit_code, within_capacity.output)
+        self.assertIn("No one is over-allocated", within_capacity.output)
@@ -1,6 +1,9 @@
+import os
+import tempfile
 from unittest import TestCase
 
 from allocaly.excel_repository import ExcelRepository
+from ganttly.workbook_cache import WorkbookCache
 
 
 class TestExcelRepository(TestCase):
@@ -29,3 +32,13 @@ class TestExcelRepository(TestCase):
         self.assertEqual('Stream 2', allocation_1.stream)
         self.assertEqual('Sviluppi', allocation_1.activity_category)
         self.assertEqual(10.0, allocation_1.mds)
+
+    def test_load_activities_from_cache(self):
+        with tempfile.TemporaryDirectory() as cache_dir:
+            repository = ExcelRepository(
+                './tests/resources/test_plan.xlsx', 'Allocations', cache=WorkbookCache(cache_dir))
+            repository.load_allocation()
+            allocations = repository.load_allocation(stream_filter=["Stream 2"])
+            self.assertEqual(1, len(os.listdir(cache_dir)))
+        self.assertEqual(1, len(allocations))
+        self.assertEqual('Emanuelo', allocations[0].employee)
@@ -0,0 +1,68 @@
+# test_pivot.py
+
+import os
+import tempfile
+import unittest
+
+import pandas as pd
+from click.testing import CliRunner
+
+from allocaly.allocation_table import AllocationTable
+from allocaly.cli import cli
+from allocaly.excel_repository import ExcelRepository
+from allocaly.pivot import man_days_by_month
+
+
+def _table() -> AllocationTable:
+    df = pd.DataFrame({
+        'Persone': ["Mario", "Emanuelo", "Mario", "Mario", "Emanuelo"],
+        'Attività': ["Dev", "Test", "Dev", "Release", "Dev"],
+        'Stream': ["Billing", "Billing", "Payments", "Billing", "Payments"],
+        'Activity Type': ["Sviluppi", "ATE", "Sviluppi", None, "Sviluppi"],
+        'Mese-Anno': pd.to_datetime(["2024-01-15", "2024-01-01", "2024-03-31", None, "2024-01-20"]),
+        'Giornate': [5.0, 2.5, 4.0, 1.0, 3.0],
+    })
+    return AllocationTable.from_frame(df, employee='Persone', activity='Attività', stream='Stream',
+                                      activity_category='Activity Type', month='Mese-Anno', mds='Giornate')
+
+
+class TestManDaysByMonth(unittest.TestCase):
+    def test_employee_by_month(self):
+        table = man_days_by_month(_table(), "employee")
+
+        self.assertEqual(["Mario", "Emanuelo"], table.index.tolist())
+        self.assertEqual(["2024-01", "2024-02", "2024-03"], [str(month) for month in table.columns])
+        self.assertEqual([[5.0, 0.0, 4.0], [5.5, 0.0, 0.0]], table.to_numpy().tolist())
+
+    def test_stream_and_category_by_month(self):
+        streams = man_days_by_month(_table(), "stream")
+        categories = man_days_by_month(_table(), "activity_category")
+
+        self.assertEqual({"Billing": 7.5, "Payments": 7.0}, streams.sum(axis=1).to_dict())
+        # The allocation without a month is left out, and its category with it
+        self.assertEqual({"Sviluppi": 12.0, "ATE": 2.5}, categories.sum(axis=1).to_dict())
+
+    def test_unknown_key(self):
+        with self.assertRaises(ValueError):
+            man_days_by_month(_table(), "activity")
+
+    def test_allocations_keep_their_month(self):
+        allocations = ExcelRepository('./tests/resources/test_plan.xlsx', 'Allocations').load_allocation()
+
+        self.assertEqual([pd.Timestamp("2024-09-01"), pd.Timestamp("2024-09-01"), pd.Timestamp("2024-08-01")],
+                         [allocation.month for allocation in allocations])
+        self.assertEqual([2, 3, 4], allocations.row_number.tolist())
+
+
+class TestPivotCommand(unittest.TestCase):
+    def test_pivot_by_stream(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            csv_path = os.path.join(tmp_dir, "pivot.csv")
+            result = CliRunner().invoke(cli, ['pivot', './tests/resources/test_plan.xlsx', '--sheet', 'Allocations',
+                                              '--by', 'stream', '--no-cache', '--csv', csv_path])
+
+            self.assertEqual(0, result.exit_code, result.output)
+            self.assertIn("Total", result.output)
+            written = pd.read_csv(csv_path, index_col=0)
+        self.assertEqual(["2024-08", "2024-09"], written.columns.tolist())
+        self.assertEqual([4.4, 5.0], written.loc["Requisiti di Accesso - M"].tolist())
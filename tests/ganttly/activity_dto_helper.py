@@ -1,6 +1,11 @@
 from datetime import datetime
+
+import pandas as pd
+
 from ganttly.dto import ActivityDTO, ActivityTypeEnum
 
+PLAN_COLUMNS = ['Sub Stream', 'Activity', 'Activity Category', 'Activity Type', 'Start Date', 'End Date']
+
 
 def build_activity_dto(
         sub_stream,
@@ -24,3 +29,14 @@ def build_activity_dto(
         state=state,
         notes=notes
     )
+
+
+def build_plan_frame(rows, columns=PLAN_COLUMNS, parse_dates=True) -> pd.DataFrame:
+    """ A plan sheet holding `rows`, as read from a workbook. The date columns
+    are parsed unless `parse_dates` is False, e.g. to keep cells that are not dates """
+    df = pd.DataFrame(rows, columns=columns)
+    if parse_dates:
+        for column in ('Start Date', 'End Date'):
+            if column in df.columns:
+                df[column] = pd.to_datetime(df[column])
+    return df
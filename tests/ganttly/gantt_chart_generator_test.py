@@ -1,7 +1,9 @@
 from unittest import TestCase
 
-from ganttly.dto import ActivityTypeEnum
-from ganttly.gantt_chart_generator import GanttChartActivityGenerator
+from datetime import datetime
+
+from ganttly.dto import ActivityCategoryEnum, ActivityTypeEnum
+from ganttly.gantt_chart_generator import GanttChartActivityGenerator, GanttChartSubStreamGenerator
 from tests.ganttly.activity_dto_helper import build_activity_dto
 
 
@@ -39,3 +41,25 @@ class TestGanttChartGenerator(TestCase):
         gcg = GanttChartActivityGenerator(activities)
         with self.assertRaises(ValueError):
             gcg.draw_chart()
+
+    def test_markers_are_batched_per_kind_and_category(self):
+        activities = [build_activity_dto("Stream 1", "Development",
+                                         activity_category=ActivityCategoryEnum.DEVELOPMENT)]
+        for day in range(1, 7):
+            activities.append(build_activity_dto(
+                "Stream 1", f"Milestone {day}",
+                activity_category=ActivityCategoryEnum.AFU if day % 2 else ActivityCategoryEnum.UAT,
+                activity_type=ActivityTypeEnum.MILESTONE,
+                start_date=datetime(2023, 1, day), end_date=None))
+        activities.append(build_activity_dto(
+            "Stream 1", "Dependency", activity_category=ActivityCategoryEnum.AFU,
+            activity_type=ActivityTypeEnum.DEPENDENCY, end_date=None))
+
+        for generator in [GanttChartActivityGenerator, GanttChartSubStreamGenerator]:
+            fig = generator(activities).draw_chart()
+            markers = [trace for trace in fig.data if trace.type == 'scatter']
+            self.assertEqual(
+                [('diamond', 'AFU', 3), ('diamond', 'UAT', 3), ('diamond-wide', 'AFU', 1)],
+                [(trace.marker.symbol, trace.name, len(trace.x)) for trace in markers])
+            self.assertEqual(('Stream 1-Milestone 1', 'Stream 1-Milestone 3', 'Stream 1-Milestone 5'),
+                             tuple(markers[0].text))
@@ -0,0 +1,115 @@
+# test_activity_store.py
+
+import unittest
+from unittest.mock import Mock, call
+
+from ganttly.activity_store import ActivityStore
+from ganttly.activity_table import ActivityTable
+from ganttly.validation import PlanValidationError, ValidationIssue, ValidationReport
+from tests.ganttly.activity_dto_helper import build_activity_dto
+
+
+def _repository(file_path, activities):
+    repository = Mock(file_path=file_path, sheet_name="Sheet1")
+
+    def load_activities(sub_stream_filter=None):
+        if not sub_stream_filter:
+            return list(activities)
+        return [a for a in activities if a.sub_stream in sub_stream_filter]
+    repository.load_activities.side_effect = load_activities
+    return repository
+
+
+class TestActivityStore(unittest.TestCase):
+    def setUp(self):
+        self.activities = [
+            build_activity_dto("Stream1", "a1"),
+            build_activity_dto("Stream2", "a2"),
+            build_activity_dto("Stream1", "a3"),
+            build_activity_dto("Stream3", "a4"),
+        ]
+        self.repository = _repository("plan.xlsx", self.activities)
+
+    def test_repository_is_read_once_for_all_views(self):
+        store = ActivityStore()
+
+        everything = store.get(self.repository)
+        filtered = store.get(self.repository, ["Stream3", "Stream1"])
+        by_stream = store.get_by_stream(self.repository, ["Stream2", "Stream1"])
+
+        self.repository.load_activities.assert_called_once_with(sub_stream_filter=None)
+        self.assertEqual(4, len(everything))
+        # filtered views keep the sheet order
+        self.assertEqual(["a1", "a3", "a4"], [a.activity for a in filtered])
+        self.assertEqual(["Stream1", "Stream2"], list(by_stream))
+        self.assertEqual(["a1", "a3"], [a.activity for a in by_stream["Stream1"]])
+
+    def test_narrower_filter_is_served_from_loaded_streams(self):
+        store = ActivityStore()
+
+        store.get(self.repository, ["Stream1", "Stream2"])
+        activities = store.get(self.repository, ["Stream2"])
+
+        self.repository.load_activities.assert_called_once_with(
+            sub_stream_filter=["Stream1", "Stream2"])
+        self.assertEqual(["a2"], [a.activity for a in activities])
+
+    def test_uncovered_filter_reloads_union(self):
+        store = ActivityStore()
+
+        store.get(self.repository, ["Stream1"])
+        activities = store.get(self.repository, ["Stream3"])
+        store.get(self.repository, ["Stream1"])
+
+        self.assertEqual([
+            call(sub_stream_filter=["Stream1"]),
+            call(sub_stream_filter=["Stream1", "Stream3"]),
+        ], self.repository.load_activities.call_args_list)
+        self.assertEqual(["a4"], [a.activity for a in activities])
+
+    def test_invalidate_reloads(self):
+        store = ActivityStore()
+
+        store.get(self.repository)
+        store.invalidate(self.repository)
+        store.get(self.repository)
+
+        self.assertEqual(2, self.repository.load_activities.call_count)
+
+    def test_least_recently_used_repository_is_evicted(self):
+        store = ActivityStore(max_rows=8)
+        other = _repository("other.xlsx", self.activities)
+        third = _repository("third.xlsx", self.activities)
+
+        store.get(self.repository)
+        store.get(other)
+        store.get(self.repository)
+        store.get(third)
+
+        self.assertEqual(8, store.row_count)
+        store.get(self.repository)
+        store.get(other)
+        self.assertEqual(1, self.repository.load_activities.call_count)
+        self.assertEqual(2, other.load_activities.call_count)
+
+    def test_errors_only_stop_the_views_holding_them(self):
+        def load_activities(sub_stream_filter=None):
+            table = ActivityTable.from_activities(
+                [a for a in self.activities if not sub_stream_filter or a.sub_stream in sub_stream_filter])
+            rows = table.row_number[table.sub_stream.values() == "Stream2"]
+            if len(rows):
+                report = ValidationReport([ValidationIssue(int(rows[0]), 'Start Date', "'soon' is not a date")],
+                                          len(table))
+                raise PlanValidationError(report, activities=table)
+            return table
+        self.repository.load_activities.side_effect = load_activities
+        store = ActivityStore()
+
+        self.assertEqual(4, len(store.get_plan(self.repository, ["Stream1"])))
+        self.assertEqual(2, len(store.get(self.repository, ["Stream1"])))
+        self.assertEqual(["Stream1", "Stream3"], list(store.get_by_stream(self.repository, ["Stream1", "Stream3"])))
+        for view in [lambda: store.get(self.repository), lambda: store.get(self.repository, ["Stream2"]),
+                     lambda: store.get_by_stream(self.repository), lambda: store.get_plan(self.repository)]:
+            with self.assertRaises(PlanValidationError):
+                view()
+        self.assertEqual(1, self.repository.load_activities.call_count)
@@ -0,0 +1,96 @@
+# test_activity_table.py
+
+import unittest
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from ganttly.activity_table import ActivityTable
+from ganttly.dto import ActivityCategoryEnum, ActivityTypeEnum
+from ganttly.gantt_chart_generator import to_gantt_row
+from tests.ganttly.activity_dto_helper import build_activity_dto
+
+
+def _sheet() -> pd.DataFrame:
+    return pd.DataFrame({
+        'Sub Stream': ['S1', 'S2', 'S1', 'S3'],
+        'Activity': ['A1', 'A2', 'A3', 'A4'],
+        'Activity Category': ['Sviluppi', 'UAT', 'Sviluppi', 'Unheard of'],
+        'Activity Type': ['Task', 'Milestone', 'Task', 'Task'],
+        'Start Date': pd.to_datetime(['2023-01-01', '2023-02-01', '2023-03-01', None]),
+        'End Date': pd.to_datetime(['2023-01-10', '2023-02-10', '2023-03-10', '2023-04-10']),
+        'Owner': ['O1', 'O2', 'O3', 'O4'],
+    })
+
+
+class TestActivityTable(unittest.TestCase):
+    def test_columns_are_encoded(self):
+        table = ActivityTable.from_frame(_sheet())
+
+        self.assertEqual(4, len(table))
+        self.assertEqual(['S1', 'S2', 'S3'], table.sub_stream.labels)
+        self.assertEqual([0, 1, 0, 2], table.sub_stream.codes.tolist())
+        self.assertEqual(np.dtype('datetime64[ns]'), table.start_date.dtype)
+        self.assertEqual([ActivityCategoryEnum.DEVELOPMENT, ActivityCategoryEnum.UAT, ActivityCategoryEnum.UNKNOWN],
+                         table.categories())
+
+    def test_rows_read_like_dtos(self):
+        table = ActivityTable.from_frame(_sheet())
+
+        first, milestone, _, undated = table
+        self.assertEqual(('S1', 'A1', ActivityCategoryEnum.DEVELOPMENT, ActivityTypeEnum.TASK),
+                         (first.sub_stream, first.activity, first.activity_category, first.activity_type))
+        self.assertEqual(pd.Timestamp('2023-01-10'), first.end_date)
+        self.assertEqual('O1', first.owner)
+        self.assertIsNone(first.notes)
+        # only tasks keep their end date
+        self.assertIsNone(milestone.end_date)
+        self.assertIsNone(undated.start_date)
+        self.assertEqual('A4', table[-1].activity)
+        with self.assertRaises(IndexError):
+            table[4]
+        with self.assertRaises(AttributeError):
+            first.extra = 1
+
+    def test_group_by_sub_stream_keeps_sheet_order(self):
+        groups = ActivityTable.from_frame(_sheet()).group_by_sub_stream()
+
+        self.assertEqual(['S1', 'S2', 'S3'], list(groups))
+        self.assertEqual(['A1', 'A3'], [row.activity for row in groups['S1']])
+        self.assertEqual(['S1', 'S1'], groups['S1'].sub_stream.values().tolist())
+
+    def test_gantt_frame_matches_gantt_rows(self):
+        activities = [
+            build_activity_dto('S1', 'A1', activity_category=ActivityCategoryEnum.AFU),
+            build_activity_dto('S2', 'A2', activity_category=ActivityCategoryEnum.UAT,
+                               activity_type=ActivityTypeEnum.MILESTONE, end_date=None),
+        ]
+        expected = pd.DataFrame([{
+            'Sub Stream': row.sub_stream,
+            'Activity': row.activity,
+            'Activity Category': row.activity_category,
+            'Activity Type': row.activity_type,
+            'Start Date': row.start_date,
+            'End Date': row.end_date,
+        } for row in map(to_gantt_row, activities)])
+
+        frame = ActivityTable.from_activities(activities).to_gantt_frame()
+
+        pd.testing.assert_frame_equal(expected, frame, check_dtype=False)
+
+    def test_from_activities_round_trips(self):
+        activity = build_activity_dto('S1', 'A1', start_date=datetime(2023, 1, 1))
+
+        row = ActivityTable.from_activities([activity])[0]
+
+        self.assertEqual(activity, row.to_dto())
+
+    def test_content_hash_follows_the_values(self):
+        table = ActivityTable.from_frame(_sheet())
+        changed = _sheet()
+        changed.loc[2, 'End Date'] = pd.Timestamp('2023-03-11')
+
+        self.assertEqual(table.content_hash(), ActivityTable.from_activities(table).content_hash())
+        self.assertEqual(table.content_hash(), ActivityTable.from_frame(_sheet()).content_hash())
+        self.assertNotEqual(table.content_hash(), ActivityTable.from_frame(changed).content_hash())
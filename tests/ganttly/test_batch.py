@@ -0,0 +1,102 @@
+# test_batch.py
+
+import json
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import pandas as pd
+
+from ganttly.batch import jobs_for_files, load_manifest, run_batch, run_job
+from ganttly.configuration import GanttlyConfiguration
+from tests.ganttly.activity_dto_helper import build_plan_frame
+
+
+def _plan(streams) -> pd.DataFrame:
+    rows = []
+    for stream in streams:
+        rows.append([stream, "Dev", "Sviluppi", "Task", "2023-01-01", "2023-01-31"])
+        rows.append([stream, "Uat", "UAT", "Task", "2023-02-01", "2023-02-20"])
+    return build_plan_frame(rows)
+
+
+class TestBatch(unittest.TestCase):
+    def setUp(self):
+        tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp_dir.cleanup)
+        self.dir = tmp_dir.name
+        self.workbooks = []
+        for name, streams in [("alpha", ["A1", "A2"]), ("beta", ["B1", "B2", "B3"])]:
+            path = os.path.join(self.dir, f"{name}.xlsx")
+            with pd.ExcelWriter(path) as writer:
+                _plan(streams).to_excel(writer, sheet_name="Plan", index=False)
+                _plan(streams[:1]).to_excel(writer, sheet_name="Draft", index=False)
+            self.workbooks.append(path)
+        self.defaults = GanttlyConfiguration(per_stream=True, use_cache=False)
+
+    def test_jobs_for_files(self):
+        jobs = jobs_for_files(self.workbooks, ["Plan", "Draft"], self.defaults, output_dir="out")
+
+        self.assertEqual([("alpha.xlsx", "Plan", "out/alpha-Plan.html"), ("alpha.xlsx", "Draft", "out/alpha-Draft.html"),
+                          ("beta.xlsx", "Plan", "out/beta-Plan.html"), ("beta.xlsx", "Draft", "out/beta-Draft.html")],
+                         [(os.path.basename(job.file_path), job.config.sheet, job.config.output) for job in jobs])
+        self.assertTrue(all(job.config.per_stream for job in jobs))
+        with self.assertRaises(ValueError):
+            jobs_for_files([self.workbooks[0]] * 2, ["Plan"], self.defaults)
+
+    def test_manifest(self):
+        manifest = os.path.join(self.dir, "manifest.json")
+        with open(manifest, "w") as f:
+            json.dump([{"file": "alpha.xlsx", "sheet": "Plan", "per_stream": False},
+                       {"file": "beta.xlsx", "sheet": "Draft", "output": "draft.html", "filter": ["B1"]}], f)
+
+        first, second = load_manifest(manifest, self.defaults, output_dir="out")
+
+        self.assertEqual((self.workbooks[0], "Plan", "out/alpha-Plan.html", False),
+                         (first.file_path, first.config.sheet, first.config.output, first.config.per_stream))
+        self.assertEqual((self.workbooks[1], "out/draft.html", ["B1"], True),
+                         (second.file_path, second.config.output, second.config.filter, second.config.per_stream))
+
+        with open(manifest, "w") as f:
+            json.dump([{"file": "alpha.xlsx", "jobs": 4}], f)
+        with self.assertRaises(ValueError):
+            load_manifest(manifest, self.defaults)
+
+    def test_one_report_per_input(self):
+        jobs = jobs_for_files(self.workbooks, ["Plan", "Draft", "Missing"], self.defaults, output_dir=self.dir)
+
+        summary = run_batch(jobs, workers=2)
+
+        self.assertEqual([2, 1, 0, 3, 1, 0], [result.charts for result in summary.results])
+        self.assertEqual(4 + 2 + 6 + 2, summary.rows)
+        self.assertEqual(["alpha.xlsx [Missing]", "beta.xlsx [Missing]"],
+                         [result.job.label for result in summary.failed])
+        with open(os.path.join(self.dir, "beta-Plan.html"), encoding="utf-8") as f:
+            self.assertEqual(3, f.read().count('class="plotly-graph-div"'))
+        self.assertFalse(os.path.exists(os.path.join(self.dir, "beta-Missing.html")))
+        self.assertIn("6 inputs (2 failed), 14 rows, 7 charts", summary.describe())
+        self.assertIn("files/s", summary.describe())
+
+    def test_unexpected_errors_fail_the_job_only(self):
+        jobs = jobs_for_files(self.workbooks, ["Plan"], self.defaults, output_dir=self.dir)
+
+        with patch("ganttly.batch.GanttlyCommandFactory.create", side_effect=KeyError("Owner")):
+            result = run_job(jobs[0])
+
+        self.assertEqual("KeyError: 'Owner'", result.error)
+        self.assertEqual(3, run_job(jobs[1]).charts)
+
+    def test_combined_report(self):
+        combined = os.path.join(self.dir, "all.html")
+        jobs = jobs_for_files(self.workbooks, ["Plan"], self.defaults, output_dir=self.dir)
+
+        summary = run_batch(jobs, workers=2, combined_output=combined, include_plotlyjs="cdn")
+
+        with open(combined, encoding="utf-8") as f:
+            report = f.read()
+        self.assertEqual(5, summary.charts)
+        self.assertEqual(5, report.count('class="plotly-graph-div"'))
+        self.assertLess(report.index("<h2>alpha.xlsx [Plan]</h2>"), report.index("<h2>beta.xlsx [Plan]</h2>"))
+        self.assertIn('id="gantt-chart-1-2"', report)
+        self.assertFalse(os.path.exists(os.path.join(self.dir, "alpha.html")))
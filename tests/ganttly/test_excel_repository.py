@@ -61,3 +61,29 @@ class TestExcelRepository(unittest.TestCase):
         self.assertEqual(len(activities), 2)
         self.assertEqual(activities[0].sub_stream, "Stream1")
         self.assertEqual(activities[1].sub_stream, "Stream3")
+
+    @patch('ganttly.excel_repository.pd.read_excel')
+    def test_load_activities_without_optional_columns(self, mock_read_excel):
+        mock_read_excel.return_value = pd.DataFrame({
+            'Sub Stream': ["Stream1", "Stream1", "Stream2"],
+            'Activity': ["Activity1", "Activity2", "Activity3"],
+            'Activity Category': ["UAT", None, "Unexpected"],
+            'Activity Type': ["Task", "Milestone", None],
+            'Start Date': pd.to_datetime(["2023-01-01", "2023-02-01", "2023-03-01"]),
+            'End Date': pd.to_datetime(["2023-01-10", "2023-02-10", "2023-03-10"]),
+        })
+
+        repository = ExcelRepository('dummy_path.xlsx', 'Sheet1')
+        activities = repository.load_activities()
+
+        self.assertEqual(
+            [ActivityCategoryEnum.UAT, ActivityCategoryEnum.UNKNOWN, ActivityCategoryEnum.UNKNOWN],
+            [activity.activity_category for activity in activities])
+        self.assertEqual(
+            [ActivityTypeEnum.TASK, ActivityTypeEnum.MILESTONE, ActivityTypeEnum.UNKNOWN],
+            [activity.activity_type for activity in activities])
+        self.assertEqual(pd.Timestamp("2023-01-10"), activities[0].end_date)
+        self.assertIsNone(activities[1].end_date)
+        self.assertIsNone(activities[0].owner)
+        self.assertIsNone(activities[0].state)
+        self.assertIsNone(activities[0].notes)
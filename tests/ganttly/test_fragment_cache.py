@@ -0,0 +1,86 @@
+# test_fragment_cache.py
+
+import os
+import tempfile
+import unittest
+from datetime import datetime
+from unittest.mock import patch
+
+from ganttly.dto import ActivityCategoryEnum
+from ganttly.fragment_cache import FragmentCache
+from ganttly.gantt_chart_aggregator import GanttChartAggregator
+from ganttly.gantt_chart_generator import GanttChartSubStreamGenerator
+from tests.ganttly.activity_dto_helper import build_activity_dto
+
+STREAMS = ["Stream1", "Stream2", "Stream3"]
+
+
+def _generators(uat_end=datetime(2023, 2, 20)):
+    generators = []
+    for stream in STREAMS:
+        activities = [
+            build_activity_dto(stream, "Dev", activity_category=ActivityCategoryEnum.DEVELOPMENT),
+            build_activity_dto(stream, "Uat", activity_category=ActivityCategoryEnum.UAT,
+                               start_date=datetime(2023, 2, 1),
+                               end_date=uat_end if stream == "Stream2" else datetime(2023, 2, 20)),
+        ]
+        generators.append(GanttChartSubStreamGenerator(activities, title=stream))
+    return generators
+
+
+class TestFragmentCache(unittest.TestCase):
+    def setUp(self):
+        tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp_dir.cleanup)
+        self.cache_dir = os.path.join(tmp_dir.name, "cache")
+        self.output = os.path.join(tmp_dir.name, "report.html")
+
+    def _run(self, generators) -> FragmentCache:
+        fragments = FragmentCache(self.output, self.cache_dir)
+        with GanttChartAggregator().open(self.output) as aggregator:
+            for chart_html in fragments.render(generators):
+                aggregator.add_rendered_chart(chart_html)
+        fragments.save()
+        return fragments
+
+    def _report(self) -> str:
+        with open(self.output, encoding="utf-8") as f:
+            return f.read()
+
+    def test_unchanged_charts_are_reused(self):
+        first = self._run(_generators())
+        report = self._report()
+
+        with patch.object(GanttChartSubStreamGenerator, 'draw_chart') as draw_chart:
+            second = self._run(_generators())
+
+        draw_chart.assert_not_called()
+        self.assertEqual((0, 3), (first.reused, first.rendered))
+        self.assertEqual((3, 0), (second.reused, second.rendered))
+        self.assertEqual(report, self._report())
+
+    def test_only_changed_streams_are_drawn(self):
+        self._run(_generators())
+
+        changed = self._run(_generators(uat_end=datetime(2023, 3, 1)))
+        report = self._report()
+
+        self.assertEqual((2, 1), (changed.reused, changed.rendered))
+        # the spliced report is the one a fresh run draws
+        os.remove(FragmentCache(self.output, self.cache_dir).entry)
+        self._run(_generators(uat_end=datetime(2023, 3, 1)))
+        self.assertEqual(report, self._report())
+
+    def test_options_are_part_of_the_fingerprint(self):
+        generator, = _generators()[:1]
+        hidden = GanttChartSubStreamGenerator(generator.activities, title="Stream1", hide_legend=True)
+
+        self.assertNotEqual(generator.fingerprint(), hidden.fingerprint())
+        self.assertEqual(generator.fingerprint(), _generators()[0].fingerprint())
+
+    def test_corrupt_entry_renders_everything(self):
+        os.makedirs(os.path.dirname(FragmentCache(self.output, self.cache_dir).entry))
+        with open(FragmentCache(self.output, self.cache_dir).entry, "wb") as f:
+            f.write(b"not json")
+
+        self.assertEqual(3, self._run(_generators()).rendered)
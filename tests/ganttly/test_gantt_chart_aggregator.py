@@ -0,0 +1,91 @@
+# test_gantt_chart_aggregator.py
+
+import gc
+import os
+import tempfile
+import unittest
+import weakref
+
+import plotly.graph_objects as go
+from plotly.offline import get_plotlyjs
+
+from ganttly.gantt_chart_aggregator import PLOTLYJS_FILE_NAME, GanttChartAggregator
+
+PLOTLYJS_BANNER = "* plotly.js v"
+# Upper bound for the markup and data of one small chart, without the library
+CHART_SIZE_BUDGET = 20_000
+
+
+def _chart() -> go.Figure:
+    return go.Figure(go.Bar(x=[1, 2, 3], y=["a", "b", "c"], orientation="h"))
+
+
+class TestGanttChartAggregator(unittest.TestCase):
+    def setUp(self):
+        tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp_dir.cleanup)
+        self.output = os.path.join(tmp_dir.name, "report.html")
+
+    def _save(self, charts, include_plotlyjs="inline") -> str:
+        aggregator = GanttChartAggregator(include_plotlyjs=include_plotlyjs)
+        aggregator.save_to_file(self.output, (_chart() for _ in range(charts)))
+        with open(self.output, encoding="utf-8") as f:
+            return f.read()
+
+    def test_plotlyjs_is_embedded_once(self):
+        charts = 20
+        report = self._save(charts)
+
+        self.assertEqual(1, report.count(PLOTLYJS_BANNER))
+        self.assertLess(len(report), len(get_plotlyjs()) + charts * CHART_SIZE_BUDGET)
+        self.assertEqual(charts, report.count('class="plotly-graph-div"'))
+
+    def test_directory_mode_writes_library_next_to_report(self):
+        report = self._save(3, include_plotlyjs="directory")
+
+        self.assertNotIn(PLOTLYJS_BANNER, report)
+        self.assertIn(f'src="{PLOTLYJS_FILE_NAME}"', report)
+        with open(os.path.join(os.path.dirname(self.output), PLOTLYJS_FILE_NAME), encoding="utf-8") as f:
+            self.assertEqual(get_plotlyjs(), f.read())
+
+    def test_cdn_mode_links_library(self):
+        report = self._save(3, include_plotlyjs="cdn")
+
+        self.assertNotIn(PLOTLYJS_BANNER, report)
+        self.assertEqual(1, report.count("https://cdn.plot.ly/plotly-"))
+        self.assertLess(len(report), 3 * CHART_SIZE_BUDGET)
+
+    def test_unknown_mode(self):
+        with self.assertRaises(ValueError):
+            self._save(1, include_plotlyjs="nope")
+
+    def test_charts_are_written_as_they_are_added(self):
+        aggregator = GanttChartAggregator()
+        with aggregator.open(self.output):
+            chart = _chart()
+            chart_ref = weakref.ref(chart)
+            aggregator.add_chart(chart)
+            del chart
+            gc.collect()
+
+            # the figure is not kept around once it is written
+            self.assertIsNone(chart_ref())
+            with open(f"{self.output}.partial", encoding="utf-8") as f:
+                self.assertIn('id="gantt-chart-0"', f.read())
+
+        with open(self.output, encoding="utf-8") as f:
+            self.assertTrue(f.read().endswith('</body></html>\n'))
+        self.assertFalse(os.path.exists(f"{self.output}.partial"))
+
+    def test_failed_report_keeps_previous_one(self):
+        with open(self.output, 'w', encoding="utf-8") as f:
+            f.write("previous report")
+
+        with self.assertRaises(ValueError):
+            with GanttChartAggregator().open(self.output) as aggregator:
+                aggregator.add_chart(_chart())
+                raise ValueError("invalid activity")
+
+        with open(self.output, encoding="utf-8") as f:
+            self.assertEqual("previous report", f.read())
+        self.assertEqual(["report.html"], os.listdir(os.path.dirname(self.output)))
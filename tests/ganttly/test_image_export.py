@@ -0,0 +1,75 @@
+# test_image_export.py
+
+import importlib.util
+import json
+import os
+import tempfile
+import unittest
+
+import plotly.graph_objects as go
+
+from ganttly.image_export import ImageExporter, KaleidoRenderer, describe_exports
+
+
+class TitleRenderer:
+    """ Writes the title of the figure and the process that exported it """
+
+    def __init__(self):
+        self.process = os.getpid()
+
+    def export(self, figure_json: str, image_format: str, width: int, height: int) -> bytes:
+        title = json.loads(figure_json)["layout"]["title"]["text"]
+        return f"{title}|{image_format}|{width}x{height}|{self.process}".encode("utf-8")
+
+
+def _charts(count: int):
+    return [go.Figure(layout=dict(title=dict(text=f"Stream {position}"))) for position in range(count)]
+
+
+class TestImageExporter(unittest.TestCase):
+    def setUp(self):
+        tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp_dir.cleanup)
+        self.output = os.path.join(tmp_dir.name, "plan.html")
+
+    def _read(self, path: str):
+        with open(path, encoding="utf-8") as f:
+            return f.read().split("|")
+
+    def test_exports_in_this_process(self):
+        with ImageExporter("svg", renderer_factory=TitleRenderer, width=800, height=600).open(self.output) \
+                as exporter:
+            for chart in _charts(2):
+                exporter.add_chart(chart, chart.layout.title.text)
+
+        self.assertEqual([f"{self.output[:-5]}-01-Stream_0.svg", f"{self.output[:-5]}-02-Stream_1.svg"],
+                         [image.path for image in exporter.exported])
+        self.assertEqual(["Stream 1", "svg", "800x600", str(os.getpid())], self._read(exporter.exported[1].path))
+        self.assertIn("2 images exported", describe_exports(exporter.exported))
+
+    def test_exports_in_a_pool_of_renderers(self):
+        with ImageExporter("png", workers=2, batch_size=2, renderer_factory=TitleRenderer).open(self.output) \
+                as exporter:
+            for chart in _charts(9):
+                exporter.add_chart(chart)
+
+        self.assertEqual([f"{self.output[:-5]}-{position:02d}.png" for position in range(1, 10)],
+                         [image.path for image in exporter.exported])
+        exported = [self._read(image.path) for image in exporter.exported]
+        self.assertEqual([f"Stream {position}" for position in range(9)], [image[0] for image in exported])
+        processes = {image[3] for image in exported}
+        self.assertNotIn(str(os.getpid()), processes)
+        # Each worker started its renderer once and kept it across batches
+        self.assertLessEqual(len(processes), 2)
+
+    def test_unknown_format(self):
+        with self.assertRaises(ValueError):
+            ImageExporter("gif", renderer_factory=TitleRenderer)
+
+    @unittest.skipUnless(importlib.util.find_spec("kaleido"), "kaleido is not installed")
+    def test_kaleido_export(self):
+        with ImageExporter("svg", renderer_factory=KaleidoRenderer).open(self.output) as exporter:
+            exporter.add_chart(_charts(1)[0])
+
+        with open(exporter.exported[0].path, encoding="utf-8") as f:
+            self.assertIn("<svg", f.read())
@@ -0,0 +1,75 @@
+# test_interval_index.py
+
+import unittest
+from datetime import datetime
+from unittest.mock import patch
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.synthetic_plan import synthetic_plan
+from ganttly.activity_store import ActivityStore
+from ganttly.activity_table import ActivityTable
+from ganttly.dto import ActivityTypeEnum
+from ganttly.interval_index import ActivityIntervalIndex, clip_to_window
+from tests.ganttly.activity_dto_helper import build_activity_dto
+from tests.ganttly.test_activity_store import _repository
+
+
+class TestActivityIntervalIndex(unittest.TestCase):
+    def test_matches_a_full_scan(self):
+        table = ActivityTable.from_frame(synthetic_plan(5_000, streams=20))
+        table.start_date[::97] = np.datetime64('NaT')
+        index = ActivityIntervalIndex(table)
+        is_task = table.activity_type.values() == ActivityTypeEnum.TASK
+        ends = np.where(is_task, table.end_date, table.start_date)
+
+        for start, end in [("2024-03-01", "2024-04-15"), ("2025-12-30", "2025-12-31"), (None, "2024-01-10"),
+                           ("2025-12-01", None), ("2030-01-01", None), (None, None)]:
+            expected = np.ones(len(table), dtype=bool) & ~np.isnat(table.start_date)
+            if end is not None:
+                expected &= table.start_date <= np.datetime64(end)
+            if start is not None:
+                expected &= ends >= np.datetime64(start)
+            self.assertEqual(np.flatnonzero(expected).tolist(), index.overlapping(start, end).tolist())
+
+    def test_window_bounds(self):
+        with self.assertRaises(ValueError):
+            ActivityIntervalIndex(ActivityTable.from_activities([])).overlapping("2024-02-01", "2024-01-01")
+
+    def test_clips_the_tasks(self):
+        table = ActivityTable.from_activities([
+            build_activity_dto("S1", "long", start_date=datetime(2024, 1, 1), end_date=datetime(2024, 6, 30)),
+            build_activity_dto("S1", "go live", activity_type=ActivityTypeEnum.MILESTONE,
+                               start_date=datetime(2024, 3, 10), end_date=None),
+        ])
+
+        window = clip_to_window(table, np.array([0, 1]), "2024-03-01", "2024-03-31")
+
+        self.assertEqual([pd.Timestamp("2024-03-01"), pd.Timestamp("2024-03-10")], pd.Series(window.start_date).tolist())
+        self.assertEqual(pd.Timestamp("2024-03-31"), pd.Timestamp(window.end_date[0]))
+        self.assertTrue(np.isnat(window.end_date[1]))
+        self.assertEqual(datetime(2024, 6, 30), table[0].end_date)
+
+
+class TestStoreWindows(unittest.TestCase):
+    def setUp(self):
+        self.repository = _repository("plan.xlsx", [
+            build_activity_dto("Stream1", "jan", start_date=datetime(2024, 1, 1), end_date=datetime(2024, 1, 31)),
+            build_activity_dto("Stream2", "feb", start_date=datetime(2024, 2, 1), end_date=datetime(2024, 2, 29)),
+            build_activity_dto("Stream1", "q1", start_date=datetime(2024, 1, 15), end_date=datetime(2024, 3, 31)),
+        ])
+
+    def test_window_queries_share_one_index(self):
+        store = ActivityStore()
+        with patch("ganttly.activity_store.ActivityIntervalIndex", wraps=ActivityIntervalIndex) as index:
+            february = store.get(self.repository, window=(datetime(2024, 2, 1), datetime(2024, 2, 15)))
+            by_stream = store.get_by_stream(self.repository, window=(None, datetime(2024, 1, 10)))
+            filtered = store.get(self.repository, ["Stream1"], window=(datetime(2024, 2, 1), None))
+
+        self.assertEqual(1, index.call_count)
+        self.assertEqual(["feb", "q1"], list(february.activity))
+        self.assertEqual([pd.Timestamp("2024-02-15")] * 2, pd.Series(february.end_date).tolist())
+        self.assertEqual({"Stream1": ["jan"]}, {stream: list(t.activity) for stream, t in by_stream.items()})
+        self.assertEqual(["q1"], list(filtered.activity))
+        self.assertEqual(pd.Timestamp("2024-02-01"), pd.Timestamp(filtered.start_date[0]))
@@ -0,0 +1,90 @@
+# test_overview.py
+
+import os
+import tempfile
+import unittest
+
+import pandas as pd
+
+from ganttly.activity_table import ActivityTable
+from ganttly.configuration import GanttlyConfiguration
+from ganttly.gantly_command import CreateOverviewGanttCommand, GanttlyCommandFactory
+from ganttly.gantt_chart_generator import GanttChartOverviewGenerator
+from ganttly.overview import detail_file_names, merge_spans, overview_rows
+from tests.ganttly.activity_dto_helper import build_plan_frame
+
+
+def _plan(streams=("S1", "S2")) -> pd.DataFrame:
+    rows = []
+    for stream in streams:
+        rows += [
+            [stream, "Dev 1", "Sviluppi", "Task", "2023-01-01", "2023-01-20"],
+            [stream, "Dev 2", "Sviluppi", "Task", "2023-01-10", "2023-02-10"],
+            # Far from the others at the level of detail of the plan
+            [stream, "Dev 3", "Sviluppi", "Task", "2023-06-01", "2023-06-30"],
+            [stream, "Uat", "UAT", "Task", "2023-02-11", "2023-03-01"],
+            [stream, "Go live", "Rilascio in produzione", "Milestone", "2023-03-02", None],
+        ]
+    return build_plan_frame(rows)
+
+
+class TestOverview(unittest.TestCase):
+    def test_merges_spans_per_stream_and_category(self):
+        table = ActivityTable.from_frame(_plan())
+
+        spans = merge_spans(table, overview_rows(["S1", "S2"], max_rows=10))
+
+        s1 = spans[spans['Sub Stream'] == "S1"]
+        self.assertEqual([("Sviluppi", "2023-01-01", "2023-02-10", 2), ("Sviluppi", "2023-06-01", "2023-06-30", 1),
+                          ("UAT", "2023-02-11", "2023-03-01", 1)],
+                         [(row['Activity Category'], str(row['Start Date'].date()), str(row['End Date'].date()),
+                           row['Activities']) for _, row in s1.iterrows()])
+        self.assertEqual(["S1"] * 3 + ["S2"] * 3, spans['Sub Stream'].tolist())
+
+        # A coarser level of detail merges the gap between the development spans
+        self.assertEqual(4, len(merge_spans(table, overview_rows(["S1", "S2"], 10), resolution=1)))
+
+    def test_caps_the_rows(self):
+        streams = [f"S{i}" for i in range(10)]
+        rows = overview_rows(streams, max_rows=4)
+
+        self.assertEqual(["S0", "S1", "S2"] + ["Other (7 streams)"] * 7, [rows[stream] for stream in streams])
+        spans = merge_spans(ActivityTable.from_frame(_plan(streams)), rows)
+        self.assertEqual(4, spans['Sub Stream'].nunique())
+        self.assertEqual(7 * 2, spans[spans['Sub Stream'] == "Other (7 streams)"]['Activities'].max())
+
+    def test_chart_has_one_row_per_stream(self):
+        streams = [f"Stream {i}" for i in range(50)]
+        generator = GanttChartOverviewGenerator(ActivityTable.from_frame(_plan(streams)), max_rows=20,
+                                                detail_links={"Stream 0": "details/Stream_0.html"})
+
+        fig = generator.draw_chart()
+
+        rows = set(value for trace in fig.data for value in trace.y)
+        self.assertEqual(20, len(rows))
+        self.assertIn("Other (31 streams)", rows)
+        self.assertEqual('<a href="details/Stream_0.html">Stream 0</a>', fig.layout.yaxis.ticktext[0])
+        self.assertNotEqual(generator.fingerprint(), GanttChartOverviewGenerator(generator.activities).fingerprint())
+
+    def test_detail_file_names(self):
+        self.assertEqual({"A/B": "A_B.html", "A B": "A_B_2.html", "..": "stream.html"},
+                         detail_file_names(["A/B", "A B", ".."]))
+
+    def test_drill_down_writes_a_report_per_stream(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            file_path = os.path.join(tmp_dir, "plan.xlsx")
+            _plan(("Core", "Billing/Ops")).to_excel(file_path, index=False)
+            output = os.path.join(tmp_dir, "report.html")
+            config = GanttlyConfiguration(overview=True, drill_down=True, use_cache=False,
+                                          include_plotlyjs="directory", output=output)
+            command = GanttlyCommandFactory(file_path, config).create()
+            self.assertIsInstance(command, CreateOverviewGanttCommand)
+
+            command.execute()
+
+            with open(output, encoding="utf-8") as f:
+                report = f.read()
+            self.assertEqual(1, report.count('class="plotly-graph-div"'))
+            self.assertIn('report-streams\\u002fBilling_Ops.html', report)
+            self.assertEqual(["Billing_Ops.html", "Core.html", "plotly.min.js"],
+                             sorted(os.listdir(os.path.join(tmp_dir, "report-streams"))))
@@ -0,0 +1,58 @@
+# test_parallel_render.py
+
+import os
+import tempfile
+import unittest
+from datetime import datetime
+
+from ganttly.dto import ActivityCategoryEnum, ActivityTypeEnum
+from ganttly.gantt_chart_aggregator import GanttChartAggregator
+from ganttly.gantt_chart_generator import GanttChartActivityGenerator, GanttChartSubStreamGenerator
+from ganttly.parallel_render import render_charts_in_parallel
+from tests.ganttly.activity_dto_helper import build_activity_dto
+
+
+def _generators():
+    generators = []
+    for stream in ["Stream1", "Stream2", "Stream3"]:
+        activities = [
+            build_activity_dto(stream, "Dev", activity_category=ActivityCategoryEnum.DEVELOPMENT),
+            build_activity_dto(stream, "Uat", activity_category=ActivityCategoryEnum.UAT,
+                               start_date=datetime(2023, 2, 1), end_date=datetime(2023, 2, 20)),
+            build_activity_dto(stream, "Go live", activity_category=ActivityCategoryEnum.RELEASE,
+                               activity_type=ActivityTypeEnum.MILESTONE,
+                               start_date=datetime(2023, 3, 1), end_date=None),
+        ]
+        generators.append(GanttChartSubStreamGenerator(activities, title=stream))
+        generators.append(GanttChartActivityGenerator(activities, title=stream))
+    return generators
+
+
+class TestParallelRender(unittest.TestCase):
+    def _report(self, fill):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            output = os.path.join(tmp_dir, "report.html")
+            with GanttChartAggregator().open(output) as aggregator:
+                fill(aggregator)
+            with open(output, encoding="utf-8") as f:
+                return f.read()
+
+    def test_parallel_report_matches_serial_report(self):
+        def serial(aggregator):
+            for generator in _generators():
+                aggregator.add_chart(generator.draw_chart())
+
+        def parallel(aggregator):
+            for chart_html in render_charts_in_parallel(_generators(), jobs=3):
+                aggregator.add_rendered_chart(chart_html)
+
+        self.assertEqual(self._report(serial), self._report(parallel))
+
+    def test_fragments_keep_generator_order(self):
+        fragments = list(render_charts_in_parallel(iter(_generators()), jobs=2, first_position=4))
+        self.assertEqual(6, len(fragments))
+        for position, fragment in enumerate(fragments, start=4):
+            self.assertIn(f'id="gantt-chart-{position}"', fragment)
+
+    def test_no_generators(self):
+        self.assertEqual([], list(render_charts_in_parallel([], jobs=4)))
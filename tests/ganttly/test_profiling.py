@@ -0,0 +1,83 @@
+# test_profiling.py
+
+import json
+import os
+import tempfile
+import unittest
+
+import pandas as pd
+
+from ganttly.configuration import GanttlyConfiguration
+from ganttly.gantly_command import GanttlyCommandFactory
+from ganttly.profiling import Profile, StageRecorder, describe_python_profile, python_profile, stage
+from tests.ganttly.activity_dto_helper import build_plan_frame
+
+
+def _plan() -> pd.DataFrame:
+    rows = []
+    for stream in ["Stream1", "Stream2"]:
+        rows.append([stream, "Dev", "Sviluppi", "Task", "2023-01-01", "2023-01-31"])
+        rows.append([stream, "Go live", "Rilascio in produzione", "Milestone", "2023-02-01", None])
+    return build_plan_frame(rows)
+
+
+class TestStageRecorder(unittest.TestCase):
+    def test_nested_stages(self):
+        profile = Profile()
+        with StageRecorder([profile], trace_memory=True).activate():
+            with stage("outer", "S1"):
+                with stage("inner"):
+                    data = bytearray(4 * 2 ** 20)
+                del data
+        with stage("ignored"):
+            pass
+
+        inner, outer = profile.records
+        self.assertEqual([("inner", "S1", 1, False), ("outer", "S1", 0, True)],
+                         [(r.name, r.stream, r.depth, r.opens_stream) for r in profile.records])
+        self.assertGreaterEqual(inner.peak_memory, 4 * 2 ** 20)
+        self.assertGreaterEqual(outer.peak_memory, inner.peak_memory)
+        self.assertGreaterEqual(outer.wall, inner.wall)
+        self.assertEqual({"S1": outer.wall}, profile.by_stream())
+
+
+class TestCommandHooks(unittest.TestCase):
+    def setUp(self):
+        tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp_dir.cleanup)
+        self.dir = tmp_dir.name
+        self.file_path = os.path.join(self.dir, "plan.xlsx")
+        _plan().to_excel(self.file_path, index=False)
+        self.config = GanttlyConfiguration(per_stream=True, use_cache=False, include_plotlyjs="cdn",
+                                           output=os.path.join(self.dir, "report.html"))
+
+    def test_records_the_stages_of_every_stream(self):
+        command = GanttlyCommandFactory(self.file_path, self.config).create()
+        profile = Profile()
+        command.add_hook(profile)
+
+        command.execute()
+
+        stages = profile.by_stage()
+        for name in ["load", "read", "build", "validate", "render", "chart", "draw", "timeline", "markers",
+                     "to_html", "write"]:
+            self.assertIn(name, stages)
+        self.assertEqual(["Stream1", "Stream2"], [record.stream for record in stages["chart"]])
+        self.assertEqual(["Stream1", "Stream2"], sorted(profile.by_stream()))
+        self.assertIsNone(stages["draw"][0].peak_memory)
+        self.assertIn("timeline", profile.summary())
+
+        trace = os.path.join(self.dir, "trace.json")
+        profile.write_trace(trace)
+        with open(trace, encoding="utf-8") as f:
+            events = json.load(f)["traceEvents"]
+        self.assertEqual(len(profile.records), len(events))
+        self.assertTrue(all(event["ph"] == "X" and event["dur"] >= 0 for event in events))
+
+    def test_cprofile(self):
+        stats = os.path.join(self.dir, "run.prof")
+        with python_profile(stats):
+            GanttlyCommandFactory(self.file_path, self.config).create().execute()
+
+        self.assertTrue(os.path.exists(stats))
+        self.assertIn("function calls", describe_python_profile(stats))
@@ -0,0 +1,171 @@
+# test_repositories.py
+
+import importlib.util
+import os
+import tempfile
+import unittest
+
+import pandas as pd
+from click.testing import CliRunner
+
+from ganttly.cli import cli
+from ganttly.csv_repository import CsvRepository
+from ganttly.dto import ActivityCategoryEnum, ActivityTypeEnum
+from ganttly.excel_repository import ExcelRepository
+from ganttly.parquet_repository import ParquetRepository
+from ganttly.repository import input_format_of, open_repository
+from ganttly.sqlite_repository import SqliteRepository
+from ganttly.validation import PlanValidationError
+from tests.ganttly.activity_dto_helper import PLAN_COLUMNS, build_plan_frame
+
+
+def _plan() -> pd.DataFrame:
+    return build_plan_frame([
+        ["S1", "Dev", "Sviluppi", "Task", pd.Timestamp("2023-01-01"), pd.Timestamp("2023-01-31"), "Ada", None],
+        ["S1", "Test", "UAT", "Task", pd.Timestamp("2023-02-01"), pd.Timestamp("2023-02-10"), None, "Dev"],
+        [None, None, None, None, None, None, None, None],
+        ["S2", "Go live", "Rilascio in produzione", "Milestone", pd.Timestamp("2023-03-01"), None, "Bob",
+         "S1/Test"],
+    ], columns=[*PLAN_COLUMNS, 'Owner', 'Predecessors'])
+
+
+class RepositoryConformance:
+    """ The column contract every backend follows, run against each of them """
+    repository_class = None
+    extension = None
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+
+    def write(self, df: pd.DataFrame) -> str:
+        file_path = os.path.join(self.tmp_dir.name, f"plan{self.extension}")
+        self.repository_class.write_frame(df, file_path, "MyPlan")
+        return file_path
+
+    def open(self, df: pd.DataFrame):
+        repository = open_repository(self.write(df), sheet_name="MyPlan")
+        self.assertIsInstance(repository, self.repository_class)
+        return repository
+
+    def test_loads_the_activities_with_their_rows(self):
+        activities = self.open(_plan()).load_activities()
+
+        self.assertEqual(4, len(activities))
+        self.assertEqual([2, 3, 4, 5], activities.row_number.tolist())
+        first = activities[0]
+        self.assertEqual(("S1", "Dev", "Ada"), (first.sub_stream, first.activity, first.owner))
+        self.assertEqual(ActivityCategoryEnum.DEVELOPMENT, first.activity_category)
+        self.assertEqual(ActivityTypeEnum.TASK, first.activity_type)
+        self.assertEqual(pd.Timestamp("2023-01-01"), first.start_date)
+        self.assertEqual(pd.Timestamp("2023-01-31"), first.end_date)
+        self.assertEqual(pd.Timestamp("2023-03-01"), activities[3].start_date)
+        self.assertIsNone(activities[3].end_date)
+        self.assertEqual("S1/Test", activities[3].predecessors)
+
+    def test_filtered_rows_keep_their_number(self):
+        activities = self.open(_plan()).load_activities(["S2"])
+
+        self.assertEqual(["Go live"], activities.activity.tolist())
+        self.assertEqual([5], activities.row_number.tolist())
+
+    def test_optional_columns_can_be_missing(self):
+        activities = self.open(_plan().drop(columns=['Owner', 'Predecessors'])).load_activities()
+
+        self.assertEqual(4, len(activities))
+        self.assertIsNone(activities[0].owner)
+
+    def test_missing_column(self):
+        repository = self.open(_plan().drop(columns=['Activity Type']))
+
+        with self.assertRaises(ValueError) as raised:
+            repository.load_activities()
+        self.assertIn("Missing columns in", str(raised.exception))
+        self.assertIn(f"{repository.file_path}: Activity Type", str(raised.exception))
+
+    def test_reports_the_cells_that_are_not_dates(self):
+        df = _plan()
+        df['Start Date'] = df['Start Date'].astype(object)
+        df.loc[1, 'Start Date'] = "soon"
+        repository = self.open(df)
+
+        with self.assertRaises(PlanValidationError) as raised:
+            repository.load_activities()
+        self.assertIn("Row 3 [Start Date]: 'soon' is not a date", str(raised.exception))
+        self.assertEqual([3], [issue.row for issue in repository.validate(["S1"]).errors])
+
+    def test_converts_through_the_cli(self):
+        source = self.write(_plan())
+        destination = os.path.join(self.tmp_dir.name, "converted.csv")
+
+        result = CliRunner().invoke(cli, ["convert", source, destination, "--sheet", "MyPlan"])
+
+        self.assertEqual(0, result.exit_code, result.output)
+        self.assertIn("Wrote 4 activities", result.output)
+        self.assertEqual(["Dev", "Test", "Go live"],
+                         CsvRepository(destination).load_activities(["S1", "S2"]).activity.tolist())
+
+
+class TestExcelRepositoryConformance(RepositoryConformance, unittest.TestCase):
+    repository_class = ExcelRepository
+    extension = ".xlsx"
+
+
+class TestCsvRepository(RepositoryConformance, unittest.TestCase):
+    repository_class = CsvRepository
+    extension = ".csv"
+
+
+class TestSqliteRepository(RepositoryConformance, unittest.TestCase):
+    repository_class = SqliteRepository
+    extension = ".sqlite"
+
+    def test_finds_the_only_table(self):
+        repository = SqliteRepository(self.write(_plan()), "Sheet1")
+
+        self.assertEqual(4, len(repository.load_activities()))
+
+    def test_path_with_uri_characters(self):
+        file_path = os.path.join(self.tmp_dir.name, "plan #2 ?100%.sqlite")
+        SqliteRepository.write_frame(_plan(), file_path, "MyPlan")
+
+        self.assertEqual(4, len(SqliteRepository(file_path, "MyPlan").load_activities()))
+
+    def test_not_a_database(self):
+        file_path = os.path.join(self.tmp_dir.name, "plan.db")
+        with open(file_path, "w") as f:
+            f.write("not a database")
+
+        with self.assertRaisesRegex(ValueError, f"Cannot read {file_path}"):
+            SqliteRepository(file_path).load_activities()
+
+    def test_unknown_table(self):
+        file_path = self.write(_plan())
+        SqliteRepository.write_frame(_plan(), file_path, "Other")
+
+        with self.assertRaisesRegex(ValueError, "No table 'Sheet1'.*MyPlan, Other"):
+            SqliteRepository(file_path, "Sheet1").load_activities()
+
+
+@unittest.skipUnless(importlib.util.find_spec("pyarrow"), "needs pyarrow")
+class TestParquetRepository(RepositoryConformance, unittest.TestCase):
+    repository_class = ParquetRepository
+    extension = ".parquet"
+
+
+class TestInputFormat(unittest.TestCase):
+    def test_told_from_the_extension(self):
+        self.assertEqual("excel", input_format_of("plan.XLSX"))
+        self.assertEqual("csv", input_format_of("plan.csv"))
+        self.assertEqual("parquet", input_format_of("plan.pq"))
+        self.assertEqual("sqlite", input_format_of("plan.db"))
+        self.assertEqual("csv", input_format_of("plan.txt", "csv"))
+        self.assertEqual("excel", input_format_of("plan"))
+
+    def test_unknown_format(self):
+        with self.assertRaisesRegex(ValueError, "Unknown input format 'json'"):
+            input_format_of("plan.csv", "json")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,131 @@
+# test_scheduling.py
+
+import os
+import tempfile
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from ganttly.activity_table import ActivityTable
+from ganttly.configuration import GanttlyConfiguration
+from ganttly.gantly_command import GanttlyCommandFactory
+from ganttly.gantt_chart_generator import CRITICAL_PATH_COLOR, GanttChartSubStreamGenerator
+from ganttly.scheduling import DependencyCycleError, DependencyGraph, schedule
+from ganttly.validation import PlanValidationError, validate_sheet
+from tests.ganttly.activity_dto_helper import PLAN_COLUMNS, build_plan_frame
+
+
+def _plan(first_predecessors=None) -> pd.DataFrame:
+    return build_plan_frame([
+        ["S1", "Design", "AFU", "Task", "2024-01-01", "2024-01-10", first_predecessors],
+        ["S1", "Build", "Sviluppi", "Task", "2024-01-05", "2024-01-20", "Design"],
+        ["S1", "Docs", "Sviluppi", "Task", "2024-01-01", "2024-01-03", "Design"],
+        ["S2", "Test", "UAT", "Task", "2024-01-01", "2024-01-05", "S1/Build; S1/Docs"],
+        ["S2", "Go live", "Rilascio in produzione", "Milestone", "2024-01-01", None, "Test;Nowhere"],
+        ["S2", "Training", "UAT", "Task", "2024-01-02", "2024-01-06", None],
+    ], columns=[*PLAN_COLUMNS, 'Predecessors'])
+
+
+def _days(values: np.ndarray) -> list:
+    return (values / np.timedelta64(1, 'D')).tolist()
+
+
+class TestDependencyGraph(unittest.TestCase):
+    def test_resolves_the_references(self):
+        graph = DependencyGraph.from_table(ActivityTable.from_frame(_plan()))
+
+        self.assertEqual([(0, 1), (0, 2), (1, 3), (2, 3), (3, 4)],
+                         sorted(zip(graph.sources.tolist(), graph.targets.tolist())))
+        self.assertEqual([(4, "Nowhere")], graph.unknown)
+        self.assertEqual([0, 1, 2, 3, 4], sorted(graph.topological_order().tolist()))
+
+    def test_cycle(self):
+        graph = DependencyGraph.from_table(ActivityTable.from_frame(_plan("S2/Go live")))
+
+        with self.assertRaises(DependencyCycleError) as raised:
+            graph.topological_order()
+        # Docs sits on a second loop through Design, Test and Go live
+        self.assertEqual([2, 3, 4, 5, 6], raised.exception.rows)
+
+
+class TestSchedule(unittest.TestCase):
+    def test_critical_path(self):
+        result = schedule(ActivityTable.from_frame(_plan()))
+
+        # Build waits for Design, Test for Build, and Go live for Test
+        self.assertEqual(pd.Timestamp("2024-01-10"), pd.Timestamp(result.earliest_start[1]))
+        self.assertEqual(pd.Timestamp("2024-01-25"), pd.Timestamp(result.earliest_start[3]))
+        self.assertEqual(pd.Timestamp("2024-01-29"), pd.Timestamp(result.earliest_start[4]))
+        self.assertEqual([0.0, 0.0, 13.0, 0.0, 0.0, 23.0], _days(result.slack))
+        self.assertEqual([True, True, False, True, True, False], result.critical.tolist())
+
+    def test_without_predecessors(self):
+        result = schedule(ActivityTable.from_frame(_plan().drop(columns='Predecessors')))
+
+        self.assertEqual([False, True, False, False, False, False], result.critical.tolist())
+        self.assertEqual(pd.Timestamp("2024-01-01"), pd.Timestamp(result.earliest_start[3]))
+
+    def test_validation_reports_the_predecessors(self):
+        report = validate_sheet(_plan("S2/Go live"))
+
+        self.assertEqual([2, 3, 4, 5, 6], [issue.row for issue in report.errors])
+        self.assertEqual("Design is part of a dependency cycle", report.errors[0].message)
+        self.assertEqual([(6, "Unknown predecessor 'Nowhere'")],
+                         [(issue.row, issue.message) for issue in report.warnings])
+
+
+class TestCriticalPathCharts(unittest.TestCase):
+    def test_generator_outlines_the_critical_bars(self):
+        table = ActivityTable.from_frame(_plan())
+        plain = GanttChartSubStreamGenerator(table)
+        highlighted = GanttChartSubStreamGenerator(table, critical_rows=[2, 3, 5, 6])
+
+        fig = highlighted.draw_chart()
+
+        widths = {name: list(trace.marker.line.width) for trace in fig.data if trace.type == 'bar'
+                  for name in [trace.name]}
+        self.assertEqual([4], widths["AFU"])
+        self.assertEqual(sorted([4, 0]), sorted(widths["Sviluppi"]))
+        self.assertEqual(CRITICAL_PATH_COLOR, fig.data[-1].marker.color)
+        self.assertNotEqual(plain.fingerprint(), highlighted.fingerprint())
+
+    def test_per_stream_charts_share_the_plan_critical_path(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            file_path = os.path.join(tmp_dir, "plan.xlsx")
+            _plan().to_excel(file_path, index=False)
+            config = GanttlyConfiguration(per_stream=True, use_cache=False, critical_path=True, filter=["S2"],
+                                          output=os.path.join(tmp_dir, "report.html"))
+
+            generators = list(GanttlyCommandFactory(file_path, config).create().chart_generators())
+
+        self.assertEqual(["S2"], [generator.title for generator in generators])
+        # Test and Go live wait for S1, filtered out of the charts
+        self.assertEqual([True, True, False], generators[0]._critical().tolist())
+
+    def test_only_the_errors_of_the_filtered_streams_and_their_predecessors_stop_the_charts(self):
+        broken = pd.concat([_plan(), pd.DataFrame([
+            ["S3", "Loop", "AFU", "Task", pd.Timestamp("2024-01-02"), pd.Timestamp("2024-01-05"), "Back"],
+            ["S3", "Back", "AFU", "Task", "soon", pd.Timestamp("2024-01-08"), "Loop"],
+        ], columns=_plan().columns)], ignore_index=True)
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            file_path = os.path.join(tmp_dir, "plan.xlsx")
+            broken.to_excel(file_path, index=False)
+
+            def generators(streams):
+                config = GanttlyConfiguration(per_stream=True, use_cache=False, critical_path=True, filter=streams,
+                                              output=os.path.join(tmp_dir, "report.html"))
+                return list(GanttlyCommandFactory(file_path, config).create().chart_generators())
+
+            # The cycle and the bad date of S3 neither stop S2 nor move its critical path
+            self.assertEqual([True, True, False], generators(["S2"])[0]._critical().tolist())
+            with self.assertRaises(PlanValidationError) as raised:
+                generators(["S3"])
+            self.assertEqual([8, 9], sorted({issue.row for issue in raised.exception.report.errors}))
+
+            # An error in S1, which S2 waits for, stops the critical path of S2
+            broken.loc[0, 'Start Date'] = "later"
+            broken.to_excel(file_path, index=False)
+            with self.assertRaises(PlanValidationError) as raised:
+                generators(["S2"])
+            self.assertIn("Row 2 [Start Date]: 'later' is not a date", str(raised.exception))
@@ -0,0 +1,132 @@
+# test_server.py
+
+import json
+import os
+import tempfile
+import threading
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from unittest.mock import patch
+from urllib.error import HTTPError
+from urllib.request import urlopen
+
+import pandas as pd
+
+from ganttly.configuration import GanttlyConfiguration
+from ganttly.excel_repository import ExcelRepository
+from ganttly.server import ReportServer, config_from_query
+from tests.ganttly.activity_dto_helper import build_plan_frame
+
+
+def _plan(streams=("Stream1", "Stream2", "Stream3")) -> pd.DataFrame:
+    rows = []
+    for stream in streams:
+        rows.append([stream, "Dev", "Sviluppi", "Task", "2023-01-01", "2023-01-31"])
+        rows.append([stream, "Go live", "Rilascio in produzione", "Milestone", "2023-02-01", None])
+    return build_plan_frame(rows)
+
+
+class TestConfigFromQuery(unittest.TestCase):
+    def test_parameters(self):
+        config = config_from_query("filter=S1,S2&filter=S3&per_stream=1&hide_legend=false&hide_title",
+                                   GanttlyConfiguration(hide_legend=True))
+
+        self.assertEqual(["S1", "S2", "S3"], config.filter)
+        self.assertTrue(config.per_stream)
+        self.assertFalse(config.hide_legend)
+        self.assertTrue(config.hide_title)
+        self.assertFalse(config.group_per_activity)
+
+    def test_date_window(self):
+        config = config_from_query("from=2024-03-01&to=", GanttlyConfiguration(window_end=datetime(2024, 1, 1)))
+
+        self.assertEqual(datetime(2024, 3, 1), config.window_start)
+        self.assertIsNone(config.window_end)
+
+    def test_invalid_parameters(self):
+        with self.assertRaises(ValueError):
+            config_from_query("per_stream=maybe", GanttlyConfiguration())
+        with self.assertRaises(ValueError):
+            config_from_query("from=next week", GanttlyConfiguration())
+        with self.assertRaises(ValueError):
+            config_from_query("output=/etc/passwd", GanttlyConfiguration())
+
+
+class TestReportServer(unittest.TestCase):
+    def setUp(self):
+        tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp_dir.cleanup)
+        self.file_path = os.path.join(tmp_dir.name, "plan.xlsx")
+        _plan().to_excel(self.file_path, index=False)
+        config = GanttlyConfiguration(use_cache=False, include_plotlyjs="directory")
+        self.server = ReportServer(("127.0.0.1", 0), self.file_path, config, log_requests=False)
+        thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        thread.start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+
+    def _get(self, path: str):
+        with urlopen(f"{self.server.url}{path}", timeout=30) as response:
+            return response.headers["Content-Type"], response.read().decode("utf-8")
+
+    def test_html_report(self):
+        content_type, body = self._get("/chart?per_stream=1")
+
+        self.assertTrue(content_type.startswith("text/html"))
+        self.assertEqual(3, body.count('class="plotly-graph-div"'))
+        self.assertIn('src="plotly.min.js"', body)
+        self.assertTrue(self._get("/plotly.min.js")[1].startswith("/**"))
+
+    def test_json_report(self):
+        content_type, body = self._get("/chart.json?per_stream=1&filter=Stream2")
+
+        self.assertEqual("application/json", content_type)
+        charts = json.loads(body)["charts"]
+        self.assertEqual(1, len(charts))
+        self.assertEqual("Stream2", charts[0]["layout"]["title"]["text"])
+
+    def test_overview_links_to_the_stream_charts(self):
+        chart = json.loads(self._get("/chart.json?overview=1")[1])["charts"][0]
+
+        self.assertEqual(['<a href="/chart?filter=Stream1">Stream1</a>', '<a href="/chart?filter=Stream2">Stream2</a>',
+                          '<a href="/chart?filter=Stream3">Stream3</a>'], chart["layout"]["yaxis"]["ticktext"])
+
+    def test_reports_are_cached_until_the_workbook_changes(self):
+        with patch.object(ExcelRepository, 'load_activities', autospec=True,
+                          side_effect=ExcelRepository.load_activities) as load_activities:
+            first = self._get("/chart.json")[1]
+            self.assertEqual(first, self._get("/chart.json")[1])
+            self._get("/chart.json?per_stream=1")
+            self.assertEqual((1, 2), (load_activities.call_count, self.server.renders))
+
+            _plan(streams=("Stream1",)).to_excel(self.file_path, index=False)
+            os.utime(self.file_path, ns=(0, 1))
+
+            self.assertNotEqual(first, self._get("/chart.json")[1])
+            self.assertEqual((2, 3), (load_activities.call_count, self.server.renders))
+
+    def test_concurrent_requests_parse_the_workbook_once(self):
+        paths = ["/chart.json?per_stream=1", "/chart.json", "/chart?group_per_activity=1",
+                 "/chart?hide_legend=1", "/chart?per_stream=1&group_per_activity=1"] * 2
+        with patch.object(ExcelRepository, 'load_activities', autospec=True,
+                          side_effect=ExcelRepository.load_activities) as load_activities:
+            with ThreadPoolExecutor(max_workers=len(paths)) as executor:
+                responses = list(executor.map(self._get, paths))
+
+        self.assertEqual(1, load_activities.call_count)
+        self.assertEqual(responses[:5], responses[5:])
+
+    def test_errors(self):
+        for path, status in [("/nope", 404), ("/chart?per_stream=maybe", 400)]:
+            with self.assertRaises(HTTPError) as raised:
+                self._get(path)
+            self.assertEqual(status, raised.exception.code)
+
+        with patch.object(ReportServer, 'render', side_effect=RuntimeError("boom")), \
+                patch('ganttly.server.sys.stderr') as stderr:
+            with self.assertRaises(HTTPError) as raised:
+                self._get("/chart")
+        self.assertEqual(500, raised.exception.code)
+        self.assertIn(b"could not be rendered", raised.exception.read())
+        self.assertIn("RuntimeError: boom", stderr.write.call_args[0][0])
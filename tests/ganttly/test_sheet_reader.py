@@ -0,0 +1,106 @@
+# test_sheet_reader.py
+
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import openpyxl
+import pandas as pd
+
+from allocaly.excel_repository import ExcelRepository as AllocationRepository
+from ganttly.excel_repository import ExcelRepository
+from ganttly.sheet_reader import RowRangeIndex, read_sheet, read_sheet_streaming
+from ganttly.workbook_cache import WorkbookCache
+
+TEST_PLAN = './tests/resources/test_plan.xlsx'
+
+
+class TestSheetReader(unittest.TestCase):
+    def test_streaming_read_matches_read_excel(self):
+        for sheet in ['MyPlan', 'Allocations']:
+            expected = pd.read_excel(TEST_PLAN, sheet_name=sheet)
+            df = read_sheet_streaming(TEST_PLAN, sheet, list(expected.columns))
+            pd.testing.assert_frame_equal(expected, df, check_dtype=False)
+            self.assertEqual(list(expected.dtypes), list(df.dtypes))
+
+    def test_only_requested_columns_are_kept(self):
+        df = read_sheet_streaming(TEST_PLAN, 'Allocations', ['Stream', 'Persone'],
+                                  optional_columns=['Not There'])
+        self.assertEqual(['Persone', 'Stream'], list(df.columns))
+
+    def test_rows_are_filtered_while_reading(self):
+        df = read_sheet_streaming(TEST_PLAN, 'Allocations', ['Persone', 'Stream'],
+                                  row_filter=('Stream', ['Stream 2']))
+        self.assertEqual(['Emanuelo'], df['Persone'].tolist())
+
+    def test_missing_sheet(self):
+        with self.assertRaises(ValueError):
+            read_sheet_streaming(TEST_PLAN, 'Nope', ['Stream'])
+
+    def test_streaming_repositories_match_default_ones(self):
+        activities = ExcelRepository(TEST_PLAN, 'MyPlan').load_activities()
+        streamed = ExcelRepository(TEST_PLAN, 'MyPlan', streaming=True).load_activities()
+        self.assertEqual(
+            [(a.sub_stream, a.activity_category, a.activity_type, a.start_date, a.end_date) for a in activities],
+            [(a.sub_stream, a.activity_category, a.activity_type, a.start_date, a.end_date) for a in streamed])
+
+        allocations = AllocationRepository(TEST_PLAN, 'Allocations', streaming=True).load_allocation(
+            stream_filter=["Stream 2"])
+        self.assertEqual(1, len(allocations))
+        self.assertEqual('Emanuelo', allocations[0].employee)
+        self.assertEqual('Sviluppi', allocations[0].activity_category)
+        self.assertEqual(10.0, allocations[0].mds)
+
+    def test_streaming_repository_reports_missing_columns(self):
+        repository = ExcelRepository(TEST_PLAN, 'Allocations', streaming=True)
+        with self.assertRaises(ValueError) as error:
+            repository.load_activities()
+        self.assertIn('Sub Stream', str(error.exception))
+
+
+class TestRowRangeIndex(unittest.TestCase):
+    def test_ranges_are_merged(self):
+        index = RowRangeIndex('Stream')
+        for row, value in [(2, 'a'), (3, 'a'), (4, 'b'), (6, 'b'), (7, 'a'), (8, 'c')]:
+            index.add(row, value)
+
+        self.assertEqual({'a': [[2, 3], [7, 7]], 'b': [[4, 6]], 'c': [[8, 8]]}, index.ranges)
+        rows = index.rows_for(['a', 'c'])
+        self.assertEqual(([2, 7], [3, 8]), (rows.starts, rows.ends))
+        self.assertEqual([2, 3, 7, 8], [row for row in range(1, 10) if row in rows])
+        self.assertEqual(0, index.rows_for(['missing']).last)
+        self.assertEqual(index.ranges, RowRangeIndex.from_frame('Stream', index.to_frame()).ranges)
+
+
+class TestFilterPushdown(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp_dir)
+        self.cache = WorkbookCache(self.tmp_dir)
+
+    def _read(self, streams):
+        return read_sheet(TEST_PLAN, 'Allocations', ['Persone', 'Stream'],
+                          row_filter=('Stream', streams), streaming=True, cache=self.cache)
+
+    def test_filtered_reads_only_read_indexed_rows(self):
+        first = self._read(['Stream 2'])
+        self.assertEqual(['Emanuelo'], first['Persone'].tolist())
+        index = RowRangeIndex.from_frame(
+            'Stream', self.cache.lookup(TEST_PLAN, 'Allocations', 'row-index:Stream'))
+        self.assertEqual({'Requisiti di Accesso - M': [[2, 2], [4, 4]], 'Stream 2': [[3, 3]]},
+                         index.ranges)
+
+        worksheet_type = type(openpyxl.load_workbook(TEST_PLAN, read_only=True)['Allocations'])
+        with patch.object(worksheet_type, 'iter_rows', autospec=True,
+                          side_effect=worksheet_type.iter_rows) as iter_rows:
+            second = self._read(['Requisiti di Accesso - M'])
+
+        self.assertEqual(['Mario', 'Vittoriana'], second['Persone'].tolist())
+        # the header, then only the span of the indexed rows, up to the last wanted column
+        spans = [(call.kwargs.get('min_row'), call.kwargs.get('max_row')) for call in iter_rows.call_args_list]
+        self.assertEqual([(None, None), (2, 4)], spans)
+
+    def test_projection_without_streaming(self):
+        df = read_sheet(TEST_PLAN, 'Allocations', ['Persone', 'Stream'], optional_columns=['Note'])
+        self.assertEqual(['Persone', 'Stream', 'Note'], list(df.columns))
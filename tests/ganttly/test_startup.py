@@ -0,0 +1,36 @@
+# test_startup.py
+
+import os
+import subprocess
+import sys
+import unittest
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+HEAVY_MODULES = ["pandas", "numpy", "plotly", "openpyxl"]
+
+
+def _imported_modules(*args) -> set:
+    """ The modules imported by the CLI run with `args`, as reported by -X importtime """
+    result = subprocess.run([sys.executable, "-X", "importtime", "-m", "ganttly.cli", *args],
+                            cwd=ROOT_DIR, capture_output=True, text=True, timeout=60)
+    modules = set()
+    for line in result.stderr.splitlines():
+        if line.startswith("import time:") and "|" in line:
+            modules.add(line.rsplit("|", 1)[1].strip().split(".")[0])
+    return modules
+
+
+class TestStartup(unittest.TestCase):
+    def assertNoHeavyImports(self, *args):
+        imported = _imported_modules(*args)
+        self.assertIn("click", imported)
+        self.assertEqual([], [module for module in HEAVY_MODULES if module in imported])
+
+    def test_help(self):
+        self.assertNoHeavyImports("--help")
+        self.assertNoHeavyImports("render", "--help")
+        self.assertNoHeavyImports("watch", "--help")
+        self.assertNoHeavyImports("validate", "--help")
+
+    def test_missing_workbook(self):
+        self.assertNoHeavyImports("missing.xlsx")
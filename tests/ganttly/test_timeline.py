@@ -0,0 +1,50 @@
+# test_timeline.py
+
+import json
+import unittest
+from datetime import datetime
+
+import pandas as pd
+import plotly.express as px
+
+from ganttly.dto import ActivityCategoryEnum
+from ganttly.gantt_chart_generator import color_from_activity_category
+from ganttly.timeline import timeline
+from tests.ganttly.activity_dto_helper import build_plan_frame
+
+CATEGORY_ORDER = [e.value for e in ActivityCategoryEnum.get_ordered()]
+
+
+def _plan() -> pd.DataFrame:
+    return build_plan_frame([
+        ["Stream1", "Stream1-Dev", "Sviluppi", datetime(2024, 1, 1), datetime(2024, 1, 31)],
+        ["Stream1", "Stream1-Go live", "Rilascio in produzione", datetime(2024, 3, 1), None],
+        ["Stream2", "Stream2-Uat", "UAT", datetime(2024, 2, 1), datetime(2024, 2, 20)],
+        ["Stream2", "Stream2-Dev", "Sviluppi", datetime(2024, 1, 15), datetime(2024, 2, 10)],
+        ["Stream2", "Stream2-Other", "N/A", datetime(2024, 1, 3), datetime(2024, 1, 20)],
+    ], columns=['Sub Stream', 'Activity', 'Activity Category', 'Start Date', 'End Date'])
+
+
+class TestTimeline(unittest.TestCase):
+    def assertSameFigure(self, expected, actual):
+        self.assertEqual(json.loads(expected.to_json()), json.loads(actual.to_json()))
+
+    def test_matches_plotly_express_timeline(self):
+        for y, text, title in [('Activity', 'Activity', 'Gantt Chart'),
+                               ('Activity Category', None, None)]:
+            expected = px.timeline(_plan(), x_start='Start Date', x_end='End Date', y=y,
+                                   color='Activity Category', title=title, text=text,
+                                   category_orders={'Activity Category': CATEGORY_ORDER},
+                                   color_discrete_map=color_from_activity_category())
+            actual = timeline(_plan(), 'Start Date', 'End Date', y, 'Activity Category',
+                              title=title, text=text, category_order=CATEGORY_ORDER,
+                              color_map=color_from_activity_category())
+            self.assertSameFigure(expected, actual)
+
+    def test_one_trace_per_category_in_order(self):
+        fig = timeline(_plan(), 'Start Date', 'End Date', 'Activity', 'Activity Category',
+                       category_order=CATEGORY_ORDER, color_map=color_from_activity_category())
+        self.assertEqual(["Sviluppi", "UAT", "Rilascio in produzione", "N/A"],
+                         [trace.name for trace in fig.data])
+        # bars are as long as the activity, in milliseconds
+        self.assertEqual(30 * 24 * 3600 * 1000, fig.data[0].x[0])
@@ -0,0 +1,91 @@
+# test_validation.py
+
+import os
+import tempfile
+import unittest
+
+import numpy as np
+import pandas as pd
+from click.testing import CliRunner
+
+from ganttly.activity_table import ActivityTable
+from ganttly.cli import cli
+from ganttly.excel_repository import ExcelRepository
+from ganttly.validation import PlanValidationError, validate_activities, validate_sheet
+from ganttly.workbook_cache import WorkbookCache
+from tests.ganttly.activity_dto_helper import build_plan_frame
+
+
+def _plan() -> pd.DataFrame:
+    return build_plan_frame([
+        ["S1", "Dev", "Sviluppi", "Task", "2023-01-01", "2023-01-31"],
+        ["S1", "Test", "UAT", "Task", None, "2023-02-10"],
+        ["S1", "Go live", "Rilascio in produzione", "Milestone", None, None],
+        [None, None, None, None, None, None],
+        ["S2", "Backwards", "Sviluppi", "Task", "2023-03-01", "2023-02-01"],
+        ["S2", "Typo", "Svilupi", "Taks", "2023-03-01", None],
+        ["S2", "Garbage", "AFU", "Task", "soon", "2023-04-01"],
+        ["S2", "Ignored end", "AFU", "Milestone", "2023-04-01", "later"],
+    ], parse_dates=False)
+
+
+class TestValidation(unittest.TestCase):
+    def test_reports_every_issue_with_its_sheet_row(self):
+        report = validate_sheet(_plan())
+
+        self.assertEqual([(3, 'Start Date'), (4, 'Start Date'), (6, 'End Date'), (8, 'Start Date')],
+                         [(issue.row, issue.column) for issue in report.errors])
+        self.assertEqual("Task Backwards ends before it starts", report.errors[2].message)
+        self.assertEqual("'soon' is not a date", report.errors[3].message)
+        self.assertEqual(["Unknown activity category 'Svilupi'", "Unknown activity type 'Taks'"],
+                         [issue.message for issue in report.warnings])
+        self.assertEqual(7, report.rows)
+        self.assertFalse(report.is_valid)
+        self.assertIn("7 rows checked: 4 errors, 2 warnings", report.describe())
+        self.assertIn("... and 4 more", report.describe(limit=2))
+
+    def test_rows_of_a_selection_leave_out_the_blank_ones(self):
+        report = validate_sheet(_plan())
+
+        # row 5 is blank, as `ganttly validate` leaves it out
+        selected = report.for_rows(np.array([4, 5, 6]))
+
+        self.assertEqual(2, selected.rows)
+        self.assertEqual([4, 6], [issue.row for issue in selected.errors])
+
+    def test_table_rows_follow_a_take(self):
+        table = ActivityTable.from_frame(_plan()).take([4, 1])
+
+        report = validate_activities(table)
+
+        self.assertEqual([3, 6], [issue.row for issue in report.errors])
+
+    def test_repository_checks_before_drawing(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            file_path = os.path.join(tmp_dir, "plan.xlsx")
+            _plan().to_excel(file_path, index=False)
+            for streaming in (False, True):
+                repository = ExcelRepository(file_path, streaming=streaming)
+                with self.assertRaises(PlanValidationError) as raised:
+                    repository.load_activities()
+                self.assertEqual(4, len(raised.exception.report.errors))
+                self.assertIn("Row 6 [End Date]", str(raised.exception))
+
+                # Rows keep their sheet number when the other streams are filtered out
+                report = repository.validate(["S2"])
+                self.assertEqual([6, 8], [issue.row for issue in report.errors])
+
+            # The streaming reader takes the header from the first row holding a value
+            _plan().to_excel(file_path, index=False, startrow=2)
+            for cache in (None, WorkbookCache(os.path.join(tmp_dir, "cache"))):
+                for _ in range(2):
+                    report = ExcelRepository(file_path, streaming=True, cache=cache).validate(["S2"])
+                    self.assertEqual([8, 10], [issue.row for issue in report.errors])
+
+            _plan().to_excel(file_path, index=False)
+            result = CliRunner().invoke(cli, ["validate", file_path, "--no-cache", "--filter", "S2"])
+            self.assertEqual(1, result.exit_code)
+            self.assertIn("Error: Row 8 [Start Date]: 'soon' is not a date", result.output)
+
+            result = CliRunner().invoke(cli, ["validate", file_path, "--no-cache", "--filter", "S1", "--limit", "1"])
+            self.assertIn("... and 1 more", result.output)
@@ -0,0 +1,108 @@
+# test_watch.py
+
+import os
+import tempfile
+import unittest
+
+import pandas as pd
+
+from ganttly.gantly_command import GanttlyConfiguration
+from ganttly.watch import FileWatcher, watch
+from tests.ganttly.activity_dto_helper import build_plan_frame
+
+
+class _FakeTime:
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = 0
+        self.on_sleep = None
+
+    def clock(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float):
+        self.now += seconds
+        self.sleeps += 1
+        if self.on_sleep is not None:
+            self.on_sleep(self.sleeps)
+
+
+def _plan(uat_end: str = '2023-02-20') -> pd.DataFrame:
+    rows = []
+    for stream in ["Stream1", "Stream2", "Stream3"]:
+        rows.append([stream, "Dev", "Sviluppi", "Task", "2023-01-01", "2023-01-31"])
+        rows.append([stream, "Uat", "UAT", "Task", "2023-02-01",
+                     uat_end if stream == "Stream2" else "2023-02-20"])
+    return build_plan_frame(rows)
+
+
+class TestFileWatcher(unittest.TestCase):
+    def setUp(self):
+        tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp_dir.cleanup)
+        self.file_path = os.path.join(tmp_dir.name, "plan.txt")
+        self._write("v1")
+        self.time = _FakeTime()
+        self.watcher = FileWatcher(self.file_path, interval=0.5, debounce=1.0,
+                                   clock=self.time.clock, sleep=self.time.sleep)
+
+    def _write(self, content: str):
+        with open(self.file_path, "w") as f:
+            f.write(content)
+
+    def test_a_burst_of_saves_is_one_change(self):
+        def save(sleeps):
+            if sleeps <= 3:
+                self._write("v" * (sleeps + 2))
+
+        self.time.on_sleep = save
+        self.watcher.wait_for_change()
+
+        # three saves half a second apart, then a second of quiet
+        self.assertEqual(3 * 0.5 + 1.0, self.time.now)
+
+    def test_waits_while_the_file_is_missing(self):
+        def replace(sleeps):
+            if sleeps == 1:
+                os.remove(self.file_path)
+            if sleeps == 6:
+                self._write("v2")
+
+        self.time.on_sleep = replace
+        self.watcher.wait_for_change()
+
+        self.assertEqual(6 * 0.5 + 1.0, self.time.now)
+
+
+class TestWatch(unittest.TestCase):
+    def setUp(self):
+        tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp_dir.cleanup)
+        self.file_path = os.path.join(tmp_dir.name, "plan.xlsx")
+        _plan().to_excel(self.file_path, index=False)
+        self.config = GanttlyConfiguration(
+            per_stream=True,
+            output=os.path.join(tmp_dir.name, "report.html"),
+            cache_dir=os.path.join(tmp_dir.name, "cache"),
+        )
+
+    def test_rebuilds_only_the_changed_streams(self):
+        saves = [lambda: _plan(uat_end='2023-03-01').to_excel(self.file_path, index=False),
+                 lambda: _plan(uat_end='2023-03-01').drop(columns=['Start Date']).to_excel(
+                     self.file_path, index=False)]
+
+        class Watcher:
+            def wait_for_change(self):
+                saves.pop(0)()
+
+        messages, builds = [], []
+        watch(self.file_path, self.config, echo=messages.append, watcher=Watcher(),
+              on_build=lambda command: builds.append((command.fragments.rendered, command.fragments.reused)),
+              max_builds=3)
+
+        self.assertEqual([(3, 0), (1, 2)], builds)
+        self.assertIn("load", messages[1])
+        self.assertIn("render", messages[1])
+        self.assertIn("1 charts drawn, 2 reused", messages[1])
+        # a broken workbook is reported without ending the watch
+        self.assertEqual(f"Error: Missing columns in sheet 'Sheet1' of {self.file_path}: Start Date", messages[2])
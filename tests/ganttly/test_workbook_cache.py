@@ -0,0 +1,145 @@
+# test_workbook_cache.py
+
+import os
+import pickle
+import shutil
+import tempfile
+import unittest
+from unittest.mock import Mock, patch
+
+import pandas as pd
+
+from ganttly.excel_repository import ExcelRepository
+from ganttly.workbook_cache import WorkbookCache
+
+TEST_PLAN = './tests/resources/test_plan.xlsx'
+
+
+class TestWorkbookCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp_dir)
+        self.workbook = os.path.join(self.tmp_dir, 'plan.xlsx')
+        shutil.copy(TEST_PLAN, self.workbook)
+        self.cache = WorkbookCache(os.path.join(self.tmp_dir, 'cache'))
+
+    def _entries(self):
+        return os.listdir(self.cache.cache_dir)
+
+    def test_second_load_is_served_from_cache(self):
+        reader = Mock(return_value=pd.DataFrame({'a': [1, 2]}))
+
+        first = self.cache.load_sheet(self.workbook, 'MyPlan', reader)
+        second = self.cache.load_sheet(self.workbook, 'MyPlan', reader)
+
+        reader.assert_called_once()
+        pd.testing.assert_frame_equal(first, second)
+
+    def test_mixed_columns_round_trip(self):
+        df = pd.DataFrame({
+            'text': ['a', None, 'b', 'a'],
+            'mixed': [pd.Timestamp('2023-01-02'), 'soon', float('nan'), 3],
+            'dates': pd.to_datetime(['2023-01-01', None, '2023-02-01', '2023-03-01']),
+            'numbers': [1.5, float('nan'), 2.0, 3.0],
+            'flags': [True, False, True, True],
+        }, index=[0, 2, 5, 9])
+
+        self.cache.store(self.workbook, 'MyPlan', '', df)
+        cached = self.cache.lookup(self.workbook, 'MyPlan')
+
+        pd.testing.assert_frame_equal(df, cached)
+        self.assertEqual([pd.Timestamp, str, float, int], [type(v) for v in cached['mixed']])
+
+    def test_frames_not_storable_without_pickle_are_not_cached(self):
+        reader = Mock(return_value=pd.DataFrame({'a': [object()]}))
+
+        self.cache.load_sheet(self.workbook, 'MyPlan', reader)
+        self.cache.load_sheet(self.workbook, 'MyPlan', reader)
+
+        self.assertEqual(2, reader.call_count)
+        self.assertFalse(os.path.exists(self.cache.cache_dir))
+
+    def test_pickled_entry_is_not_loaded(self):
+        reader = Mock(return_value=pd.DataFrame({'a': [1]}))
+        self.cache.load_sheet(self.workbook, 'MyPlan', reader)
+        for name in self._entries():
+            with open(os.path.join(self.cache.cache_dir, name), 'wb') as f:
+                pickle.dump(pd.DataFrame({'a': [2]}), f)
+
+        df = self.cache.load_sheet(self.workbook, 'MyPlan', reader)
+
+        self.assertEqual([1], df['a'].tolist())
+
+    def test_unchanged_workbook_is_not_hashed(self):
+        reader = Mock(return_value=pd.DataFrame({'a': [1]}))
+        self.cache.load_sheet(self.workbook, 'MyPlan', reader)
+
+        with patch('ganttly.workbook_cache.WorkbookFingerprint.of') as fingerprint:
+            WorkbookCache(self.cache.cache_dir).load_sheet(self.workbook, 'MyPlan', reader)
+        fingerprint.assert_not_called()
+        reader.assert_called_once()
+
+    def test_touched_workbook_is_hashed_and_still_hits(self):
+        reader = Mock(return_value=pd.DataFrame({'a': [1]}))
+        self.cache.load_sheet(self.workbook, 'MyPlan', reader)
+        stat = os.stat(self.workbook)
+        os.utime(self.workbook, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+
+        WorkbookCache(self.cache.cache_dir).load_sheet(self.workbook, 'MyPlan', reader)
+
+        reader.assert_called_once()
+
+    def test_sheets_are_cached_separately(self):
+        reader = Mock(return_value=pd.DataFrame({'a': [1]}))
+
+        self.cache.load_sheet(self.workbook, 'MyPlan', reader)
+        self.cache.load_sheet(self.workbook, 'Allocations', reader)
+
+        self.assertEqual(2, reader.call_count)
+        self.assertEqual(2, len(self._entries()))
+
+    def test_modified_workbook_invalidates_entry(self):
+        reader = Mock(return_value=pd.DataFrame({'a': [1]}))
+        self.cache.load_sheet(self.workbook, 'MyPlan', reader)
+
+        with open(self.workbook, 'ab') as f:
+            f.write(b'\0')
+        self.cache.load_sheet(self.workbook, 'MyPlan', reader)
+
+        self.assertEqual(2, reader.call_count)
+        # the stale entry is replaced, not kept next to the new one
+        self.assertEqual(1, len(self._entries()))
+
+    def test_corrupted_entry_is_reparsed(self):
+        reader = Mock(return_value=pd.DataFrame({'a': [1]}))
+        self.cache.load_sheet(self.workbook, 'MyPlan', reader)
+        for name in self._entries():
+            with open(os.path.join(self.cache.cache_dir, name), 'wb') as f:
+                f.write(b'garbage')
+
+        df = self.cache.load_sheet(self.workbook, 'MyPlan', reader)
+
+        self.assertEqual(2, reader.call_count)
+        self.assertEqual([1], df['a'].tolist())
+
+    def test_clear_only_removes_entries(self):
+        self.cache.load_sheet(self.workbook, 'MyPlan', Mock(return_value=pd.DataFrame({'a': [1]})))
+        for name in ['data.npz', 'model.pkl', 'notes.txt']:
+            with open(os.path.join(self.cache.cache_dir, name), 'wb') as f:
+                f.write(b'not ours')
+
+        self.cache.clear()
+
+        self.assertEqual(['data.npz', 'model.pkl', 'notes.txt'], sorted(self._entries()))
+
+    def test_repository_reads_through_cache(self):
+        repository = ExcelRepository(self.workbook, 'MyPlan', cache=self.cache)
+
+        uncached = ExcelRepository(self.workbook, 'MyPlan').load_activities()
+        repository.load_activities()
+        cached = repository.load_activities()
+
+        self.assertEqual(1, len(self._entries()))
+        self.assertEqual(
+            [(a.sub_stream, a.activity_category, a.start_date) for a in uncached],
+            [(a.sub_stream, a.activity_category, a.start_date) for a in cached])